@@ -1,6 +1,10 @@
 import pygame
 from button_class import button
-from main import FPS
+from widget_tree import WidgetTree
+from layout import Layout
+from font_cache import getFont, renderText
+from frame_profiler import profiler
+from scene_registry import registry
 
 """
 This is where scenes are defined for the Visualization tool
@@ -14,6 +18,20 @@ class SceneManager:
     def __init__(self):
         self.scene = self
 
+        # rectangles of the screen that changed this frame. main() hands these to pygame.display.update()
+        # so only the changed pixels are pushed to the window
+        self.dirty_rects = []
+
+        # when True the scene repaints everything on the next Render and the whole window is pushed.
+        # This is set on construction, on scene switch and whenever the window is resized
+        self.full_redraw = True
+
+        # a display-format copy of everything in the scene that does not change from frame to frame
+        # (background color, titles, labels, buttons in their normal state). Built by GetBackground(),
+        # and redrawn when background_valid is False
+        self.background = None
+        self.background_valid = False
+
     def Input(self, events, pressed_keys, mouse):
         """
         Reads input and updates variables based on input
@@ -42,18 +60,159 @@ class SceneManager:
         """
         return None
 
+    def IsAnimating(self):
+        """
+        Tells the main loop whether the scene is animating or playing audio. While a scene is not animating
+        the main loop sleeps until an event arrives, so scenes that change on their own must override this
+        :return: True if the scene needs to be updated even when there is no input
+        """
+        return False
+
+    def NeedsRedraw(self):
+        """
+        Tells the main loop whether the scene has something queued to draw, for example after a scene switch or
+        a resize. The main loop does not sleep until the next event while it does, so the change shows right away
+        :return: True if a full redraw or dirty rectangles are pending
+        """
+        return self.full_redraw or bool(self.dirty_rects)
+
+    def UsesPreciseInput(self):
+        """
+        Tells the main loop whether the scene needs the exact time of every input event, like the rhythm
+        activities. While it does, the main loop reads events every millisecond between frames
+        :return: True if events should be timestamped precisely
+        """
+        return False
+
     def SwitchToScene(self, next_scene):
         """
         Updates self.scene to load the next scene
-        :param next_scene: the scene that should be displayed after this funciton is called.
+        :param next_scene: the scene that should be displayed after this funciton is called. This can be the
+        name of a scene in the scene registry, which reuses the scene if it was shown before, or a scene class,
+        which is then created here so the time it takes shows up when profiling
         :return:
         """
-        self.scene = next_scene
+        with profiler.phase("SwitchToScene", self):
+            if isinstance(next_scene, str):
+                next_scene = registry.get(next_scene)
+            elif callable(next_scene):
+                next_scene = next_scene()
+            self.scene = next_scene
 
     def Terminate(self):
         self.SwitchToScene(None)
 
+    def Reset(self):
+        """
+        Puts the scene back in the state it was created in. Called by the scene registry when a retained
+        scene is reused, instead of building a new one
+        :return: none
+        """
+        return None
+
+    def OnEnter(self):
+        """
+        Called by the main loop when the scene becomes the active scene
+        :return: none
+        """
+        self.scene = self
+        self.RequestFullRedraw()
+
+    def OnExit(self):
+        """
+        Called by the main loop when another scene replaces this one
+        :return: none
+        """
+        return None
+
+    def MarkDirty(self, rect):
+        """
+        Records a part of the screen that was redrawn this frame
+        :param rect: the area that changed, anything pygame.Rect() accepts
+        :return: none
+        """
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def RequestFullRedraw(self):
+        """
+        Makes the next Render repaint the whole scene and push the whole window.
+        Called by main() on scene switch and VIDEORESIZE
+        :return: none
+        """
+        self.full_redraw = True
+
+    def GetDirtyRects(self, screen):
+        """
+        Returns the rectangles that changed since the last call and clears them
+        :param screen: the initialized screen
+        :return: a list of pygame.Rect, the whole screen if a full redraw happened
+        """
+        if self.full_redraw:
+            self.full_redraw = False
+            self.dirty_rects = []
+            return [screen.get_rect()]
+
+        rects = self.dirty_rects
+        self.dirty_rects = []
+        return rects
 
+    def Resize(self, size):
+        """
+        Stores the new screen size. If it is different from the current one the scene is laid out again
+        and fully redrawn
+        :param size: the size of the screen
+        :return: none
+        """
+        if (self.width, self.height) != tuple(size):
+            self.width = size[0]
+            self.height = size[1]
+            self.Layout()
+            self.InvalidateBackground()
+            self.RequestFullRedraw()
+
+    def DrawBackground(self, surface):
+        """
+        Draws the static content of the scene, the things that only move when the screen is resized,
+        onto surface. Scenes override this and only draw what changes (hover, text input, animations) in Render
+        :param surface: the background layer
+        :return: none
+        """
+        surface.fill((255, 255, 165))
+
+    def GetBackground(self, screen):
+        """
+        Returns the background layer, building it with DrawBackground() if it is missing or the wrong size.
+        The layer is converted to the pixel format of the screen so blitting it is a plain copy
+        :param screen: the initialized screen
+        :return: a surface the size of the screen
+        """
+        if self.background is None or self.background.get_size() != screen.get_size():
+            self.background = pygame.Surface(screen.get_size()).convert(screen)
+            self.background_valid = False
+        if not self.background_valid:
+            self.DrawBackground(self.background)
+            self.background_valid = True
+        return self.background
+
+    def InvalidateBackground(self):
+        """
+        Marks the background layer as out of date so it is drawn again on the next full redraw.
+        Called on resize, and should be called when the static content changes (for example a theme change)
+        :return: none
+        """
+        self.background_valid = False
+
+    def Layout(self):
+        """
+        Repositions the widgets of the scene for the current self.width and self.height.
+        Only called when the screen size changes, so Render can reuse the positions every frame
+        :return: none
+        """
+        return None
+
+
+# ButtonScene is turned off. It times its steps with the animation clock, so turning it back on also needs
+# from animation_clock import clock, SKIP
 '''
 class ButtonScene(SceneManager):
     """
@@ -105,16 +264,14 @@ class ButtonScene(SceneManager):
         # value of 10. The default value always starts at 5. 
         self.pace = 5
 
-        # self.updateSpeed is a variable that represents how many times the visualization updates itself per second when in
-        # play mode. Its value is based on the current pace set by the user, and is used in self.update() to determine when
-        # the next step in the visualization will be displayed. FPS is declared in the main module and basically represents
-        # the number of times that pygame draws the screen for every second. The default update speed will be the same as the
-        # FPS, meaning that the visualization will update once per second. This value is updated on the "speed up" and "slow down"
-        # button presses by the user
-        self.updateSpeed = (FPS // self.pace) * 5
+        # self.stepTimer runs self.nextStep() on the shared animation clock every 5 / pace seconds, so the default pace shows
+        # one step per second. The steps are timed with the clock instead of counting frames, so the visualization plays at the
+        # same speed when the frame rate drops. If a frame is late only one step is shown (SKIP) instead of jumping ahead.
+        # The interval is updated on the "speed up" and "slow down" button presses by the user
+        self.stepTimer = clock.schedule(self.stepInterval(), self.nextStep, policy=SKIP)
 
         # self.paused keeps track of the current state of the visualization. A value of false means the visualization is playing, while
-        # a value of true means the visualization is paused. This value is used in self.update() and is updated by the "paused"/"play"
+        # a value of true means the visualization is paused. The step timer is paused with it and it is updated by the "paused"/"play"
         # button presses
         self.paused = False # Used to pause the game
 
@@ -131,10 +288,6 @@ class ButtonScene(SceneManager):
         # self.displayBoard() to display the next step in the visualization. 
         self.ind = 0
 
-        # self.timer is a varaible that is used in self.update() to determine when the next update will happen. The timer is incremented
-        # once per frame (once every time self.update is called in the main game loop in the main module)
-        self.timer = 0
-
         # white color
         self.color = (255, 255, 255)
         #dark grey
@@ -164,10 +317,14 @@ class ButtonScene(SceneManager):
         self.decryptText = self.font.render('Decrypting', True, self.color_dark)
         self.PlayPause = self.play
 
-    # Updates the self.updateSpeed variable so the self.update() function makes update
-    # to the board at the appropriate rate
+    # Returns the number of seconds between steps for the current pace
+    def stepInterval(self):
+        return 5 / self.pace
+
+    # Changes the interval of the step timer so the board is updated
+    # at the appropriate rate
     def updatePace(self):
-        self.updateSpeed = (FPS // self.pace) * 5
+        self.stepTimer.setInterval(self.stepInterval())
         return None
 
 
@@ -179,8 +336,7 @@ class ButtonScene(SceneManager):
             # decrement the current pace
             self.pace -= 1
 
-            # update the 'self.updateSpeed' variable with this function call. Having
-            # a separate function may be unecessary for this but it works. 
+            # update the interval of the step timer with this function call
             self.updatePace()
         return None
 
@@ -192,8 +348,7 @@ class ButtonScene(SceneManager):
             # increment the current pace
             self.pace += 1
 
-            # update the 'self.updateSpeed' variable with this function call. Having
-            # a separate function may be unecessary for this but it works. 
+            # update the interval of the step timer with this function call
             self.updatePace()
         return None
 
@@ -230,6 +385,7 @@ class ButtonScene(SceneManager):
     def restart(self):
         # pause the animation so it can't continue to play while it is being reset
         self.paused = True
+        self.stepTimer.pause()
 
         # Clear the table of any highlights with the table.refresh method
         self.table.refresh()
@@ -251,8 +407,18 @@ class ButtonScene(SceneManager):
     def togglePause(self):
         if self.paused:
             self.paused = False
+            self.stepTimer.resume()
         else:
             self.paused = True
+            self.stepTimer.pause()
+
+    # The scene keeps drawing frames while the animation is playing
+    def IsAnimating(self):
+        return not self.paused
+
+    # Stops the step timer when leaving the scene
+    def OnExit(self):
+        clock.cancel(self.stepTimer)
 
     def Input(self, events, pressed_keys, mouse):
         for ev in events:
@@ -292,7 +458,7 @@ class ButtonScene(SceneManager):
         up_button = button(165, self.up, lambda: self.speedUp())
         down_button = button(200, self.down, lambda: self.slowDown())
         res_button = button(245, self.res, lambda: self.restart())
-        menu_button = button(280, self.menu, lambda: self.SwitchToScene(MainMenu()))
+        menu_button = button(280, self.menu, lambda: self.SwitchToScene(MainMenu))
 
         self.buttons = [menu_button, play_button, forw_button, back_button, up_button, down_button,
                         res_button]
@@ -352,8 +518,20 @@ class ButtonScene(SceneManager):
         self.mainDisplay.blit(self.table.screen, (x, 10))
         return None
 
-    # This function is called once per game loop in the main.py file. It adds functionality
-    # for updating the screen at a certain pace
+    # This function is called by the step timer at the current pace. It shows the next step
+    # of the animation
+    def nextStep(self):
+        # Call the display board funtion which handles all of the functionality
+        # for actually displaying the updates to the board
+        self.displayBoard(self.ind)
+
+        # Increment the instruction index. Modulo for wrap around, so the animation
+        # plays on repeat
+        self.ind = (self.ind + 1) % len(self.steps)
+        return None
+
+    # This function is called once per game loop in the main.py file. It redraws the
+    # scene, the steps themselves are played by the step timer
     def update(self, board, size):
         self.mainBoardSize = size # update the board size variable to match the actual screen size
         self.mainDisplay = board # update the main display surface variable
@@ -362,22 +540,6 @@ class ButtonScene(SceneManager):
 
         self.Render(self.mainDisplay, None) # Render all of the buttons and the display Text
         self.mainDisplay.blit(self.table.screen, (x, 10)) # draw the table to the screen
-        
-        if (not self.paused): # if the game is paused, the board should not update
-
-            if (self.timer == 0): # every time the timer == 0, the board updates
-
-                # Call the display board funtion which handles all of the functionality
-                # for actually displaying the updates to the board
-                self.displayBoard(self.ind)
-
-                # Increment the instruction index. Modulo for wrap around, so the animation
-                # plays on repeat
-                self.ind = (self.ind + 1) % len(self.steps)
-                
-            # Increment the timer using modulo, so whenever (timer + 1) == updateSpeed,
-            # the result of modulo division will be 0, and the board will update
-            self.timer = (self.timer + 1) % self.updateSpeed
         return None
 '''
 class MainMenu(SceneManager):
@@ -407,23 +569,62 @@ class MainMenu(SceneManager):
         self.height = 720
 
         # defining a font
-        self.smallfont = pygame.font.SysFont('Corbel', 35)
-        self.input_smallfont = pygame.font.SysFont('Corbel', 24)
+        self.smallfont = getFont('Corbel', 35)
+        self.input_smallfont = getFont('Corbel', 24)
 
         # rendering a text written in
         # this font
-        self.encrypt = self.smallfont.render('encrypt', True, self.color)
-        self.decrypt = self.smallfont.render('decrypt', True, self.color)
-        self.message = self.smallfont.render("message", True, self.color_dark)
-        self.key = self.smallfont.render("key", True, self.color_dark)
-        self.title = self.smallfont.render("Vigenere Visualization Tool", True, self.color_dark)
-        self.error_message = self.smallfont.render("Error: please input a valid key/message", True, self.color_darkred)
-        self.menu = self.smallfont.render('Back to Main Menu', True, self.color)
+        self.encrypt = renderText(self.smallfont, 'encrypt', True, self.color)
+        self.decrypt = renderText(self.smallfont, 'decrypt', True, self.color)
+        self.message = renderText(self.smallfont, "message", True, self.color_dark)
+        self.key = renderText(self.smallfont, "key", True, self.color_dark)
+        self.title = renderText(self.smallfont, "Vigenere Visualization Tool", True, self.color_dark)
+        self.error_message = renderText(self.smallfont, "Error: please input a valid key/message", True, self.color_darkred)
+        self.menu = renderText(self.smallfont, 'Back to Main Menu', True, self.color)
 
 
         # Error boolean
         self.error = False
 
+        # sets the error message, colors and the user's input
+        self.Reset()
+
+        #A list of valid characters that can be input
+        self.validCharacters = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm',
+                                'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z',
+                                'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
+                                'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', ' ']
+
+        # where everything goes, as a fraction of the screen size plus an offset in pixels and a size.
+        # The rectangles are only worked out again when the screen size changes
+        self.layout = Layout()
+        self.layout.add('encrypt', 0.5, 1 / 1.7, 50, 0, 140, 40)
+        self.layout.add('decrypt', 0.5, 1 / 1.7, -200, 0, 140, 40)
+        self.layout.add('menu', 0.5, 1 / 1.3, -140, 0, 280, 40)
+        self.layout.add('message_input', 0.5, 1 / 4.2, -150, 0, 300, 40)
+        self.layout.add('key_input', 0.5, 1 / 2.5, -150, 0, 300, 40)
+        self.layout.add('message', 0.5, 1 / 3.5, -60)
+        self.layout.add('key', 0.5, 1 / 2.2, -30)
+        self.layout.add('title', 0.5, 1 / 8, -200)
+        self.layout.add('error', 0.5, 1 / 1.5, -275)
+
+        # the buttons are built once here, Layout() moves them when the screen size changes
+        self.widgets = WidgetTree()
+        # buttons whose hover state changed since the last frame, they are redrawn by Render
+        self.hover_changed = []
+        # the encrypt and decrypt buttons load button scene if input is valid
+        self.encrypt_button = self.widgets.add('encrypt', button(0, self.encrypt, lambda: pygame.quit(), textOffsetx=10, textOffsety=0))
+        self.decrypt_button = self.widgets.add('decrypt', button(0, self.decrypt, lambda: pygame.quit(), textOffsetx=10, textOffsety=0))
+        #The menu button to return to the main menu
+        self.menu_button = self.widgets.add('menu', button(0, self.menu, lambda: self.SwitchToScene("StartMenu")))
+        self.Layout()
+
+    def Reset(self):
+        # the error message is drawn on the background layer, so the layer is rebuilt if it was showing
+        if self.error:
+            self.InvalidateBackground()
+        self.error = False
+
         #Defining colors
         self.message_color = self.color
         self.key_color = self.color
@@ -436,28 +637,22 @@ class MainMenu(SceneManager):
         self.message_text = ''
         self.key_text = ''
 
-        #A list of valid characters that can be input
-        self.validCharacters = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm',
-                                'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z',
-                                'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
-                                'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', ' ']
+        #set whenever the input bars need to be redrawn (new text or a different bar selected)
+        self.inputs_changed = False
 
     def Input(self, events, pressed_keys, mouse):
         for ev in events:
-            # checks if a mouse is clicked
-            if ev.type == pygame.MOUSEBUTTONDOWN:
-                #check all buttons, if the mouse is hovering over it on this event, trigger click()
-                for i in self.buttons:
-                    if i.hover(mouse):
-                        i.click()
+            # the hover state of the buttons only changes when the mouse moves
+            if ev.type == pygame.MOUSEMOTION:
+                self.hover_changed += self.widgets.hoverAt(ev.pos)
 
-                # if the mouse is clicked on the Encryption button, load button scene if input is valid
-                if self.encrypt_rect.collidepoint(ev.pos):
-                    pygame.quit()
+            if ev.type == pygame.MOUSEBUTTONUP:
+                self.widgets.release()
 
-                # if the mouse is clicked on the Decryption button, load button scene if input is valid
-                if self.decrypt_rect.collidepoint(ev.pos):
-                    pygame.quit()
+            # checks if a mouse is clicked
+            if ev.type == pygame.MOUSEBUTTONDOWN:
+                #check the buttons under the mouse, and trigger click() on them
+                self.hover_changed += self.widgets.press(ev.pos)
 
                 #the input bar for the message, will deactivate when key input bar is activated
                 if self.message_rect.collidepoint(ev.pos):
@@ -465,6 +660,7 @@ class MainMenu(SceneManager):
                     self.message_color = self.color_light
                     self.key_color = self.color
                     self.key_active = False
+                    self.inputs_changed = True
 
                 #the input bar for the key, will deactivate when message input bar is activated
                 if self.key_rect.collidepoint(ev.pos):
@@ -472,6 +668,7 @@ class MainMenu(SceneManager):
                     self.key_color = self.color_light
                     self.message_color = self.color
                     self.message_active = False
+                    self.inputs_changed = True
 
             if ev.type == pygame.KEYDOWN:
                 #if the user has selected the message bar to type into, display on screen and update message_text
@@ -482,6 +679,7 @@ class MainMenu(SceneManager):
                     #check if valid input/not too long
                     elif ev.unicode in self.validCharacters and len(self.message_text) <= 19:
                         self.message_text += ev.unicode
+                    self.inputs_changed = True
 
                 #if the user has selected the key bar to type into, display on screen and update key_text
                 elif self.key_active:
@@ -491,77 +689,87 @@ class MainMenu(SceneManager):
                     #check if valid input/not too long
                     elif ev.unicode in self.validCharacters and len(self.key_text) <= 19:
                         self.key_text += ev.unicode
+                    self.inputs_changed = True
+
+    def Layout(self):
+        # the buttons and input bars are moved to the rectangles solved for the new screen size
+        rects = self.layout.solve((self.width, self.height))
+        self.encrypt_button.place(rects['encrypt'])
+        self.decrypt_button.place(rects['decrypt'])
+        self.menu_button.place(rects['menu'])
+        self.message_rect = rects['message_input']
+        self.key_rect = rects['key_input']
+        self.widgets.reindex()
 
     def Render(self, screen, mouse):
+        if self.full_redraw:
+            # the buttons may have moved, so their hover state is looked up again
+            self.widgets.hoverAt(mouse)
+            self.hover_changed = []
+
+            # the static content is copied from the background layer, and only the hovered
+            # buttons and the input bars are drawn on top of it
+            screen.blit(self.GetBackground(screen), (0, 0))
+            for i in self.widgets.hovered:
+                i.draw(screen)
+            self.drawInputs(screen)
+            self.inputs_changed = False
+            return
+
+        # only redraw the parts of the scene that changed since the last frame.
+        # Only the buttons the mouse moved on or off of are redrawn
+        for i in self.hover_changed:
+            self.MarkDirty(i.draw(screen))
+        self.hover_changed = []
+
+        if self.inputs_changed:
+            for rect in self.drawInputs(screen):
+                self.MarkDirty(rect)
+            self.inputs_changed = False
+
+    def DrawBackground(self, surface):
         # fills the screen with a color
-        screen.fill((255, 255, 165))
-
-        pygame.draw.rect
-        #define the encrypt button here to update the position if screen size changes
-        self.encrypt_rect = pygame.Rect(self.width / 2 + 50, self.height / 1.7, 140, 40)
-        #define the decrypt button here to update the position if screen size changes
-        self.decrypt_rect = pygame.Rect(self.width / 2 - 200, self.height / 1.7, 140, 40)
-        #define the message input rect here to update the position if screen size changes
-        self.message_rect = pygame.Rect(self.width / 2 - 150, self.height / 4.2, 300, 40)
-        # define the key input rect here to update the position if screen size changes
-        self.key_rect = pygame.Rect(self.width / 2 - 150, self.height / 2.5, 300, 40)
-        #The menu button to return to the main menu is defined hre to update position
-        menu_button = button(self.height / 1.3, self.menu, lambda: self.SwitchToScene(StartMenu()), self.width / 2 - 140,
-                             280, 40)
-        #the list of buttons in our scene
-        self.buttons = [menu_button]
-        #draw all buttons in the scene
-        for i in self.buttons:
-            i.draw(screen)
-
-        # if mouse is hovered over encrypt it
-        # changes to lighter shade
-        if self.width / 2 + 50 <= mouse[0] <= self.width / 2 + 50 + 140 and self.height / 1.7 <= mouse[1] <= self.height / 1.7 + 40:
-            pygame.draw.rect(screen, self.color_light, self.encrypt_rect)
-
-        else:
-            pygame.draw.rect(screen, self.color_dark, self.encrypt_rect)
+        surface.fill((255, 255, 165))
 
-        # if mouse is hovered over decrypt it
-        # changes to lighter shade
-        if self.width / 2 - 200 <= mouse[0] <= self.width / 2 - 200 + 140 and self.height / 1.7 <= mouse[1] <= self.height / 1.7 + 40:
-            pygame.draw.rect(screen, self.color_light, self.decrypt_rect)
+        #draw all buttons in the scene in their normal state
+        self.widgets.draw(surface, False)
 
-        else:
-            pygame.draw.rect(screen, self.color_dark, self.decrypt_rect)
+        # superimposing the labels onto the scene
+        surface.blit(self.message, self.layout['message'])
+        surface.blit(self.key, self.layout['key'])
+        surface.blit(self.title, self.layout['title'])
+        #if there is invalid input, display an error message
+        if self.error:
+            surface.blit(self.error_message, self.layout['error'])
 
+    def drawInputs(self, screen):
+        """
+        Draws the message and key input bars with the text typed into them, returns the areas that were drawn on
+        """
         #the user's input is being defined as a font so that it can be displayed to the screen
-        message_input = self.input_smallfont.render(self.message_text, True, self.color_dark)
-        key_input = self.input_smallfont.render(self.key_text, True, self.color_dark)
+        message_input = renderText(self.input_smallfont, self.message_text, True, self.color_dark)
+        key_input = renderText(self.input_smallfont, self.key_text, True, self.color_dark)
 
         #Draw the input rectangles that we defined earlier
         pygame.draw.rect(screen, self.message_color, self.message_rect)
         pygame.draw.rect(screen, self.key_color, self.key_rect)
 
-        # superimposing text onto our buttons
-        screen.blit(self.encrypt, (self.encrypt_rect.x + 10, self.encrypt_rect.y))
-        screen.blit(self.decrypt, (self.decrypt_rect.x + 10, self.decrypt_rect.y))
-        screen.blit(self.message, (self.width / 2 - 60, self.height / 3.5))
-        screen.blit(self.key, (self.width / 2 - 30, self.height / 2.2))
-        screen.blit(self.title, (self.width / 2 - 200, self.height / 8))
         screen.blit(message_input, (self.message_rect.x + 10, self.message_rect.y + 10))
         screen.blit(key_input, (self.key_rect.x + 10, self.key_rect.y + 10))
-        #if there is invalid input, display an error message
-        if self.error:
-            screen.blit(self.error_message, (self.width / 2 - 275, self.height / 1.5))
+        return [self.message_rect, self.key_rect]
 
     # This function is used to update the screen size to reposition objects in our scene
     def update(self, board, size):
-        self.width = size[0]
-        self.height = size[1]
+        self.Resize(size)
 
 class StartMenu(SceneManager):
     """
     The first menu that is displayed when the program starts.
-    Defines 3 buttons:
+    Defines 4 buttons:
         1. Visualization button: loads MainMenu() for the user to use the visualization tool
         2. Info button: loads InfoMenu() for the user to learn about the system
-        3. Quit: quits the program
+        3. Calibrate button: loads LatencyCalibration() to measure the audio and input latency of the machine
+        4. Quit: quits the program
     """
     def __init__(self):
         SceneManager.__init__(self)
@@ -583,52 +791,94 @@ class StartMenu(SceneManager):
         self.height = 800
 
         # defining a font
-        self.importantfont = pygame.font.SysFont('Corbel', 45, bold=True)
-        self.smallfont = pygame.font.SysFont('Corbel', 35)
-        self.input_smallfont = pygame.font.SysFont('Corbel', 24)
+        self.importantfont = getFont('Corbel', 45, bold=True)
+        self.smallfont = getFont('Corbel', 35)
+        self.input_smallfont = getFont('Corbel', 24)
 
         # rendering a text written in
         # this font
-        self.title = self.smallfont.render("Vigenere Visualization Tool", True, self.color_dark)
-        self.menu = self.smallfont.render('Visualization Tool', True, self.color)
-        self.info = self.smallfont.render('Info', True, self.color)
-        self.quit = self.smallfont.render('Quit', True, self.color)
-        self.important = self.importantfont.render("Best used in fullscreen!", True, self.color_dark)
-        self.buttons = []
+        self.title = renderText(self.smallfont, "Vigenere Visualization Tool", True, self.color_dark)
+        self.menu = renderText(self.smallfont, 'Visualization Tool', True, self.color)
+        self.info = renderText(self.smallfont, 'Info', True, self.color)
+        self.calibrate = renderText(self.smallfont, 'Calibrate', True, self.color)
+        self.quit = renderText(self.smallfont, 'Quit', True, self.color)
+        self.important = renderText(self.importantfont, "Best used in fullscreen!", True, self.color_dark)
+
+        # where everything goes, as a fraction of the screen size plus an offset in pixels and a size.
+        # The buttons are stacked in the middle of the screen
+        self.layout = Layout()
+        self.layout.add('menu', 0.5, 1 / 4.2, -140, 0, 250, 40)
+        self.layout.add('info', 0.5, 1 / 2.7, -140, 0, 250, 40)
+        self.layout.add('calibrate', 0.5, 1 / 2, -140, 0, 250, 40)
+        self.layout.add('quit', 0.5, 1 / 1.6, -140, 0, 250, 40)
+        self.layout.add('title', 0.5, 1 / 8, -200)
+        self.layout.add('important', 0.5, 1 / 1.3, -225)
+
+        # the buttons are built once here, Layout() moves them when the screen size changes
+        self.widgets = WidgetTree()
+        # buttons whose hover state changed since the last frame, they are redrawn by Render
+        self.hover_changed = []
+        self.menu_button = self.widgets.add('menu', button(0, self.menu, lambda: self.SwitchToScene("MainMenu")))
+        self.info_button = self.widgets.add('info', button(0, self.info, lambda: pygame.quit(), textOffsetx=100))
+        self.calibrate_button = self.widgets.add('calibrate', button(0, self.calibrate,
+                                                                     lambda: self.SwitchToScene("Calibration"),
+                                                                     textOffsetx=65))
+        self.quit_button = self.widgets.add('quit', button(0, self.quit, lambda: pygame.quit(), textOffsetx=100))
+        self.Layout()
 
 
     def Input(self, events, pressed_keys, mouse):
         for ev in events:
+            # the hover state of the buttons only changes when the mouse moves
+            if ev.type == pygame.MOUSEMOTION:
+                self.hover_changed += self.widgets.hoverAt(ev.pos)
+
+            if ev.type == pygame.MOUSEBUTTONUP:
+                self.widgets.release()
+
             # checks if a mouse is clicked
             if ev.type == pygame.MOUSEBUTTONDOWN:
                 # if mouse is clicked while hovering over a button, call the click() function
-                for i in self.buttons:
-                    if i.hover(mouse):
-                        i.click()
+                self.hover_changed += self.widgets.press(ev.pos)
 
+    def Layout(self):
+        # the buttons are moved to the rectangles solved for the new screen size
+        rects = self.layout.solve((self.width, self.height))
+        self.menu_button.place(rects['menu'])
+        self.info_button.place(rects['info'])
+        self.calibrate_button.place(rects['calibrate'])
+        self.quit_button.place(rects['quit'])
+        self.widgets.reindex()
 
     def Render(self, screen, mouse):
+        if self.full_redraw:
+            # the buttons may have moved, so their hover state is looked up again
+            self.widgets.hoverAt(mouse)
+            self.hover_changed = []
+
+            # the static content is copied from the background layer, and only the hovered
+            # buttons are drawn on top of it
+            screen.blit(self.GetBackground(screen), (0, 0))
+            for i in self.widgets.hovered:
+                i.draw(screen)
+            return
+
+        # only the buttons the mouse moved on or off of are redrawn
+        for i in self.hover_changed:
+            self.MarkDirty(i.draw(screen))
+        self.hover_changed = []
+
+    def DrawBackground(self, surface):
         # fills the screen with a color
-        screen.fill((255, 255, 165))
-
-        pygame.draw.rect
-        #buttons defined here to update when screen changes size
-        menu_button = button(self.height / 4.2, self.menu, lambda: self.SwitchToScene(MainMenu()), self.width / 2 - 140,
-                             250, 40)
-        info_button = button(self.height / 2.7, self.info, lambda: pygame.quit(), self.width / 2 - 140,
-                             250, 40, 100)
-        quit_button = button(self.height / 2, self.quit, lambda: pygame.quit(), self.width / 2 - 140, 250, 40, 100)
-        self.buttons = [menu_button, info_button, quit_button]
-        #draw all buttons in the scene
-        for i in self.buttons:
-            i.draw(screen)
+        surface.fill((255, 255, 165))
+        #draw all buttons in the scene in their normal state
+        self.widgets.draw(surface, False)
         #render our title and fullscreen suggestion
-        screen.blit(self.title, (self.width / 2 - 200, self.height / 8))
-        screen.blit(self.important, (self.width / 2 - 225, self.height / 1.5))
+        surface.blit(self.title, self.layout['title'])
+        surface.blit(self.important, self.layout['important'])
 
     def update(self, screen, cursize):
-        self.width = cursize[0]
-        self.height = cursize[1]
+        self.Resize(cursize)
 '''
 class InfoMenu(SceneManager):
     """
@@ -690,7 +940,7 @@ class InfoMenu(SceneManager):
         use_button = button(self.height / 2.8, self.use, lambda: self.SwitchToScene(Use()), self.width / 2 - 140,
                             250, 40, 20)
 
-        menu_button = button(self.height / 2, self.menu, lambda: self.SwitchToScene(StartMenu()),
+        menu_button = button(self.height / 2, self.menu, lambda: self.SwitchToScene(StartMenu),
                              self.width / 2 - 140,
                              250, 40, 70)
 
@@ -786,7 +1036,7 @@ class Use(SceneManager):
         # fills the screen with a color
         screen.fill((255, 255, 165))
         # buttons and their locations/functions
-        menu_button = button(self.height / 1.1, self.menu, lambda: self.SwitchToScene(StartMenu()), self.width / 2 + 350,
+        menu_button = button(self.height / 1.1, self.menu, lambda: self.SwitchToScene(StartMenu), self.width / 2 + 350,
                              170, 40)
         other_button = button(self.height / 1.1, self.other, lambda: self.SwitchToScene(About()),
                              self.width / 2 - 500, 270, 40)
@@ -907,7 +1157,7 @@ class About(SceneManager):
         # fills the screen with a color
         screen.fill((255, 255, 165))
         # buttons and their locations/functions
-        menu_button = button(self.height / 1.1, self.menu, lambda: self.SwitchToScene(StartMenu()), self.width / 2 + 350,
+        menu_button = button(self.height / 1.1, self.menu, lambda: self.SwitchToScene(StartMenu), self.width / 2 + 350,
                              170, 40)
         other_button = button(self.height / 1.1, self.other, lambda: self.SwitchToScene(Use()),
                              self.width / 2 - 500, 240, 40)   
@@ -939,4 +1189,12 @@ class About(SceneManager):
     def update(self, board, size):
         self.width = size[0]
         self.height = size[1]
-'''
\ No newline at end of file
+'''
+
+
+# the scenes that can be switched to by name. Scenes are kept alive after they are left, and the
+# scenes listed in prefetch are built during idle frames so switching to them is instant
+registry.register("StartMenu", StartMenu, prefetch=["MainMenu"])
+registry.register("MainMenu", MainMenu, prefetch=["StartMenu"])
+# the calibration is rarely opened, so its module (and the audio code) is only imported when it is
+registry.register("Calibration", "calibration:LatencyCalibration", retain=False)
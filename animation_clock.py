@@ -0,0 +1,188 @@
+import time
+"""
+This file defines the AnimationClock() class, a clock based on time.perf_counter() that scenes use to run
+steps at fixed intervals (animation steps, beats) no matter how fast the screen is being redrawn.
+Steps are scheduled on absolute times (start + n * interval), so they do not drift when frames are late,
+and the clock can be paused and resumed without the steps jumping ahead.
+"""
+
+# what a timer does when the game loop was too slow and more than one step is due at once:
+# CATCH_UP runs every missed step (up to max_catch_up), SKIP runs a single step and drops the rest
+CATCH_UP = "catch_up"
+SKIP = "skip"
+
+
+class AnimationClock():
+    """
+    Use this class to schedule timed steps. The game loop calls tick() once per frame
+    """
+    def __init__(self, time_function=time.perf_counter):
+        """
+        time_function: returns the current time in seconds, can be replaced for testing
+        """
+        self.time_function = time_function
+        self.timers = []
+
+        # the clock does not move while paused. paused_total is how long it has been paused altogether
+        self.paused_at = None
+        self.paused_total = 0.0
+
+    def now(self):
+        """
+        Returns the time of the clock in seconds, which does not count the time spent paused
+        """
+        if self.paused_at is not None:
+            return self.paused_at - self.paused_total
+        return self.time_function() - self.paused_total
+
+    def pause(self):
+        """
+        Stops the clock, no steps run until resume() is called
+        """
+        if self.paused_at is None:
+            self.paused_at = self.time_function()
+
+    def resume(self):
+        """
+        Starts the clock again where it was paused
+        """
+        if self.paused_at is not None:
+            self.paused_total += self.time_function() - self.paused_at
+            self.paused_at = None
+
+    def isPaused(self):
+        return self.paused_at is not None
+
+    def schedule(self, interval, callback, policy=CATCH_UP, max_catch_up=10):
+        """
+        Calls callback every interval seconds, starting one interval from now
+        interval: the time between steps in seconds
+        callback: the function called for every step
+        policy: CATCH_UP or SKIP, what to do when more than one step is due in a frame
+        max_catch_up: the most steps CATCH_UP runs in one frame, the rest are dropped
+        returns the Timer, which can be paused, changed or cancelled
+        """
+        timer = Timer(self, interval, callback, policy, max_catch_up)
+        self.timers.append(timer)
+        return timer
+
+    def cancel(self, timer):
+        """
+        Stops a timer for good
+        """
+        if timer in self.timers:
+            self.timers.remove(timer)
+
+    def tick(self):
+        """
+        Runs every step that is due. Called once per frame by the game loop
+        returns how many steps were run
+        """
+        if self.paused_at is not None:
+            return 0
+        now = self.now()
+        steps = 0
+        for timer in list(self.timers):
+            steps += timer.advance(now)
+        return steps
+
+    def isActive(self):
+        """
+        Returns True if there are running timers, so the game loop knows to keep drawing frames
+        """
+        return self.paused_at is None and any(not timer.paused for timer in self.timers)
+
+    def timeUntilNext(self):
+        """
+        Returns the seconds until the next step is due, or None if no timer is running
+        """
+        if not self.isActive():
+            return None
+        now = self.now()
+        return max(0.0, min(timer.nextTime() - now for timer in self.timers if not timer.paused))
+
+
+class Timer():
+    """
+    A step that repeats every interval seconds on an AnimationClock. Created with AnimationClock.schedule()
+    """
+    def __init__(self, clock, interval, callback, policy, max_catch_up):
+        self.clock = clock
+        self.interval = interval
+        self.callback = callback
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.paused = False
+
+        # step number count is due at start + count * interval
+        self.start = clock.now()
+        self.count = 0
+        self.paused_at = None
+
+    def nextTime(self):
+        """
+        Returns the clock time the next step is due at
+        """
+        return self.start + (self.count + 1) * self.interval
+
+    def advance(self, now):
+        """
+        Runs the steps that are due at clock time now, returns how many were run
+        """
+        if self.paused:
+            return 0
+        # the small tolerance keeps rounding errors from making a step that is due right now wait another frame
+        due = int((now - self.start) / self.interval + 1e-9) - self.count
+        if due <= 0:
+            return 0
+
+        # the missed steps are always counted, so the timer stays on its schedule
+        self.count += due
+        if self.policy == SKIP:
+            steps = 1
+        else:
+            steps = min(due, self.max_catch_up)
+        for i in range(steps):
+            self.callback()
+        return steps
+
+    def setInterval(self, interval):
+        """
+        Changes the time between steps. The time already waited towards the next step is kept
+        as a fraction of the interval, so speeding up or slowing down does not skip or repeat a step
+        """
+        now = self.paused_at if self.paused else self.clock.now()
+        progress = (now - self.start) / self.interval - self.count
+        self.interval = interval
+        self.start = now - progress * interval
+        self.count = 0
+
+    def pause(self):
+        """
+        Stops this timer only, the clock and other timers keep running
+        """
+        if not self.paused:
+            self.paused = True
+            self.paused_at = self.clock.now()
+
+    def resume(self):
+        """
+        Starts this timer again where it was paused
+        """
+        if self.paused:
+            self.start += self.clock.now() - self.paused_at
+            self.paused = False
+            self.paused_at = None
+
+    def restart(self):
+        """
+        Starts counting from now, the next step is one interval away
+        """
+        self.start = self.clock.now()
+        self.count = 0
+        if self.paused:
+            self.paused_at = self.start
+
+
+# the clock shared by every scene
+clock = AnimationClock()
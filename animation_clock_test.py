@@ -0,0 +1,108 @@
+"""
+Description: Tests for the AnimationClock class used to time animation steps.
+"""
+from animation_clock import *
+import pytest
+
+
+class FakeTime:
+    """
+    A time function that only moves when the test says so
+    """
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAnimationClock:
+    def setup_method(self):
+        self.time = FakeTime()
+        self.clock = AnimationClock(self.time)
+        self.steps = []
+
+    def step(self):
+        self.steps.append(self.clock.now())
+
+    def test_noStepBeforeInterval(self):
+        self.clock.schedule(0.5, self.step)
+        self.time.now += 0.49
+        assert self.clock.tick() == 0
+        self.time.now += 0.01
+        assert self.clock.tick() == 1
+
+    def test_noDrift(self):
+        # late frames do not push the following steps back
+        self.clock.schedule(0.1, self.step)
+        for i in range(100):
+            self.time.now += 0.0333
+            self.clock.tick()
+        assert len(self.steps) == int(100 * 0.0333 / 0.1)
+
+    def test_catchUp(self):
+        self.clock.schedule(0.1, self.step, policy=CATCH_UP)
+        self.time.now += 0.35
+        assert self.clock.tick() == 3
+
+    def test_catchUpLimit(self):
+        # steps over the limit are dropped, the timer stays on its schedule
+        timer = self.clock.schedule(0.1, self.step, policy=CATCH_UP, max_catch_up=2)
+        self.time.now += 1.05
+        assert self.clock.tick() == 2
+        self.time.now += 0.05
+        assert self.clock.tick() == 1
+
+    def test_skip(self):
+        self.clock.schedule(0.1, self.step, policy=SKIP)
+        self.time.now += 0.35
+        assert self.clock.tick() == 1
+        self.time.now += 0.05
+        assert self.clock.tick() == 1
+
+    def test_pauseClock(self):
+        self.clock.schedule(0.5, self.step)
+        self.time.now += 0.25
+        self.clock.pause()
+        self.time.now += 10
+        assert self.clock.tick() == 0
+        assert not self.clock.isActive()
+        self.clock.resume()
+        self.time.now += 0.24
+        assert self.clock.tick() == 0
+        self.time.now += 0.01
+        assert self.clock.tick() == 1
+
+    def test_pauseTimer(self):
+        timer = self.clock.schedule(0.5, self.step)
+        other = self.clock.schedule(0.5, self.step)
+        timer.pause()
+        self.time.now += 0.5
+        assert self.clock.tick() == 1
+        timer.resume()
+        self.time.now += 0.5
+        assert self.clock.tick() == 2
+
+    def test_setInterval(self):
+        # the time already waited is kept as a fraction of the new interval
+        timer = self.clock.schedule(1.0, self.step)
+        self.time.now += 0.5
+        timer.setInterval(0.5)
+        self.time.now += 0.24
+        assert self.clock.tick() == 0
+        self.time.now += 0.01
+        assert self.clock.tick() == 1
+
+    def test_cancel(self):
+        timer = self.clock.schedule(0.1, self.step)
+        self.clock.cancel(timer)
+        self.time.now += 1
+        assert self.clock.tick() == 0
+        assert not self.clock.isActive()
+
+    def test_timeUntilNext(self):
+        assert self.clock.timeUntilNext() is None
+        self.clock.schedule(0.5, self.step)
+        self.clock.schedule(0.2, self.step)
+        self.time.now += 0.15
+        assert self.clock.timeUntilNext() == pytest.approx(0.05)
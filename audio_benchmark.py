@@ -0,0 +1,252 @@
+"""
+Headless audio benchmark for the rhythm engine.
+Runs the audio code without a sound card, on SDL's dummy or disk audio driver (both play in real time, the disk
+driver also writes the mixed audio to a file), and reports:
+    - how late the beat scheduler plays thousands of beats, while the main thread is busy like a game frame
+    - blocks the polyphonic mixer did not have ready in time (underruns) and how long a block takes to mix
+    - how many notes per second can be synthesized and turned into sounds
+    - the hit rate of the note cache for a melody played by a student
+The report is JSON so results from different versions can be compared.
+
+Usage:
+    python audio_benchmark.py [--driver dummy|disk] [--beats N] [--output results.json]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# keeps pygame's greeting out of the report when it is printed
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import time
+import numpy as np
+import pygame
+from beat_scheduler import BeatScheduler
+from poly_mixer import PolyMixer
+from benchmark_stats import summary
+from synth import initMixer, synthesize, toSound, timbres, NoteCache
+
+# the pitches the activities play, from C2 to C7
+PITCHES = range(36, 97)
+
+
+def lateness(records):
+    """
+    Returns how late every record from BeatScheduler.getDispatched() was played, in milliseconds
+    """
+    return [(dispatch - due) * 1000 for due, dispatch, sound in records]
+
+
+def busyFrame(seconds):
+    """
+    Keeps the main thread busy for a number of seconds, the way drawing a frame does
+    """
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+# ------------------------ Benchmarks --------------
+
+def benchmarkScheduler(beats, interval, frame_load):
+    """
+    Schedules beats every interval seconds and measures how late each one is played
+    frame_load: the part of every 33 ms frame the main thread spends busy while the beats play, from 0 to 1
+    """
+    scheduler = BeatScheduler()
+    scheduler.start()
+    sound = toSound(synthesize(84, 0.03, "square"))[0]
+
+    start = time.perf_counter() + 0.2
+    scheduler.schedulePattern(start, [i * interval for i in range(beats)], sound)
+    end = start + beats * interval + 0.1
+
+    # the records are collected every frame, since the scheduler only keeps the last 4096
+    records = []
+    frame = 1 / 30
+    while time.perf_counter() < end:
+        busyFrame(frame * frame_load)
+        time.sleep(frame * (1 - frame_load))
+        records.extend(scheduler.getDispatched())
+    scheduler.stop()
+    records.extend(scheduler.getDispatched())
+
+    late = lateness(records)
+    return {
+        "beats": beats,
+        "interval_ms": interval * 1000,
+        "frame_load": frame_load,
+        "dispatched": len(records),
+        "dropped": beats - len(records),
+        "late_ms": summary(late),
+        "early": sum(1 for value in late if value < 0),
+    }
+
+
+class TimedMixer(PolyMixer):
+    """
+    A PolyMixer that records how long every block takes to mix
+    """
+    def __init__(self, *args, **kwargs):
+        PolyMixer.__init__(self, *args, **kwargs)
+        self.render_times = []
+
+    def render(self, frames=None):
+        start = time.perf_counter()
+        block = PolyMixer.render(self, frames)
+        self.render_times.append(time.perf_counter() - start)
+        return block
+
+
+def benchmarkMixer(seconds, voices, notes_per_second):
+    """
+    Plays random notes on the polyphonic mixer for a number of seconds and counts the underruns
+    voices: the most notes that sound at once, more notes than this steal voices
+    notes_per_second: how many new notes start every second
+    """
+    mixer = TimedMixer(max_voices=voices)
+    mixer.start()
+    names = list(timbres)
+    rng = random.Random(1)
+
+    held = []
+    played = 0
+    start = time.perf_counter()
+    next_note = start
+    while time.perf_counter() - start < seconds:
+        now = time.perf_counter()
+        while next_note <= now:
+            held.append(mixer.noteOn(rng.choice(PITCHES), rng.uniform(0.3, 1.0), rng.choice(names)))
+            played += 1
+            next_note += 1 / notes_per_second
+        # notes are held for about a second before they are let go
+        while len(held) > notes_per_second:
+            mixer.noteOff(held.pop(0))
+        time.sleep(0.005)
+    mixer.stop()
+
+    block_ms = mixer.block_frames / mixer.rate * 1000
+    render_ms = [value * 1000 for value in mixer.render_times]
+    return {
+        "seconds": seconds,
+        "max_voices": voices,
+        "notes": played,
+        "blocks": len(render_ms),
+        "block_ms": block_ms,
+        "underruns": mixer.underruns,
+        "render_ms": summary(render_ms),
+        # how many times faster than real time the worst block was mixed
+        "headroom": block_ms / max(max(render_ms, default=0.0), 1e-9),
+    }
+
+
+def benchmarkSynthesis(notes, duration):
+    """
+    Synthesizes notes of every timbre and turns them into sounds, returns how many notes per second that is
+    """
+    rate = initMixer()[0]
+    names = list(timbres)
+    start = time.perf_counter()
+    for i in range(notes):
+        toSound(synthesize(PITCHES[i % len(PITCHES)], duration, names[i % len(names)], rate))
+    elapsed = time.perf_counter() - start
+    return {
+        "notes": notes,
+        "note_seconds": duration,
+        "notes_per_second": notes / elapsed,
+        "realtime_factor": notes * duration / elapsed,
+    }
+
+
+def benchmarkCache(notes, max_bytes):
+    """
+    Looks up a long melody in a new note cache. The melody mostly moves by small steps around a few pitches,
+    the way students play, so some notes come up much more often than others
+    """
+    cache = NoteCache(max_bytes)
+    # the note bank is left out so misses measure synthesis
+    cache.bank = False
+    rng = random.Random(2)
+
+    pitch = 60
+    hit_times = []
+    miss_times = []
+    for i in range(notes):
+        pitch = min(max(pitch + rng.choice((-2, -1, -1, 0, 1, 1, 2)), 48), 84)
+        duration = rng.choice((0.25, 0.5, 0.5, 1.0))
+        misses = cache.misses
+        start = time.perf_counter()
+        cache.get(pitch, duration)
+        elapsed = (time.perf_counter() - start) * 1000
+        (miss_times if cache.misses > misses else hit_times).append(elapsed)
+
+    return {
+        "lookups": notes,
+        "max_bytes": max_bytes,
+        "hits": cache.hits,
+        "misses": cache.misses,
+        "hit_rate": cache.hits / max(notes, 1),
+        "cached_notes": len(cache.sounds),
+        "hit_ms": summary(hit_times),
+        "miss_ms": summary(miss_times),
+    }
+
+
+def benchmark(args):
+    """
+    Runs every benchmark, returns the report as a dictionary
+    """
+    frequency, size, channels = initMixer()
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "sdl": ".".join(str(i) for i in pygame.get_sdl_version()),
+            "platform": platform.platform(),
+            "audio_driver": os.environ.get("SDL_AUDIODRIVER"),
+            "mixer": {"frequency": frequency, "size": size, "channels": channels},
+        },
+        "scheduler": benchmarkScheduler(args.beats, args.interval, args.frame_load),
+        "mixer": benchmarkMixer(args.mixer_seconds, args.voices, args.notes_per_second),
+        "synthesis": benchmarkSynthesis(args.synth_notes, 0.5),
+        "cache": benchmarkCache(args.cache_notes, args.cache_bytes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless audio benchmark for the rhythm engine")
+    parser.add_argument("--driver", choices=("dummy", "disk"), default="dummy",
+                        help="the SDL audio driver (default %(default)s). disk writes the audio to SDL_DISKAUDIOFILE")
+    parser.add_argument("--beats", type=int, default=2000, help="how many beats are scheduled")
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between beats")
+    parser.add_argument("--frame-load", type=float, default=0.5,
+                        help="the part of every frame the main thread is busy, from 0 to 1")
+    parser.add_argument("--mixer-seconds", type=float, default=5.0, help="how long the mixer plays notes")
+    parser.add_argument("--voices", type=int, default=64, help="the most notes the mixer plays at once")
+    parser.add_argument("--notes-per-second", type=int, default=40, help="new notes the mixer starts every second")
+    parser.add_argument("--synth-notes", type=int, default=300, help="how many notes are synthesized")
+    parser.add_argument("--cache-notes", type=int, default=5000, help="how many notes are looked up in the cache")
+    parser.add_argument("--cache-bytes", type=int, default=8 * 1024 * 1024, help="the size of the note cache")
+    parser.add_argument("--output", help="write the JSON report to this file instead of printing it")
+    args = parser.parse_args()
+
+    # the driver is picked when the mixer starts, so this only has to happen before initMixer()
+    os.environ["SDL_AUDIODRIVER"] = args.driver
+    if args.driver == "disk":
+        os.environ.setdefault("SDL_DISKAUDIOFILE", os.devnull)
+
+    report = benchmark(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
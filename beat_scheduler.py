@@ -0,0 +1,241 @@
+import heapq
+import itertools
+import sys
+import threading
+import time
+import pygame
+from collections import deque
+from mspawn_p2 import QueueIsEmpty
+from synth import reserveChannels
+from latency import latency_store
+"""
+This file defines the BeatScheduler() class, which plays sounds at exact times for the rhythm activities.
+Playing a sound from a scene's update() can be up to a whole frame late (33 ms at 30 FPS), so beats are put in
+a time-ordered queue instead, and a background thread plays each one on a dedicated mixer channel when it
+is due, no matter how long the frames take. The time every beat was actually played is recorded so the
+scheduling jitter can be checked.
+"""
+class EventQueue():
+    """
+    Queue of timed events where the earliest event always comes out first. This replaces
+    mspawn_p2.PriorityQueue for timed events: it has no capacity, inserting and removing are O(log n)
+    with heapq, and events due at the same time come out in the order they were added
+    """
+    def __init__(self):
+        self.heap = []
+
+        # breaks ties between events due at the same time, so they keep their order
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def push(self, when, event):
+        """
+        Adds an event that is due at time when (in seconds)
+        """
+        heapq.heappush(self.heap, (when, next(self.counter), event))
+
+    def peekTime(self):
+        """
+        Returns the time of the earliest event, or None if the queue is empty
+        """
+        if not self.heap:
+            return None
+        return self.heap[0][0]
+
+    def pop(self):
+        """
+        Removes the earliest event and returns (when, event)
+        """
+        if not self.heap:
+            raise QueueIsEmpty("Tried to pop from an empty event queue")
+        when, order, event = heapq.heappop(self.heap)
+        return when, event
+
+    def popUntil(self, until):
+        """
+        Removes every event due at or before time until and returns them as a list of (when, event), earliest first
+        """
+        due = []
+        while self.heap and self.heap[0][0] <= until:
+            when, order, event = heapq.heappop(self.heap)
+            due.append((when, event))
+        return due
+
+    def clear(self):
+        self.heap.clear()
+
+
+class BeatScheduler():
+    """
+    Use this class to play sounds at exact times. Times are in seconds on the time.perf_counter() clock
+    """
+    def __init__(self, channels=4, lookahead=0.02, lead=0.0, spin=0.002):
+        """
+        channels: how many mixer channels are reserved for the scheduler, so sounds played anywhere else
+        never take them over
+        lookahead: how many seconds ahead the thread takes events out of the queue. Events scheduled later
+        than that can still be moved or cancelled
+        lead: how many seconds before its time each sound is started, to make up for the delay of the audio
+        output. Measure it with the latency calibration. With the whole offset of the machine as the lead, taps
+        line up with the times the beats were scheduled for
+        spin: the thread sleeps until this many seconds before a sound is due and then waits in a loop,
+        since sleeping is not precise enough on every system
+        """
+        self.channel_count = channels
+        self.lookahead = lookahead
+        self.lead = lead
+        self.spin = spin
+
+        self.queue = EventQueue()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.channels = []
+        self.next_channel = 0
+
+        # (due time, dispatch time, sound) of every sound that was played, see getDispatched()
+        self.dispatched = deque(maxlen=4096)
+
+    def start(self):
+        """
+        Starts the mixer and the scheduling thread
+        """
+        if self.running:
+            return
+        reserveChannels(self.channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+
+        # Python lets a thread run for 5 ms before switching to another one, which would let a slow frame
+        # delay a beat. Switching more often keeps the scheduler thread within about a millisecond
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(0.0005)
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="BeatScheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the scheduling thread and drops the beats that have not been played
+        """
+        if not self.running:
+            return
+        with self.condition:
+            self.running = False
+            self.queue.clear()
+            self.condition.notify()
+        self.thread.join()
+        self.thread = None
+        sys.setswitchinterval(self.switch_interval)
+
+    def schedule(self, when, sound, channel=None, volume=1.0):
+        """
+        Plays a sound at a time
+        when: the time.perf_counter() time the sound should start at
+        sound: the pygame.mixer.Sound to play
+        channel: the number of the reserved channel to play on, for example one per drum. If None the
+        channels are taken in turn
+        volume: the volume of the channel, from 0 to 1
+        """
+        self.checkChannel(channel)
+        with self.condition:
+            self.queue.push(when, (sound, channel, volume))
+            # wakes the thread up in case this beat is earlier than the one it is waiting for
+            self.condition.notify()
+
+    def schedulePattern(self, start, offsets, sound, channel=None, volume=1.0):
+        """
+        Plays a sound at every offset (in seconds) from start, for example the beats of a rhythm
+        """
+        self.checkChannel(channel)
+        with self.condition:
+            for offset in offsets:
+                self.queue.push(start + offset, (sound, channel, volume))
+            self.condition.notify()
+
+    def checkChannel(self, channel):
+        """
+        Raises ValueError if channel is not None or the number of one of the reserved channels. This is checked
+        when a sound is scheduled, since an error on the scheduling thread would stop every beat after it
+        """
+        if channel is not None and (not isinstance(channel, int) or channel not in range(self.channel_count)):
+            raise ValueError(f"channel {channel} is not one of the {self.channel_count} reserved channels")
+
+    def cancelAll(self):
+        """
+        Drops every beat that has not been played and stops the reserved channels
+        """
+        with self.condition:
+            self.queue.clear()
+        for channel in self.channels:
+            channel.stop()
+
+    def run(self):
+        """
+        The scheduling thread. Takes the beats inside the lookahead window out of the queue and plays each
+        one when it is due
+        """
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                next_time = self.queue.peekTime()
+                if next_time is None:
+                    self.condition.wait()
+                    continue
+                wait = next_time - self.lead - time.perf_counter() - self.lookahead
+                if wait > 0:
+                    # sleeps until the next beat is inside the window, or a new beat is added
+                    self.condition.wait(wait)
+                    continue
+                batch = self.queue.popUntil(time.perf_counter() + self.lookahead + self.lead)
+
+            for when, (sound, channel, volume) in batch:
+                self.dispatch(when, sound, channel, volume)
+
+    def dispatch(self, when, sound, channel, volume):
+        """
+        Waits until the sound is due and plays it
+        """
+        due = when - self.lead
+        remaining = due - time.perf_counter()
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        while time.perf_counter() < due:
+            pass
+
+        if channel is None:
+            channel = self.next_channel
+            self.next_channel = (self.next_channel + 1) % self.channel_count
+        mixer_channel = self.channels[channel]
+        mixer_channel.set_volume(volume)
+        mixer_channel.play(sound)
+        self.dispatched.append((when, time.perf_counter(), sound))
+
+    def getDispatched(self):
+        """
+        Returns (due time, dispatch time, sound) of the sounds played since the last call, and forgets them
+        """
+        records = []
+        while self.dispatched:
+            records.append(self.dispatched.popleft())
+        return records
+
+
+def jitter(records, lead=0.0):
+    """
+    Returns (mean, worst) of how late the sounds were dispatched in milliseconds, for records from getDispatched()
+    """
+    if not records:
+        return (0.0, 0.0)
+    late = [(dispatch - (due - lead)) * 1000 for due, dispatch, sound in records]
+    return (sum(late) / len(late), max(late, key=abs))
+
+
+# the scheduler shared by every activity, leading by the offset the calibration measured for this machine
+beat_scheduler = BeatScheduler(lead=latency_store.getOffset())
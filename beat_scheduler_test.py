@@ -0,0 +1,55 @@
+"""
+Description: Tests for the EventQueue class used to order timed beats.
+"""
+from beat_scheduler import *
+import pytest
+
+
+class TestEventQueue:
+    def test_popEmpty(self):
+        queue = EventQueue()
+        assert queue.isEmpty()
+        assert queue.peekTime() is None
+        with pytest.raises(QueueIsEmpty):
+            queue.pop()
+
+    def test_earliestFirst(self):
+        queue = EventQueue()
+        for when in [3.0, 1.0, 2.0, 0.5]:
+            queue.push(when, str(when))
+        assert queue.peekTime() == 0.5
+        assert [queue.pop()[0] for i in range(4)] == [0.5, 1.0, 2.0, 3.0]
+
+    def test_sameTimeKeepsOrder(self):
+        # events due at the same time come out in the order they were added, and are never compared
+        queue = EventQueue()
+        queue.push(1.0, {"beat": 1})
+        queue.push(1.0, {"beat": 2})
+        assert queue.pop()[1] == {"beat": 1}
+        assert queue.pop()[1] == {"beat": 2}
+
+    def test_popUntil(self):
+        queue = EventQueue()
+        for when in [0.4, 0.1, 0.3, 0.2]:
+            queue.push(when, when)
+        assert queue.popUntil(0.25) == [(0.1, 0.1), (0.2, 0.2)]
+        assert len(queue) == 2
+        assert queue.popUntil(0.0) == []
+
+
+class TestBeatScheduler:
+    @pytest.mark.parametrize("channel", [-1, 4, 1.5, "kick"])
+    def test_badChannel(self, channel):
+        # a bad channel is caught when the sound is scheduled, not on the scheduling thread
+        scheduler = BeatScheduler(channels=4)
+        with pytest.raises(ValueError):
+            scheduler.schedule(1.0, None, channel)
+        with pytest.raises(ValueError):
+            scheduler.schedulePattern(1.0, [0.0, 0.5], None, channel)
+        assert scheduler.queue.peekTime() is None
+
+    def test_goodChannel(self):
+        scheduler = BeatScheduler(channels=4)
+        scheduler.schedule(1.0, None, 3)
+        scheduler.schedulePattern(2.0, [0.0, 0.5], None)
+        assert len(scheduler.queue.popUntil(10.0)) == 3
@@ -0,0 +1,31 @@
+import math
+"""
+This file has the statistics shared by the benchmarks. It imports nothing from the game, so a benchmark only
+loads the code it measures.
+"""
+
+
+def percentile(values, p):
+    """
+    Returns the nearest-rank percentile p (0-100) of values: the smallest value that at least p percent of
+    the values are less than or equal to
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summary(values):
+    """
+    Returns the mean, percentiles and worst of a list of numbers as a dictionary
+    """
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
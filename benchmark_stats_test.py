@@ -0,0 +1,29 @@
+"""
+Description: Tests for the statistics shared by the benchmarks.
+"""
+from benchmark_stats import *
+import pytest
+
+
+class TestBenchmarkStats:
+    def test_percentileHundred(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+
+    def test_percentileTwenty(self):
+        # the 19th of 20 values, not the largest
+        values = list(range(20, 0, -1))
+        assert percentile(values, 95) == 19
+        assert percentile(values, 0) == 1
+
+    def test_percentileEmpty(self):
+        assert percentile([], 95) == 0.0
+
+    def test_summary(self):
+        assert summary([]) == {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        result = summary([float(i) for i in range(1, 21)])
+        assert result["mean"] == pytest.approx(10.5)
+        assert (result["p50"], result["p95"], result["p99"], result["max"]) == (10.0, 19.0, 20.0, 20.0)
@@ -30,17 +30,33 @@ class button():
         self.color_light = color_light
         self.color_dark = color_dark
 
-    def draw(self, screen):
+        # whether the mouse is over the button and whether the mouse button is held down on it.
+        # These are updated from mouse events by the scene's WidgetTree
+        self.hovered = False
+        self.pressed = False
+
+    def draw(self, screen, hovered=None):
         """
         draws the button rectangle and the button text onto the scene
+        hovered: draw the button as hovered (True) or not (False), by default its current hover state is used
+        returns the area of the screen that was drawn on
         """
-        if self.hover(pygame.mouse.get_pos()):
+        if hovered is None:
+            hovered = self.hovered
+        if hovered:
             # print(self.text, self.x1, self.x2, self.y1, self.y2)
             pygame.draw.rect(screen, self.color_light, [self.x1, self.y1, self.x2, self.y2])
         else:
             # print(self.text, self.x1, self.x2, self.y1, self.y2)
             pygame.draw.rect(screen, self.color_dark, [self.x1, self.y1, self.x2, self.y2])
         screen.blit(self.text, (self.x1 + self.textOffsetx, self.y1 + self.textOffsety))
+        return self.getRect()
+
+    def getRect(self):
+        """
+        Returns the area covered by the button as a pygame.Rect
+        """
+        return pygame.Rect(self.x1, self.y1, self.x2, self.y2)
 
     def hover(self, mouse):
         """
@@ -51,6 +67,20 @@ class button():
         else:
             return False
 
+    def setHover(self, hovered):
+        """
+        Stores whether the mouse is over the button, returns True if that changed so the button needs redrawing
+        """
+        changed = hovered != self.hovered
+        self.hovered = hovered
+        return changed
+
+    def place(self, rect):
+        """
+        Moves and resizes the button to rect, used by scenes to reposition their buttons when the screen is resized
+        """
+        self.x1, self.y1, self.x2, self.y2 = rect
+
     def click(self):
         """
         When the button is clicked on, call this function
@@ -0,0 +1,181 @@
+import pygame
+import time
+from SceneManager import SceneManager
+from button_class import button
+from widget_tree import WidgetTree
+from layout import Layout
+from font_cache import getFont, renderText
+from frame_scheduler import eventTime
+from beat_scheduler import beat_scheduler
+from synth import note_cache
+from latency import estimateOffset, latency_store
+"""
+This file defines the latency calibration activity. The student taps the space bar along with a steady click,
+and the difference between the clicks and the taps is stored as the latency offset of the machine.
+This module is imported by the scene registry the first time the activity is opened
+"""
+
+# how many clicks are played, and how far apart they are in seconds
+CLICKS = 16
+CLICK_INTERVAL = 0.6
+
+
+class LatencyCalibration(SceneManager):
+    """
+    The calibration activity. Defines 1 button:
+        1. Go Back: loads StartMenu()
+    """
+    def __init__(self):
+        SceneManager.__init__(self)
+        # white color
+        self.color = (255, 255, 255)
+
+        # dark shade of the button and the text
+        self.color_dark = (100, 100, 100)
+
+        # stores the size of the screen
+        self.width = 1100
+        self.height = 800
+
+        # defining a font
+        self.titlefont = getFont('Corbel', 45, bold=True)
+        self.smallfont = getFont('Corbel', 35)
+
+        # rendering a text written in this font
+        self.title = renderText(self.titlefont, "Latency Calibration", True, self.color_dark)
+        self.instructions = renderText(self.smallfont, "Press space to start, then tap space along with every click",
+                                       True, self.color_dark)
+        self.menu = renderText(self.smallfont, 'Go Back', True, self.color)
+
+        # where everything goes, see Layout
+        self.layout = Layout()
+        self.layout.add('title', 0.5, 1 / 8, -180)
+        self.layout.add('instructions', 0.5, 1 / 4, -400)
+        self.layout.add('status', 0.5, 1 / 2.5, -400, 0, 800, 40)
+        self.layout.add('menu', 0.5, 1 / 1.5, -140, 0, 250, 40)
+
+        self.widgets = WidgetTree()
+        self.hover_changed = []
+        self.menu_button = self.widgets.add('menu', button(0, self.menu, lambda: self.SwitchToScene("StartMenu"),
+                                                           textOffsetx=65))
+        self.Reset()
+        self.Layout()
+
+    def Reset(self):
+        # the times the clicks are played at and the times of the taps, both on the time.perf_counter() clock
+        self.beats = []
+        self.taps = []
+        self.running = False
+        self.setStatus("Offset for this machine: %.1f ms" % (latency_store.getOffset() * 1000))
+
+    def setStatus(self, text):
+        self.status = renderText(self.smallfont, text, True, self.color_dark)
+        self.status_changed = True
+
+    def start(self):
+        """
+        Schedules the clicks, starting one second from now so the student can get ready
+        """
+        click = note_cache.get(84, 0.05, "square")
+        beat_scheduler.start()
+        start = time.perf_counter() + 1.0
+        self.beats = [start + i * CLICK_INTERVAL for i in range(CLICKS)]
+        self.taps = []
+        # forgets the sounds played before, so finish() only sees the clicks
+        beat_scheduler.getDispatched()
+        beat_scheduler.schedulePattern(start, [i * CLICK_INTERVAL for i in range(CLICKS)], click)
+        self.running = True
+        self.setStatus("Tap along with the clicks")
+
+    def finish(self):
+        """
+        Works out the offset from the taps and stores it if the tapping was steady enough
+        """
+        self.running = False
+        # the taps are compared with the times the clicks were really played, so the lateness of the scheduler
+        # is not counted as latency of the machine. The clicks are played early by the lead of the scheduler
+        played = sorted(dispatch for due, dispatch, sound in beat_scheduler.getDispatched())
+        result = estimateOffset(played or [beat - beat_scheduler.lead for beat in self.beats], self.taps)
+        if result is None or len(self.taps) < CLICKS // 2:
+            self.setStatus("Not enough taps, press space to try again")
+            return
+        offset, spread = result
+        if spread > CLICK_INTERVAL / 6:
+            self.setStatus("The taps were not steady enough, press space to try again")
+            return
+        latency_store.setOffset(offset)
+        beat_scheduler.lead = offset
+        self.setStatus("Offset for this machine: %.1f ms (+/- %.1f ms)" % (offset * 1000, spread * 1000))
+
+    def Input(self, events, pressed_keys, mouse):
+        for ev in events:
+            if ev.type == pygame.MOUSEMOTION:
+                self.hover_changed += self.widgets.hoverAt(ev.pos)
+
+            if ev.type == pygame.MOUSEBUTTONUP:
+                self.widgets.release()
+
+            if ev.type == pygame.MOUSEBUTTONDOWN:
+                self.hover_changed += self.widgets.press(ev.pos)
+
+            if ev.type == pygame.KEYDOWN and ev.key == pygame.K_SPACE:
+                if self.running:
+                    # the time the key was read, not the time this frame started
+                    self.taps.append(eventTime(ev))
+                    self.setStatus("Taps: %d" % len(self.taps))
+                else:
+                    self.start()
+
+    def Layout(self):
+        rects = self.layout.solve((self.width, self.height))
+        self.menu_button.place(rects['menu'])
+        self.widgets.reindex()
+
+    def Render(self, screen, mouse):
+        if self.full_redraw:
+            self.widgets.hoverAt(mouse)
+            self.hover_changed = []
+            screen.blit(self.GetBackground(screen), (0, 0))
+            for i in self.widgets.hovered:
+                i.draw(screen)
+            screen.blit(self.status, self.layout['status'])
+            self.status_changed = False
+            return
+
+        for i in self.hover_changed:
+            self.MarkDirty(i.draw(screen))
+        self.hover_changed = []
+
+        # the status line is drawn over its part of the background
+        if self.status_changed:
+            rect = self.layout['status']
+            screen.blit(self.GetBackground(screen), rect, rect)
+            screen.blit(self.status, rect)
+            self.MarkDirty(rect)
+            self.status_changed = False
+
+    def DrawBackground(self, surface):
+        surface.fill((255, 255, 165))
+        self.widgets.draw(surface, False)
+        surface.blit(self.title, self.layout['title'])
+        surface.blit(self.instructions, self.layout['instructions'])
+
+    def update(self, screen, cursize):
+        self.Resize(cursize)
+        # the result is worked out once the last click has had time for its tap
+        if self.running and time.perf_counter() > self.beats[-1] + CLICK_INTERVAL / 2:
+            self.finish()
+
+    def IsAnimating(self):
+        return self.running
+
+    def UsesPreciseInput(self):
+        return self.running
+
+    def NeedsRedraw(self):
+        # finish() changes the status from update(), after the frame was drawn
+        return SceneManager.NeedsRedraw(self) or self.status_changed
+
+    def OnExit(self):
+        beat_scheduler.cancelAll()
+        self.running = False
@@ -0,0 +1,41 @@
+"""
+Settings shared by the main loop and the scenes.
+This module does not import anything, so any module can read the settings without pulling in main.py
+"""
+
+# frame rate of the main loop while the scene is idle
+FPS = 30
+
+# frame rate used while a scene is animating or playing audio
+ANIMATION_FPS = 60
+
+# the longest time in milliseconds the loop sleeps waiting for an event while nothing is animating
+IDLE_TIMEOUT = 1000
+
+# set to False to always redraw at FPS, even while idle
+ADAPTIVE_FRAMES = True
+
+# the size of the window when the program starts
+RESOLUTION = (1100, 800)
+
+# when True scenes draw at LOGICAL_RESOLUTION and the picture is scaled to fit the window, so the layout
+# is the same on every screen and resizing the window does not lay the scenes out again
+SCALE_TO_WINDOW = False
+LOGICAL_RESOLUTION = (1100, 800)
+
+# how many seconds the window has to stop changing size before the scene is laid out for the new size
+RESIZE_DEBOUNCE = 0.15
+
+# the sample rate and buffer size (in samples) the mixer is started with. A small buffer keeps the delay
+# between pressing a key and hearing the note short
+SAMPLE_RATE = 44100
+AUDIO_BUFFER = 512
+
+# the most memory in bytes the rendered notes are allowed to take up
+NOTE_CACHE_BYTES = 32 * 1024 * 1024
+
+# where the measured audio and input latency of each machine is stored, see latency.py
+LATENCY_FILE = "latency.json"
+
+# the pre-rendered notes, built with "python note_bank.py". Notes that are not in it are generated when played
+NOTE_BANK_FILE = "notes.bank"
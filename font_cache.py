@@ -0,0 +1,97 @@
+import pygame
+from collections import OrderedDict
+"""
+This file keeps the fonts and the rendered text that are shared by every scene.
+pygame.font.SysFont() has to look the font up on the system every time it is called and scenes are
+created again on every switch, so fonts are loaded once per process and reused. Rendered text is kept
+in a least recently used cache so text that does not change is only rendered once.
+"""
+
+# maps (name, size, bold, italic) to the loaded pygame font
+fonts = {}
+
+
+def getFont(name, size, bold=False, italic=False):
+    """
+    Returns the system font with these settings, only loading it the first time it is asked for
+    name: the name of the system font, for example 'Corbel'
+    size: the size of the font
+    bold: whether the font is bold
+    italic: whether the font is italic
+    """
+    key = (name, size, bold, italic)
+    font = fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size, bold=bold, italic=italic)
+        fonts[key] = font
+    return font
+
+
+class TextCache():
+    """
+    Least recently used cache of rendered text surfaces. Surfaces are keyed by (font, text, antialias, color)
+    and the oldest ones are dropped once the cache holds more than max_bytes of pixels.
+    The surfaces are shared, so they must not be drawn on by whoever asked for them
+    """
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        """
+        max_bytes: the most pixel memory the cache is allowed to hold
+        """
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict()
+        self.bytes = 0
+
+        # counters to see how well the cache is working
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        """
+        Works the same as font.render(text, antialias, color), but reuses the surface if it was rendered before
+        """
+        key = (font, text, antialias, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+
+        # converting to the pixel format of the display once here means blitting the text later does
+        # not have to convert every pixel. This needs a window, so text rendered before it opens is kept as is
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.surfaces[key] = surface
+        self.bytes += self.sizeOf(surface)
+
+        # drop the least recently used surfaces until the cache fits again, always keeping the newest one
+        while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+            old_key, old_surface = self.surfaces.popitem(last=False)
+            self.bytes -= self.sizeOf(old_surface)
+        return surface
+
+    def sizeOf(self, surface):
+        """
+        Returns roughly how many bytes of pixel memory the surface uses
+        """
+        return surface.get_pitch() * surface.get_height()
+
+    def clear(self):
+        """
+        Drops every cached surface
+        """
+        self.surfaces.clear()
+        self.bytes = 0
+
+
+# the cache shared by every scene
+text_cache = TextCache()
+
+
+def renderText(font, text, antialias, color):
+    """
+    Renders text with the shared cache, see TextCache.render()
+    """
+    return text_cache.render(font, text, antialias, color)
@@ -0,0 +1,44 @@
+"""
+Description: Tests for the shared fonts and the rendered text cache.
+"""
+from font_cache import *
+import pygame
+import pytest
+
+pygame.font.init()
+
+
+class TestFontCache:
+    def test_fontReused(self):
+        font = getFont('Corbel', 35)
+        assert getFont('Corbel', 35) is font
+        assert getFont('Corbel', 35, bold=True) is not font
+        assert getFont('Corbel', 36) is not font
+
+    def test_textReused(self):
+        cache = TextCache()
+        font = getFont('Corbel', 35)
+        surface = cache.render(font, "Play", True, (100, 100, 100))
+        assert cache.render(font, "Play", True, [100, 100, 100]) is surface
+        assert cache.render(font, "Play", True, (255, 255, 255)) is not surface
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_evictOldest(self):
+        font = getFont('Corbel', 35)
+        cache = TextCache()
+        # room for exactly the two surfaces that should be left
+        cache.max_bytes = sum(cache.sizeOf(font.render(text, True, (0, 0, 0))) for text in ("1111", "3333"))
+        for text in ("1111", "2222", "1111", "3333"):
+            cache.render(font, text, True, (0, 0, 0))
+        # "2222" was used least recently, so it is the one dropped
+        assert [key[1] for key in cache.surfaces] == ["1111", "3333"]
+        assert cache.bytes <= cache.max_bytes
+
+    def test_keepNewest(self):
+        cache = TextCache(max_bytes=1)
+        font = getFont('Corbel', 35)
+        cache.render(font, "first", True, (0, 0, 0))
+        surface = cache.render(font, "second", True, (0, 0, 0))
+        assert list(cache.surfaces.values()) == [surface]
+        cache.clear()
+        assert cache.bytes == 0 and len(cache.surfaces) == 0
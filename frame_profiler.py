@@ -0,0 +1,181 @@
+import pygame
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+"""
+This file defines the FrameProfiler() class, an opt-in timer for the phases of the main game loop.
+Every phase (events, Input, Render, update, display.update, tick) and every SwitchToScene is timed for the
+active scene and stored in a ring buffer, which can be saved as Chrome trace-event JSON (open it in
+chrome://tracing or https://ui.perfetto.dev) and drawn as a live frame-time graph on top of the game.
+"""
+
+# the colors of the on-screen graph
+OVERLAY_BACKGROUND = (30, 30, 30)
+OVERLAY_BAR = (0, 204, 0)
+OVERLAY_SLOW_BAR = (255, 102, 102)
+OVERLAY_LINE = (170, 170, 170)
+
+# how many phases a frame is expected to record, used to size the ring buffer of phases
+PHASES_PER_FRAME = 12
+
+
+class FrameProfiler():
+    """
+    Records how long each phase of each frame took. It does nothing until enable() is called
+    """
+    def __init__(self, capacity=600):
+        """
+        capacity: how many frames are kept in the ring buffer, older frames are dropped
+        """
+        self.enabled = False
+        self.overlay = False
+        self.capacity = capacity
+
+        # where F12 and the end of the program save the trace
+        self.trace_path = "trace.json"
+
+        # every timed phase as (name, scene name, start seconds, duration seconds). A frame records about ten
+        # (events, clock, Input, Render, update, present, display.update, warmUp, tick and scene switches), and
+        # the buffer grows if frames record more, so it always holds the phases of every frame in self.frames
+        self.phases = deque(maxlen=capacity * PHASES_PER_FRAME)
+        self.frame_phases = 0
+
+        # every frame as (scene name, start seconds, duration seconds)
+        self.frames = deque(maxlen=capacity)
+
+        # the scene and start time of the frame that is running
+        self.frame_scene = None
+        self.frame_start = 0
+
+        # the frame time that is drawn as a line on the graph, in milliseconds
+        self.budget_ms = 1000 / 30
+
+        # the overlay graph is drawn in this rectangle, at the top right of the screen
+        self.overlay_size = (240, 80)
+        self.overlay_font = None
+
+    def enable(self, overlay=False, budget_ms=None, trace_path=None):
+        """
+        Starts recording
+        overlay: whether the frame-time graph is drawn on screen
+        budget_ms: the target frame time drawn as a line on the graph
+        trace_path: where dumpChromeTrace() saves the trace by default
+        """
+        self.enabled = True
+        self.overlay = overlay
+        if budget_ms is not None:
+            self.budget_ms = budget_ms
+        if trace_path is not None:
+            self.trace_path = trace_path
+
+    def phase(self, name, scene):
+        """
+        Returns a context manager that times the code inside it as a phase of the current frame
+        name: the name of the phase, for example 'Render'
+        scene: the scene the phase belongs to
+        """
+        if not self.enabled:
+            return nullcontext()
+        return _Phase(self, name, type(scene).__name__)
+
+    def beginFrame(self, scene):
+        """
+        Marks the start of a frame of scene
+        """
+        if self.enabled:
+            self.frame_scene = type(scene).__name__
+            self.frame_start = time.perf_counter()
+
+    def endFrame(self):
+        """
+        Marks the end of the frame started with beginFrame()
+        """
+        if self.enabled and self.frame_scene is not None:
+            self.frames.append((self.frame_scene, self.frame_start, time.perf_counter() - self.frame_start))
+            self.frame_scene = None
+
+            # the phases of a frame are counted from the end of the frame before, which includes the waiting
+            # and events phases that run outside beginFrame() and endFrame()
+            if self.frame_phases * self.capacity > self.phases.maxlen:
+                self.phases = deque(self.phases, maxlen=self.frame_phases * self.capacity)
+            self.frame_phases = 0
+
+    def record(self, name, scene_name, start, duration):
+        """
+        Stores a timed phase
+        """
+        self.phases.append((name, scene_name, start, duration))
+        self.frame_phases += 1
+
+    def chromeTrace(self):
+        """
+        Returns the recorded frames and phases in Chrome trace-event format
+        """
+        events = []
+        for scene_name, start, duration in self.frames:
+            events.append({"name": "frame", "cat": scene_name, "ph": "X", "pid": 1, "tid": 1,
+                           "ts": start * 1e6, "dur": duration * 1e6, "args": {"scene": scene_name}})
+        for name, scene_name, start, duration in self.phases:
+            events.append({"name": name, "cat": scene_name, "ph": "X", "pid": 1, "tid": 1,
+                           "ts": start * 1e6, "dur": duration * 1e6, "args": {"scene": scene_name}})
+        events.sort(key=lambda event: (event["ts"], -event["dur"]))
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dumpChromeTrace(self, path=None):
+        """
+        Saves the recorded frames and phases to path as Chrome trace-event JSON, by default to trace_path
+        """
+        with open(path or self.trace_path, "w") as file:
+            json.dump(self.chromeTrace(), file)
+
+    def drawOverlay(self, screen):
+        """
+        Draws the frame-time graph of the most recent frames in the top right corner of the screen
+        returns the area that was drawn on
+        """
+        width, height = self.overlay_size
+        rect = pygame.Rect(screen.get_width() - width - 5, 5, width, height)
+        pygame.draw.rect(screen, OVERLAY_BACKGROUND, rect)
+
+        # the graph goes up to twice the frame budget, so the budget line is in the middle
+        scale = (height - 20) / (self.budget_ms * 2)
+        budget_y = rect.bottom - int(self.budget_ms * scale)
+        pygame.draw.line(screen, OVERLAY_LINE, (rect.left, budget_y), (rect.right - 1, budget_y))
+
+        frames = list(self.frames)[-width // 2:]
+        for i, (scene_name, start, duration) in enumerate(frames):
+            ms = duration * 1000
+            bar = min(height - 20, int(ms * scale))
+            color = OVERLAY_SLOW_BAR if ms > self.budget_ms else OVERLAY_BAR
+            pygame.draw.rect(screen, color, (rect.left + i * 2, rect.bottom - bar, 2, bar))
+
+        if self.overlay_font is None:
+            self.overlay_font = pygame.font.SysFont('Corbel', 16)
+        if frames:
+            scene_name, start, duration = frames[-1]
+            label = self.overlay_font.render(f"{scene_name} {duration * 1000:.1f} ms", True, OVERLAY_LINE)
+            screen.blit(label, (rect.left + 4, rect.top + 2))
+        return rect
+
+
+class _Phase():
+    """
+    Times the code inside a with block and records it on a FrameProfiler
+    """
+    def __init__(self, profiler, name, scene_name):
+        self.profiler = profiler
+        self.name = name
+        self.scene_name = scene_name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.scene_name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+# the profiler shared by the game loop and the scenes
+profiler = FrameProfiler()
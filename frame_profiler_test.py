@@ -0,0 +1,88 @@
+"""
+Description: Tests for the FrameProfiler class used to time the phases of every frame.
+"""
+from frame_profiler import *
+import json
+import pygame
+import pytest
+
+
+class Menu:
+    pass
+
+
+def frame(profiler, scene, phases=("Input", "Render")):
+    profiler.beginFrame(scene)
+    for name in phases:
+        with profiler.phase(name, scene):
+            pass
+    profiler.endFrame()
+
+
+class TestFrameProfiler:
+    def test_disabled(self):
+        profiler = FrameProfiler()
+        frame(profiler, Menu())
+        assert len(profiler.frames) == 0 and len(profiler.phases) == 0
+
+    def test_nesting(self):
+        # a phase inside another one is recorded inside it, and both are inside the frame
+        profiler = FrameProfiler()
+        profiler.enable()
+        scene = Menu()
+        profiler.beginFrame(scene)
+        with profiler.phase("update", scene):
+            with profiler.phase("SwitchToScene", scene):
+                pass
+        profiler.endFrame()
+
+        (scene_name, frame_start, frame_duration), = profiler.frames
+        assert scene_name == "Menu"
+        inner, outer = profiler.phases
+        assert (inner[0], outer[0]) == ("SwitchToScene", "update")
+        assert outer[2] <= inner[2] and inner[2] + inner[3] <= outer[2] + outer[3]
+        assert frame_start <= outer[2] and outer[2] + outer[3] <= frame_start + frame_duration
+
+    def test_chromeTrace(self, tmp_path):
+        profiler = FrameProfiler()
+        profiler.enable(trace_path=str(tmp_path / "trace.json"))
+        frame(profiler, Menu())
+        profiler.dumpChromeTrace()
+
+        with open(tmp_path / "trace.json") as f:
+            trace = json.load(f)
+        events = trace["traceEvents"]
+        assert [event["name"] for event in events] == ["frame", "Input", "Render"]
+        assert all(event["ph"] == "X" and event["cat"] == "Menu" for event in events)
+        assert events[0]["ts"] <= events[1]["ts"] <= events[2]["ts"]
+        assert events[1]["ts"] + events[1]["dur"] <= events[0]["ts"] + events[0]["dur"]
+
+    def test_dumpPath(self, tmp_path):
+        profiler = FrameProfiler()
+        profiler.enable()
+        profiler.dumpChromeTrace(str(tmp_path / "other.json"))
+        assert (tmp_path / "other.json").exists()
+
+    def test_ringBuffer(self):
+        profiler = FrameProfiler(capacity=10)
+        profiler.enable()
+        for i in range(25):
+            frame(profiler, Menu())
+        assert len(profiler.frames) == 10
+
+    def test_phasesGrow(self):
+        # frames with more phases than expected still keep the phases of every frame in the buffer
+        profiler = FrameProfiler(capacity=10)
+        profiler.enable()
+        for i in range(30):
+            frame(profiler, Menu(), ["phase"] * (PHASES_PER_FRAME + 8))
+        assert len(profiler.phases) == 10 * (PHASES_PER_FRAME + 8)
+
+    def test_overlay(self):
+        pygame.font.init()
+        profiler = FrameProfiler()
+        profiler.enable(overlay=True)
+        frame(profiler, Menu())
+        screen = pygame.Surface((400, 300))
+        rect = profiler.drawOverlay(screen)
+        assert screen.get_rect().contains(rect)
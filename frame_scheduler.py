@@ -0,0 +1,98 @@
+import pygame
+import time
+"""
+This file defines the FrameScheduler() class, which decides how fast the main game loop runs.
+When nothing on screen is moving the loop sleeps until an event arrives instead of redrawing 30 times a second,
+and when a scene is animating or playing audio the loop steps up to a higher frame rate.
+Every event gets a timestamp attribute with the time.perf_counter() time it was read. Scenes that need
+precise input times (rhythm activities) have events read every millisecond while waiting for the next frame,
+so taps are timed to about a millisecond instead of to the frame they were handled in.
+"""
+class FrameScheduler():
+    """
+    Use this class in the main game loop to get the events for the next frame and wait for the frame to end
+    """
+    def __init__(self, fps=30, animation_fps=60, idle_timeout=1000, adaptive=True, poll_interval=0.001):
+        """
+        fps: the highest frame rate while the scene is idle, so bursts of events (like mouse motion) are capped
+        animation_fps: the frame rate while the scene is animating or playing audio
+        idle_timeout: the longest time in milliseconds to wait for an event while idle
+        adaptive: if False the loop always polls for events and runs at fps, like a plain pygame loop
+        poll_interval: how many seconds apart events are read while waiting for the end of a frame,
+        when precise_input is set
+        """
+        self.fps = fps
+        self.animation_fps = animation_fps
+        self.idle_timeout = idle_timeout
+        self.adaptive = adaptive
+        self.clock = pygame.time.Clock()
+
+        # set by the game loop while the active scene needs precise input times
+        self.precise_input = False
+        self.poll_interval = poll_interval
+
+        # events read while waiting for the end of the last frame, handed out by the next getEvents()
+        self.early_events = []
+        self.frame_start = time.perf_counter()
+
+    def getEvents(self, animating):
+        """
+        Returns the events for the next frame
+        animating: whether the active scene is animating. If not, this blocks until an event arrives
+        or idle_timeout runs out, so an idle window does not use any CPU
+        """
+        early_events = self.early_events
+        self.early_events = []
+        if animating or not self.adaptive or early_events:
+            return early_events + stamp(pygame.event.get())
+
+        ev = pygame.event.wait(self.idle_timeout)
+        events = [] if ev.type == pygame.NOEVENT else [ev]
+        return stamp(events + pygame.event.get())
+
+    def tick(self, animating):
+        """
+        Waits until the end of the frame
+        animating: whether the active scene is animating, which picks the target frame rate
+        """
+        fps = self.animation_fps if animating and self.adaptive else self.fps
+        if self.precise_input:
+            return self.pollUntilFrameEnd(fps)
+        elapsed = self.clock.tick(fps)
+        self.frame_start = time.perf_counter()
+        return elapsed
+
+    def pollUntilFrameEnd(self, fps):
+        """
+        Waits until the end of the frame like tick(), but reads events every poll_interval seconds
+        meanwhile so each one is timestamped close to when it happened
+        fps: the target frame rate
+        """
+        end = self.frame_start + 1.0 / fps
+        while True:
+            self.early_events += stamp(pygame.event.get())
+            remaining = end - time.perf_counter()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, self.poll_interval))
+        self.frame_start = time.perf_counter()
+        return self.clock.tick()
+
+
+def stamp(events):
+    """
+    Sets the timestamp attribute of the events to now, the time they were read
+    returns the events
+    """
+    now = time.perf_counter()
+    for ev in events:
+        ev.timestamp = now
+    return events
+
+
+def eventTime(ev):
+    """
+    Returns the time.perf_counter() time the event was read, or now for events that were made up
+    instead of read from pygame (for example by the benchmarks)
+    """
+    return getattr(ev, "timestamp", time.perf_counter())
@@ -0,0 +1,167 @@
+import pygame
+import sys
+import time
+from frame_profiler import profiler
+from scene_registry import registry
+from animation_clock import clock
+"""
+This file defines the GameLoop() class, which runs the main game loop one frame at a time.
+main() uses it to run the program, and the benchmarks use it to step scenes without a real window.
+"""
+class GameLoop():
+    """
+    Holds the screen and the active scene, and runs frames of the game
+    """
+    def __init__(self, screen, scene, scheduler, display=None, resize_debounce=0.15):
+        """
+        screen: the surface scenes are drawn on, normally the display surface
+        scene: the first scene to display
+        scheduler: the FrameScheduler that decides how long each frame waits
+        display: a ScaledDisplay, if scenes draw into a fixed size backbuffer instead of the window
+        resize_debounce: how many seconds the window has to stop changing size before the scene is laid out
+        again, so dragging the window corner does not lay the scene out on every frame
+        """
+        self.display = display
+        self.screen = display.surface if display else screen
+        self.active_scene = scene
+        self.scheduler = scheduler
+        self.cursize = self.screen.get_size()
+        self.active_scene.OnEnter()
+
+        # the newest window size from VIDEORESIZE events that has not been applied yet, and when it arrived
+        self.resize_debounce = resize_debounce
+        self.pending_size = None
+        self.resize_time = 0
+
+        # set when the whole window has to be repainted, for example after it was resized
+        self.present_full = False
+
+    def run(self):
+        """
+        Runs frames until the program is closed
+        """
+        while True:
+            self.frame()
+
+    def frame(self):
+        """
+        Gets the events for the next frame, runs it and waits until the frame is over
+        """
+        # while timed steps are running, scenes are waiting to be built ahead of time, a resize is waiting
+        # to be applied, or the scene has a redraw queued (after a switch or a resize), the loop keeps running
+        # instead of sleeping
+        animating = (self.active_scene.IsAnimating() or clock.isActive() or registry.hasPending()
+                     or self.pending_size is not None or self.active_scene.NeedsRedraw())
+        self.scheduler.precise_input = self.active_scene.UsesPreciseInput()
+        with profiler.phase("events", self.active_scene):
+            events = self.scheduler.getEvents(animating)
+        self.step(events)
+
+        # frames without input are used to build the scenes the user is likely to go to next
+        if not events and registry.hasPending():
+            with profiler.phase("warmUp", self.active_scene):
+                registry.warmUp()
+        with profiler.phase("tick", self.active_scene):
+            self.scheduler.tick(animating)
+
+    def step(self, events, mouse=None):
+        """
+        Runs one frame of the active scene with the given events
+        events: the events that happened since the last frame
+        mouse: the position of the mouse, read from pygame if None
+        returns the rectangles of the screen that were updated
+        """
+        profiler.beginFrame(self.active_scene)
+        pressed_keys = pygame.key.get_pressed()
+
+        # scenes drawing into the backbuffer get mouse positions in backbuffer coordinates
+        if self.display:
+            events = [self.display.translateEvent(ev) for ev in events]
+
+        for ev in events:
+
+            if ev.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+
+            # only the newest size is kept, it is applied once the window stops changing size
+            if ev.type == pygame.VIDEORESIZE:
+                self.pending_size = ev.size
+                self.resize_time = time.perf_counter()
+
+            # while profiling, F3 shows or hides the frame-time graph and F12 saves a trace
+            if ev.type == pygame.KEYDOWN and profiler.enabled:
+                if ev.key == pygame.K_F3:
+                    profiler.overlay = not profiler.overlay
+                    self.active_scene.RequestFullRedraw()
+                elif ev.key == pygame.K_F12:
+                    profiler.dumpChromeTrace()
+
+        # stores the (x,y) coordinates into
+        # the variable as a tuple
+        if mouse is None:
+            mouse = pygame.mouse.get_pos()
+            if self.display:
+                mouse = self.display.toLogical(mouse)
+
+        if self.pending_size is not None:
+            self.applyResize()
+
+        scene = self.active_scene
+
+        # timed steps that are due run before the scene draws, so the frame shows them
+        with profiler.phase("clock", scene):
+            clock.tick()
+        with profiler.phase("Input", scene):
+            scene.Input(events, pressed_keys, mouse)
+        with profiler.phase("Render", scene):
+            scene.Render(self.screen, mouse)
+
+        # only push the parts of the window that the scene changed this frame
+        dirty_rects = scene.GetDirtyRects(self.screen)
+
+        with profiler.phase("update", scene):
+            scene.update(self.screen, self.cursize)
+
+        # if the scene is switched, this will load a new scene and repaint the whole window
+        if scene.scene is not scene:
+            self.active_scene = scene.scene
+            scene.OnExit()
+            self.active_scene.OnEnter()
+            self.active_scene.update(self.screen, self.cursize)
+
+        if profiler.overlay:
+            dirty_rects.append(profiler.drawOverlay(self.screen))
+
+        # the backbuffer is scaled into the window
+        if self.display and (dirty_rects or self.present_full):
+            with profiler.phase("present", scene):
+                dirty_rects = self.display.present(dirty_rects, self.present_full)
+        elif self.present_full:
+            dirty_rects = [self.screen.get_rect()]
+        self.present_full = False
+
+        # updates the frames of the game
+        if dirty_rects:
+            with profiler.phase("display.update", scene):
+                pygame.display.update(dirty_rects)
+        profiler.endFrame()
+        return dirty_rects
+
+    def applyResize(self):
+        """
+        Applies the newest window size. With a ScaledDisplay the picture is rescaled right away, since that
+        is cheap and the scene keeps its logical size. Otherwise the scene is laid out for the new size once
+        the window has not changed size for resize_debounce seconds
+        """
+        if self.display:
+            self.display.setWindow(pygame.display.get_surface())
+            self.present_full = True
+            self.pending_size = None
+        elif time.perf_counter() - self.resize_time >= self.resize_debounce:
+            self.cursize = self.pending_size
+            # the scene is laid out for the new size before it draws this frame, and the whole scene is repainted
+            # since the window contents are lost on resize
+            self.active_scene.Resize(self.cursize)
+            self.active_scene.RequestFullRedraw()
+            self.pending_size = None
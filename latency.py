@@ -0,0 +1,100 @@
+import json
+import os
+import socket
+import statistics
+from bisect import bisect_left
+from config import LATENCY_FILE, AUDIO_BUFFER
+"""
+This file keeps the measured latency of every machine the game runs on. A student tapping along to a beat
+hears it late (the audio output) and their tap is seen late (the keyboard and the event queue), and both
+delays depend on the machine. The calibration activity measures the sum of them as an offset, which is stored
+per device in a JSON file and subtracted from tap times before they are scored.
+"""
+
+
+def deviceName():
+    """
+    Returns a name for this machine and its audio setup. The latency depends on the audio driver and the
+    mixer buffer size, so they are part of the name
+    """
+    driver = os.environ.get("SDL_AUDIODRIVER", "default")
+    return f"{socket.gethostname()}/{driver}/{AUDIO_BUFFER}"
+
+
+def estimateOffset(beat_times, tap_times, skip=2):
+    """
+    Works out how late the taps are compared to the beats they were meant for
+    beat_times: the times the beats were played, sorted
+    tap_times: the times of the taps
+    skip: how many of the first taps are ignored, since students need a few beats to find the rhythm
+    returns (offset, spread) in seconds: the median of how late each tap was compared to the nearest beat, and
+    the median distance of the taps from that offset, which shows how steady the tapping was.
+    Returns None if there are not enough taps
+    """
+    differences = []
+    for tap in sorted(tap_times)[skip:]:
+        i = bisect_left(beat_times, tap)
+        nearest = min(beat_times[max(0, i - 1):i + 1], key=lambda beat: abs(beat - tap))
+        differences.append(tap - nearest)
+    if not differences:
+        return None
+
+    offset = statistics.median(differences)
+    spread = statistics.median(abs(difference - offset) for difference in differences)
+    return offset, spread
+
+
+class LatencyStore():
+    """
+    Use this class to look up and save the latency offset of each device
+    """
+    def __init__(self, path=LATENCY_FILE):
+        """
+        path: the JSON file the offsets are kept in
+        """
+        self.path = path
+
+        # maps a device name to its offset in seconds, read from the file the first time it is needed
+        self.offsets = None
+
+    def load(self):
+        """
+        Reads the offsets from the file. A missing or broken file counts as no offsets
+        """
+        try:
+            with open(self.path) as f:
+                self.offsets = {name: float(offset) for name, offset in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            self.offsets = {}
+        return self.offsets
+
+    def getOffset(self, device=None):
+        """
+        Returns the offset of the device in seconds (this machine by default), or 0 if it was not calibrated
+        """
+        if self.offsets is None:
+            self.load()
+        return self.offsets.get(device or deviceName(), 0.0)
+
+    def setOffset(self, offset, device=None):
+        """
+        Stores the offset of the device (this machine by default) and saves the file
+        """
+        if self.offsets is None:
+            self.load()
+        self.offsets[device or deviceName()] = offset
+        self.save()
+
+    def save(self):
+        """
+        Writes the offsets to the file. It is written to a temporary file first, so closing the game
+        while saving cannot leave a half written file behind
+        """
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.offsets, f, indent=2, sort_keys=True)
+        os.replace(temporary, self.path)
+
+
+# the offsets shared by every activity
+latency_store = LatencyStore()
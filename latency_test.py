@@ -0,0 +1,60 @@
+"""
+Description: Tests for working out and storing the latency offset of a machine.
+"""
+from latency import *
+import pytest
+
+BEATS = [i * 0.5 for i in range(12)]
+
+
+class TestLatency:
+    def test_steadyOffset(self):
+        taps = [beat + 0.04 for beat in BEATS]
+        offset, spread = estimateOffset(BEATS, taps)
+        assert offset == pytest.approx(0.04)
+        assert spread == pytest.approx(0.0)
+
+    def test_skip(self):
+        # the first taps are far off while the student finds the rhythm, and are not counted
+        taps = [0.2, 0.7, 1.03, 1.53]
+        assert estimateOffset(BEATS, taps)[0] == pytest.approx(0.03)
+        assert estimateOffset(BEATS, taps, skip=0)[0] == pytest.approx(0.115)
+
+    def test_outlier(self):
+        # one tap that is far off barely moves the median
+        taps = [beat + 0.05 for beat in BEATS]
+        taps[6] += 0.2
+        offset, spread = estimateOffset(BEATS, sorted(taps))
+        assert offset == pytest.approx(0.05)
+        assert spread == pytest.approx(0.0)
+
+    def test_earlyTaps(self):
+        offset, spread = estimateOffset(BEATS, [beat - 0.02 for beat in BEATS])
+        assert offset == pytest.approx(-0.02)
+
+    def test_empty(self):
+        assert estimateOffset(BEATS, []) is None
+        assert estimateOffset(BEATS, [0.0, 0.5]) is None
+
+    def test_storeRoundTrip(self, tmp_path):
+        path = str(tmp_path / "latency.json")
+        store = LatencyStore(path)
+        assert store.getOffset("laptop") == 0.0
+        store.setOffset(0.045, "laptop")
+        store.setOffset(0.012, "desktop")
+
+        # a new store reads the offsets back from the file, each device on its own
+        copy = LatencyStore(path)
+        assert copy.getOffset("laptop") == pytest.approx(0.045)
+        assert copy.getOffset("desktop") == pytest.approx(0.012)
+        assert copy.getOffset("unknown") == 0.0
+
+    def test_thisDevice(self, tmp_path):
+        store = LatencyStore(str(tmp_path / "latency.json"))
+        store.setOffset(0.03)
+        assert store.getOffset(deviceName()) == pytest.approx(0.03)
+
+    def test_brokenFile(self, tmp_path):
+        path = tmp_path / "latency.json"
+        path.write_text("not json")
+        assert LatencyStore(str(path)).getOffset("laptop") == 0.0
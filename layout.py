@@ -0,0 +1,66 @@
+import pygame
+from collections import OrderedDict
+"""
+This file defines the Layout() class, which places the items of a scene relative to the screen size.
+Every item is declared once as an anchor point given as a fraction of the screen size, plus a pixel offset
+and a size. The rectangles are only worked out when the screen size changes, and are cached per size, so
+Render and hit-testing read the same rectangles instead of repeating the arithmetic every frame.
+"""
+class Layout():
+    """
+    Use this class to declare where the items of a scene go and look up their rectangles
+    """
+    def __init__(self, cache_size=8):
+        """
+        cache_size: how many screen sizes the solved rectangles are kept for
+        """
+        # maps the name of each item to (x, y, dx, dy, w, h), see add()
+        self.anchors = OrderedDict()
+
+        # maps a screen size to the rectangles solved for it, least recently used first
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+        # the rectangles for the size solve() was last called with
+        self.rects = {}
+
+    def add(self, name, x, y, dx=0, dy=0, w=0, h=0):
+        """
+        Declares where an item goes
+        name: the name used to look the rectangle up
+        x: the fraction of the screen width the item is anchored to, 0.5 is the middle of the screen
+        y: the fraction of the screen height the item is anchored to
+        dx: pixels added to the anchor on the x coordinate, for the top left corner of the item
+        dy: pixels added to the anchor on the y coordinate
+        w: the width of the item
+        h: the height of the item
+        """
+        self.anchors[name] = (x, y, dx, dy, w, h)
+        self.cache.clear()
+
+    def solve(self, size):
+        """
+        Works out the rectangle of every item for the screen size, reusing the cached ones if this size
+        was solved before. returns a dictionary of name to pygame.Rect
+        """
+        size = tuple(size)
+        rects = self.cache.get(size)
+        if rects is None:
+            width, height = size
+            rects = {}
+            for name, (x, y, dx, dy, w, h) in self.anchors.items():
+                rects[name] = pygame.Rect(width * x + dx, height * y + dy, w, h)
+            self.cache[size] = rects
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(size)
+
+        self.rects = rects
+        return rects
+
+    def __getitem__(self, name):
+        """
+        Returns the rectangle of an item for the last solved screen size
+        """
+        return self.rects[name]
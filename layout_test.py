@@ -0,0 +1,46 @@
+"""
+Description: Tests for the Layout class that places the items of a scene.
+"""
+from layout import *
+import pygame
+import pytest
+
+
+def menuLayout():
+    layout = Layout(cache_size=2)
+    layout.add('title', 0.5, 1 / 8, -180)
+    layout.add('play', 0.5, 0.5, -125, -20, 250, 40)
+    layout.add('corner', 1.0, 1.0, -50, -30, 50, 30)
+    return layout
+
+
+class TestLayout:
+    def test_solve(self):
+        rects = menuLayout().solve((1100, 800))
+        assert rects['title'] == pygame.Rect(370, 100, 0, 0)
+        assert rects['play'] == pygame.Rect(425, 380, 250, 40)
+        assert rects['corner'] == pygame.Rect(1050, 770, 50, 30)
+
+    def test_otherSize(self):
+        layout = menuLayout()
+        layout.solve((1100, 800))
+        rects = layout.solve((800, 600))
+        assert rects['play'] == pygame.Rect(275, 280, 250, 40)
+        assert layout['corner'] == pygame.Rect(750, 570, 50, 30)
+
+    def test_cached(self):
+        layout = menuLayout()
+        first = layout.solve((1100, 800))
+        layout.solve([800, 600])
+        assert layout.solve([1100, 800]) is first
+        assert layout['play'] is first['play']
+
+        # the least recently used size is dropped once more sizes than cache_size were solved
+        layout.solve((640, 480))
+        assert list(layout.cache) == [(1100, 800), (640, 480)]
+
+    def test_addClearsCache(self):
+        layout = menuLayout()
+        layout.solve((1100, 800))
+        layout.add('back', 0, 0, 10, 10, 100, 30)
+        assert layout.solve((1100, 800))['back'] == pygame.Rect(10, 10, 100, 30)
@@ -9,66 +9,85 @@ https://www.geeksforgeeks.org/creating-start-menu-in-pygame/
 Inspiration for class setup/scene managers:
 https://nerdparadise.com/programming/pygame/part7
 """
+import time
+
+# when main.py started running, used by --startup-profile
+START_TIME = time.perf_counter()
+
+import argparse
+import atexit
 import pygame
 import sys
-from SceneManager import *
-
+import SceneManager # registers the scenes in the scene registry
+from config import FPS, ANIMATION_FPS, IDLE_TIMEOUT, ADAPTIVE_FRAMES, RESOLUTION
+from config import SCALE_TO_WINDOW, LOGICAL_RESOLUTION, RESIZE_DEBOUNCE
+from frame_scheduler import FrameScheduler
+from frame_profiler import profiler
+from game_loop import GameLoop
+from scaled_display import ScaledDisplay
+from scene_registry import registry
 
-FPS = 30
 
 def main():
-
-    # initializing the constructor
-    pygame.init()
-    #the starting menu
-    scene = StartMenu()
-
-    fpsClock = pygame.time.Clock()
-
-    # screen resolution
-    res = (1100, 800)
+    parser = argparse.ArgumentParser(description="Music Education Game")
+    parser.add_argument("--profile", nargs="?", const="trace.json", metavar="TRACE_FILE",
+                        help="time every phase of every frame, show the frame-time graph (F3 toggles it) and save a "
+                             "Chrome trace to TRACE_FILE (default trace.json) on exit or when F12 is pressed")
+    parser.add_argument("--scaled", action="store_true", default=SCALE_TO_WINDOW,
+                        help="draw at a fixed resolution and scale the picture to fit the window")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long each step of startup took until the first frame was shown, then exit")
+    args = parser.parse_args()
+
+    # the time each step of startup finished at, for --startup-profile
+    steps = [("imports", time.perf_counter())]
+
+    if args.profile:
+        profiler.enable(overlay=True, budget_ms=1000 / FPS, trace_path=args.profile)
+        atexit.register(profiler.dumpChromeTrace)
+
+    # only the parts of pygame needed for the first screen are started here. Audio is started
+    # by the activities that use it, so the menus do not wait for the sound card
+    pygame.display.init()
+    pygame.font.init()
+    steps.append(("pygame init", time.perf_counter()))
 
     # opens up a window
-    screen = pygame.display.set_mode(res, pygame.RESIZABLE)
-
-    active_scene = scene
-
-    cursize = res
-
-    while True:
-        events = pygame.event.get()
-        pressed_keys = pygame.key.get_pressed()
-        for ev in events:
-
-            if ev.type == pygame.QUIT:
-                pygame.quit()
-
-            if ev.type == pygame.VIDEORESIZE:
-                cursize = ev.size
-                print(cursize)
-
-        # stores the (x,y) coordinates into
-        # the variable as a tuple
-        mouse = pygame.mouse.get_pos()
-
-        active_scene.Input(events, pressed_keys, mouse)
-        active_scene.Render(screen, mouse)
-        active_scene.update(screen, cursize)
-
-        # if the scene is switched, this will load a new scene
-        active_scene = active_scene.scene
-
-        # updates the frames of the game
-        pygame.display.update()
-
-        fpsClock.tick(FPS)
-
-
-
-
-
-
+    screen = pygame.display.set_mode(RESOLUTION, pygame.RESIZABLE)
+    steps.append(("window", time.perf_counter()))
 
+    #the starting menu
+    scene = registry.get("StartMenu")
+    steps.append(("first scene", time.perf_counter()))
+
+    # sleeps while the scene is idle, and steps up the frame rate while it is animating
+    scheduler = FrameScheduler(FPS, ANIMATION_FPS, IDLE_TIMEOUT, ADAPTIVE_FRAMES)
+    # with --scaled the scenes draw into a backbuffer that is scaled to the window
+    display = ScaledDisplay(screen, LOGICAL_RESOLUTION) if args.scaled else None
+    loop = GameLoop(screen, scene, scheduler, display, RESIZE_DEBOUNCE)
+
+    if args.startup_profile:
+        loop.step(pygame.event.get())
+        steps.append(("first frame", time.perf_counter()))
+        printStartupProfile(steps)
+        pygame.quit()
+        return
+
+    # runs the scenes frame by frame until the window is closed
+    loop.run()
+
+
+def printStartupProfile(steps):
+    """
+    Prints how long each step of startup took, and the total time to the first frame
+    :param steps: a list of (name, time the step finished at)
+    """
+    print("Startup profile (milliseconds)")
+    previous = START_TIME
+    for name, finished in steps:
+        print(f"  {name:<20}{(finished - previous) * 1000:8.1f}")
+        previous = finished
+    print(f"  {'time to first frame':<20}{(steps[-1][1] - START_TIME) * 1000:8.1f}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,204 @@
+import numpy as np
+"""
+This file scores a played melody against the target melody for the Combination Game.
+The two note sequences are aligned with a weighted edit distance: a target note can be matched to a played note
+(costing more the further off its pitch and timing are), skipped, or a played note can be extra. Only cells
+within a band around the diagonal are worked out, and each row is computed with NumPy, using
+np.minimum.accumulate for the extra notes that chain along a row. The alignment path is kept for feedback
+such as "you skipped the 4th note", and many attempts can be scored in one call.
+"""
+
+# the cost of a target note that was not played, and of a played note that is not in the target
+MISS_COST = 1.0
+EXTRA_COST = 1.0
+
+# the cost of a wrong pitch goes from WRONG_PITCH_COST up to WRONG_PITCH_COST + PITCH_COST at PITCH_RANGE semitones off.
+# It stays below MISS_COST + EXTRA_COST so a wrong note is a wrong note, not a skipped one plus an extra one
+WRONG_PITCH_COST = 0.5
+PITCH_COST = 0.5
+PITCH_RANGE = 12
+
+# the cost of timing goes up to TIMING_COST when a note is TIMING_RANGE seconds off, measured from the first note
+TIMING_COST = 0.3
+TIMING_RANGE = 0.5
+
+# how many notes off the diagonal are looked at by default. A student who skips or adds more notes than this
+# (more of one than the other) in one attempt is not followed, which keeps long melodies fast
+BAND = 16
+
+# how close two costs have to be to count as equal when following the alignment path back
+TOLERANCE = 1e-9
+
+
+class Alignment():
+    """
+    The result of aligning one attempt
+    cost: the total cost of the alignment
+    score: from 0 to 100, 100 is every note played at the right pitch and time with nothing extra
+    steps: the alignment path, a list of (kind, target index, played index) where kind is "match", "wrong",
+    "missed" or "extra". The index that does not apply is None
+    """
+    def __init__(self, cost, length, steps):
+        self.cost = float(cost)
+        self.score = max(0.0, 100 * (1 - self.cost / max(length, 1)))
+        self.steps = steps
+
+    def feedback(self):
+        """
+        Returns the mistakes as sentences for the student, for example "You skipped the 4th note"
+        """
+        lines = []
+        for kind, target, played in self.steps:
+            if kind == "missed":
+                lines.append(f"You skipped the {ordinal(target + 1)} note")
+            elif kind == "extra":
+                lines.append(f"The {ordinal(played + 1)} note you played was extra")
+            elif kind == "wrong":
+                lines.append(f"The {ordinal(target + 1)} note was the wrong pitch")
+        return lines
+
+
+def ordinal(number):
+    """
+    Returns 1st, 2nd, 3rd, 4th... for a number
+    """
+    if 10 <= number % 100 <= 20:
+        suffix = "th"
+    else:
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+def substitution(difference, off):
+    """
+    Returns the cost of matching a target note with a played note, for arrays or single values
+    difference: how many semitones apart the pitches are
+    off: how many seconds apart the onsets are, 0 to ignore timing
+    """
+    pitch = np.where(difference > 0, WRONG_PITCH_COST + PITCH_COST * np.minimum(difference, PITCH_RANGE) / PITCH_RANGE, 0.0)
+    return pitch + TIMING_COST * np.minimum(off / TIMING_RANGE, 1.0)
+
+
+def alignBatch(target, attempts, band=BAND, timing=True):
+    """
+    Aligns many played melodies with the same target melody
+    target: the target notes as a list of (pitch, onset) pairs, in order
+    attempts: a list of played melodies, each a list of (pitch, onset) pairs in the order they were played
+    band: how many notes off the diagonal are looked at, see BAND
+    timing: whether onsets count towards the cost, or only the order and pitch of the notes
+    returns a list of Alignment, one for every attempt
+    """
+    target = np.asarray(target, dtype=float).reshape(-1, 2)
+    count = len(attempts)
+    if count == 0:
+        return []
+    m = len(target)
+    lengths = np.array([len(attempt) for attempt in attempts], dtype=int)
+    n = int(lengths.max())
+
+    # the played notes padded to the same length, onsets measured from the first note of each melody
+    pitches = np.zeros((count, n + 1))
+    onsets = np.zeros((count, n + 1))
+    for a, attempt in enumerate(attempts):
+        if lengths[a]:
+            notes = np.asarray(attempt, dtype=float).reshape(-1, 2)
+            pitches[a, :lengths[a]] = notes[:, 0]
+            onsets[a, :lengths[a]] = notes[:, 1] - notes[0, 1]
+    target_onsets = target[:, 1] - target[0, 1] if m else target[:, 1]
+
+    # row i (after i target notes) only looks at columns lo[i] to hi[i], the band around the diagonal from
+    # (0, 0) to (m, length) of every attempt
+    centers = np.arange(m + 1)[:, np.newaxis] * (lengths / max(m, 1))[np.newaxis, :]
+    lo = np.maximum(0, np.floor(centers.min(axis=1)).astype(int) - band)
+    hi = np.minimum(n, np.ceil(centers.max(axis=1)).astype(int) + band)
+    widths = hi - lo + 1
+    width = int(widths.max())
+    shifts = np.diff(lo).tolist()
+    columns = lo[:, np.newaxis] + np.arange(width)[np.newaxis, :]
+
+    # everything that does not depend on the previous row is worked out for every row at once:
+    # the cost of matching target note i with played note j (column j + 1), and a penalty that is
+    # infinite for the cells outside an attempt's band
+    played = np.minimum(columns[1:] - 1, n)
+    difference = np.abs(pitches[:, played] - target[:, 0][np.newaxis, :, np.newaxis])
+    off = np.abs(onsets[:, played] - target_onsets[np.newaxis, :, np.newaxis]) if timing else 0.0
+    substitutions = substitution(difference, off).transpose(1, 0, 2)
+    inside = (np.abs(columns[np.newaxis, :, :] - centers.T[:, :, np.newaxis]) <= band) & \
+             (columns[np.newaxis, :, :] <= np.minimum(hi, n)[np.newaxis, :, np.newaxis]) & \
+             (columns[np.newaxis, :, :] <= lengths[:, np.newaxis, np.newaxis])
+    penalty = np.where(inside, 0.0, np.inf).transpose(1, 0, 2)
+
+    # extra played notes chain along a row: cost[j] = min over k <= j of best[k] + (j - k) * EXTRA_COST, which is
+    # np.minimum.accumulate of best[k] - k * EXTRA_COST with j * EXTRA_COST added back. That line, the penalty
+    # and the cost of skipping a note are added to the arrays here so every row only takes a few NumPy calls
+    lines = (columns * EXTRA_COST)[:, np.newaxis, :]
+    missing = MISS_COST + penalty - lines
+    matching = substitutions + missing[1:] - MISS_COST
+    restore = lines + penalty
+
+    # rows[i, a, 1 + k] is the cost of cell (i, lo[i] + k) of attempt a. The first column and the columns
+    # after the band stay infinite, so the slices for the row below never need a bounds check
+    widths = widths.tolist()
+    rows = np.full((m + 1, count, width + max(shifts, default=0) + 2), np.inf)
+    rows[0, :, 1:1 + width] = restore[0]
+    up = np.empty((count, width))
+    for i in range(1, m + 1):
+        shift = shifts[i - 1]
+        w = widths[i]
+        previous = rows[i - 1]
+
+        # skipping target note i, or matching it with the played note before the column, then any extra notes
+        best = np.add(previous[:, 1 + shift:1 + shift + w], missing[i, :, :w], out=up[:, :w])
+        np.minimum(best, previous[:, shift:shift + w] + matching[i - 1, :, :w], out=best)
+        row = rows[i, :, 1:1 + w]
+        np.minimum.accumulate(best, axis=1, out=row)
+        row += restore[i, :, :w]
+
+    results = []
+    for a in range(count):
+        total = rows[m, a, 1 + lengths[a] - lo[m]] if lo[m] <= lengths[a] <= hi[m] else np.inf
+        steps = []
+        if np.isfinite(total):
+            steps = path(rows[:, a].tolist(), substitutions[:, a].tolist(), lo.tolist(), m, int(lengths[a]),
+                         pitches[a].tolist(), target[:, 0].tolist())
+        results.append(Alignment(total, m, steps))
+    return results
+
+
+def path(rows, substitutions, lo, m, length, pitches, target):
+    """
+    Follows the cheapest choices back from the end of both melodies and returns the steps in order.
+    A match is preferred over a skipped note, and a skipped note over an extra one.
+    rows and substitutions are the costs worked out by alignBatch() for one attempt, in band columns, as lists
+    """
+    def cost(i, j):
+        k = 1 + j - lo[i]
+        return rows[i][k] if 0 < k < len(rows[i]) else np.inf
+
+    steps = []
+    i, j = m, length
+    while i > 0 or j > 0:
+        here = cost(i, j)
+        if i > 0 and j > 0:
+            matched = cost(i - 1, j - 1) + substitutions[i - 1][j - lo[i]]
+            if abs(here - matched) <= TOLERANCE:
+                kind = "match" if pitches[j - 1] == target[i - 1] else "wrong"
+                steps.append((kind, i - 1, j - 1))
+                i, j = i - 1, j - 1
+                continue
+        if i > 0 and abs(here - (cost(i - 1, j) + MISS_COST)) <= TOLERANCE:
+            steps.append(("missed", i - 1, None))
+            i -= 1
+        else:
+            steps.append(("extra", None, j - 1))
+            j -= 1
+    steps.reverse()
+    return steps
+
+
+def align(target, played, band=BAND, timing=True):
+    """
+    Aligns one played melody with the target melody, see alignBatch()
+    returns an Alignment
+    """
+    return alignBatch(target, [played], band, timing)[0]
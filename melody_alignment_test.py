@@ -0,0 +1,71 @@
+"""
+Description: Tests for the melody alignment used by the Combination Game.
+"""
+from melody_alignment import *
+import numpy as np
+import pytest
+
+
+def melody(pitches, gap=0.5):
+    return [(pitch, i * gap) for i, pitch in enumerate(pitches)]
+
+
+TARGET = melody([60, 62, 64, 65, 67, 69, 71, 72])
+
+
+class TestMelodyAlignment:
+    def test_perfect(self):
+        result = align(TARGET, TARGET)
+        assert result.cost == 0
+        assert result.score == 100
+        assert [step[0] for step in result.steps] == ["match"] * 8
+        assert result.feedback() == []
+
+    def test_startTimeIgnored(self):
+        # onsets are measured from the first note, so starting later is not a mistake
+        played = [(pitch, onset + 3.0) for pitch, onset in TARGET]
+        assert align(TARGET, played).cost == 0
+
+    def test_skipped(self):
+        played = TARGET[:3] + TARGET[4:]
+        result = align(TARGET, played, timing=False)
+        assert ("missed", 3, None) in result.steps
+        assert result.cost == pytest.approx(MISS_COST)
+        assert result.feedback() == ["You skipped the 4th note"]
+
+    def test_extra(self):
+        played = TARGET[:2] + [(90, 0.75)] + TARGET[2:]
+        result = align(TARGET, played, timing=False)
+        assert ("extra", None, 2) in result.steps
+        assert result.cost == pytest.approx(EXTRA_COST)
+
+    def test_wrongPitch(self):
+        played = list(TARGET)
+        played[1] = (63, 0.5)
+        result = align(TARGET, played)
+        assert result.steps[1] == ("wrong", 1, 1)
+        assert result.cost == pytest.approx(WRONG_PITCH_COST + PITCH_COST / PITCH_RANGE)
+        assert result.feedback() == ["The 2nd note was the wrong pitch"]
+
+    def test_timing(self):
+        played = list(TARGET)
+        played[5] = (69, 2.5 + TIMING_RANGE)
+        assert align(TARGET, played).cost == pytest.approx(TIMING_COST)
+
+    def test_batch(self):
+        results = alignBatch(TARGET, [TARGET, TARGET[:4], [], TARGET[1:]], timing=False)
+        assert [result.cost for result in results] == pytest.approx([0, 4 * MISS_COST, 8 * MISS_COST, MISS_COST])
+        assert results[3].steps[0] == ("missed", 0, None)
+
+    def test_long(self):
+        # a long melody with one skipped note in the middle still finds it inside the band
+        pitches = list(np.random.RandomState(1).randint(55, 80, 400))
+        target = melody(pitches)
+        played = target[:200] + target[201:]
+        result = align(target, played, timing=False)
+        assert result.cost == pytest.approx(MISS_COST)
+        assert ("missed", 200, None) in result.steps
+
+    def test_ordinal(self):
+        assert [ordinal(n) for n in (1, 2, 3, 4, 11, 12, 13, 21, 22, 101)] == \
+               ["1st", "2nd", "3rd", "4th", "11th", "12th", "13th", "21st", "22nd", "101st"]
@@ -0,0 +1,468 @@
+import heapq
+import struct
+from collections import deque
+from operator import itemgetter
+from note_store import NoteStore
+"""
+This file reads and writes standard MIDI files, so exercises can be loaded from MIDI and compositions from Free Play
+exported to it.
+The reader only reads the header and where each track starts when the file is opened. Events are parsed from a
+small buffer as they are asked for, and the tracks are merged lazily by time, so a long orchestral piece loads
+without ever being in memory at once. Notes come out as (onset, pitch, duration, velocity) in seconds, the same
+as a NoteStore row.
+The writer writes every event straight to the file and fills in the length of each track when it is finished.
+"""
+
+# status bytes of the channel messages (the low 4 bits are the channel) and of meta and system exclusive events
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+PROGRAM_CHANGE = 0xC0
+CHANNEL_PRESSURE = 0xD0
+META = 0xFF
+SYSEX = 0xF0
+ESCAPE = 0xF7
+
+# meta event types
+TEMPO = 0x51
+END_OF_TRACK = 0x2F
+
+# ticks per quarter note of written files, and the tempo a file has before it sets one (120 BPM)
+DIVISION = 480
+DEFAULT_TEMPO = 500000
+
+# how many bytes of a track are read from the file at a time
+BLOCK_SIZE = 65536
+
+# how many ticks of every track are merged at a time, see MidiReader.merged()
+MERGE_SPAN = 4096
+
+# the longest a note can be held. A note without a note off would otherwise keep every note after it in memory
+# until the end of the file, since notes come out in order of onset
+MAX_NOTE_SECONDS = 60.0
+
+HEADER = struct.Struct(">4sIHHH")
+CHUNK = struct.Struct(">4sI")
+
+
+class MidiFileError(Exception):
+    """
+    raise this exception if a MIDI file can not be read, or events are written out of order
+    """
+    pass
+
+
+def varLen(value):
+    """
+    Returns value as a MIDI variable length number: 7 bits per byte, the top bit set on every byte but the last
+    """
+    data = bytearray([value & 0x7F])
+    value >>= 7
+    while value:
+        data.append(0x80 | (value & 0x7F))
+        value >>= 7
+    data.reverse()
+    return bytes(data)
+
+
+class MidiReader():
+    """
+    Use this class to read a MIDI file event by event.
+    Events are (tick, status, a, b) tuples. For channel messages a and b are the two data bytes (b is 0 for
+    messages with one), for meta events a is the meta type and b the data as bytes, and for system exclusive
+    events a is None and b the data
+    """
+    def __init__(self, path, block_size=BLOCK_SIZE):
+        """
+        path: the MIDI file
+        block_size: how many bytes of a track are read at a time
+        """
+        self.path = path
+        self.block_size = block_size
+        self.file = open(path, "rb")
+        try:
+            self.readHeader()
+        except (MidiFileError, struct.error):
+            self.file.close()
+            raise MidiFileError(f"{path} is not a MIDI file")
+
+    def readHeader(self):
+        """
+        Reads the header and finds where every track starts, skipping over the tracks themselves
+        """
+        magic, size, self.format, count, self.division = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != b"MThd" or size < 6:
+            raise MidiFileError(f"{self.path} is not a MIDI file")
+        position = 8 + size
+
+        # (offset, length) of every track. Chunks of other types are allowed and skipped
+        self.tracks = []
+        while len(self.tracks) < count:
+            self.file.seek(position)
+            chunk = self.file.read(CHUNK.size)
+            if len(chunk) < CHUNK.size:
+                break
+            kind, length = CHUNK.unpack(chunk)
+            if kind == b"MTrk":
+                self.tracks.append((position + CHUNK.size, length))
+            position += CHUNK.size + length
+
+    def close(self):
+        self.file.close()
+
+    def secondsPerTick(self, tempo=DEFAULT_TEMPO):
+        """
+        Returns how long a tick is at a tempo in microseconds per quarter note. Files timed in SMPTE frames
+        have the same tick length at any tempo
+        """
+        if self.division & 0x8000:
+            frames = 256 - (self.division >> 8)
+            return 1.0 / (frames * (self.division & 0xFF))
+        return tempo / 1000000.0 / self.division
+
+    def refill(self, data, i, position, end, need):
+        """
+        Returns the bytes of data from i onwards with the next block of the track after them, at least need bytes
+        if the track has them, and the new position in the file
+        """
+        self.file.seek(position)
+        more = self.file.read(min(max(self.block_size, need - (len(data) - i)), end - position))
+        if not more:
+            raise MidiFileError(f"A track of {self.path} is longer than the file")
+        return data[i:] + more, position + len(more)
+
+    def events(self, track):
+        """
+        Yields the events of one track in order, see the class. The end of track event is not yielded
+        """
+        offset, length = self.tracks[track]
+        position = offset
+        end = offset + length
+        data = b""
+        i = 0
+        tick = 0
+        status = 0
+        try:
+            while True:
+                # the fixed part of an event is at most 4 bytes of delta time, a status and 2 data bytes, or a
+                # meta type and 4 bytes of length
+                if len(data) - i < 16 and position < end:
+                    data, position = self.refill(data, i, position, end, 16)
+                    i = 0
+                if i >= len(data):
+                    return
+
+                byte = data[i]
+                i += 1
+                delta = byte & 0x7F
+                while byte & 0x80:
+                    byte = data[i]
+                    i += 1
+                    delta = (delta << 7) | (byte & 0x7F)
+                tick += delta
+
+                # a channel message without a status byte repeats the status of the channel message before it
+                # (running status). Meta and system exclusive events in between are allowed to keep it, as many
+                # files rely on that even though the standard cancels it
+                if data[i] & 0x80:
+                    if data[i] < SYSEX:
+                        status = data[i]
+                    event_status = data[i]
+                    i += 1
+                elif status == 0:
+                    raise MidiFileError(f"{self.path} has an event without a status in track {track}")
+                else:
+                    event_status = status
+
+                if event_status < SYSEX:
+                    a = data[i]
+                    if status & 0xF0 in (PROGRAM_CHANGE, CHANNEL_PRESSURE):
+                        i += 1
+                        yield (tick, status, a, 0)
+                    else:
+                        b = data[i + 1]
+                        i += 2
+                        yield (tick, status, a, b)
+                    continue
+
+                if event_status == META:
+                    kind = data[i]
+                    i += 1
+                elif event_status in (SYSEX, ESCAPE):
+                    kind = None
+                else:
+                    raise MidiFileError(f"{self.path} has an unknown event {event_status:#x} in track {track}")
+                byte = data[i]
+                i += 1
+                size = byte & 0x7F
+                while byte & 0x80:
+                    byte = data[i]
+                    i += 1
+                    size = (size << 7) | (byte & 0x7F)
+                if len(data) - i < size:
+                    data, position = self.refill(data, i, position, end, size)
+                    i = 0
+                payload = data[i:i + size]
+                i += size
+
+                if kind == END_OF_TRACK:
+                    return
+                yield (tick, event_status, kind, payload)
+        except IndexError:
+            raise MidiFileError(f"Track {track} of {self.path} is cut off")
+
+    def merged(self):
+        """
+        Yields the events of every track in order of time. Events at the same tick come out in track order,
+        so the tempo changes of the first track come before the notes.
+        The tracks are merged MERGE_SPAN ticks at a time: the events of that span are taken from every track and
+        sorted together, which is much faster than comparing the tracks event by event
+        """
+        sources = [self.events(track) for track in range(len(self.tracks))]
+        heads = [next(source, None) for source in sources]
+        while True:
+            waiting = [head[0] for head in heads if head is not None]
+            if not waiting:
+                return
+            horizon = min(waiting) + MERGE_SPAN
+            batch = []
+            for number, source in enumerate(sources):
+                head = heads[number]
+                while head is not None and head[0] < horizon:
+                    batch.append(head)
+                    head = next(source, None)
+                heads[number] = head
+            # the sort is stable, so events at the same tick stay in track order
+            batch.sort(key=itemgetter(0))
+            yield from batch
+
+    def timedEvents(self):
+        """
+        Yields the events of every track as (seconds, status, a, b) in order of time, following the tempo changes
+        """
+        per_tick = self.secondsPerTick()
+        base_tick = 0
+        base_seconds = 0.0
+        for tick, status, a, b in self.merged():
+            seconds = base_seconds + (tick - base_tick) * per_tick
+            if status == META and a == TEMPO and len(b) == 3:
+                base_tick, base_seconds = tick, seconds
+                per_tick = self.secondsPerTick(int.from_bytes(b, "big"))
+            yield (seconds, status, a, b)
+
+    def notes(self, channels=None, max_duration=MAX_NOTE_SECONDS):
+        """
+        Yields the notes as (onset, pitch, duration, velocity) in seconds, in order of onset
+        channels: the channels (0 to 15) to read notes from, by default every channel
+        max_duration: notes held longer than this many seconds are ended there, see MAX_NOTE_SECONDS
+        A note comes out once it has ended and every note that started before it has come out, so only the
+        notes that started less than max_duration before the earliest note still sounding are held in memory
+        """
+        # (channel, pitch) to the numbers of the notes of that key that have started, earliest first.
+        # Notes are numbered in the order they start
+        sounding = {}
+        started = 0
+        # number to (key, onset, velocity) of the notes that have started and not ended, earliest first
+        held = {}
+        # the notes that have ended but can not come out yet by number, and the number of the next one to come out
+        finished = {}
+        next_out = 0
+        seconds = 0.0
+
+        for seconds, status, a, b in self.timedEvents():
+            kind = status & 0xF0
+            if kind != NOTE_ON and kind != NOTE_OFF:
+                continue
+            channel = status & 0x0F
+            if channels is not None and channel not in channels:
+                continue
+
+            key = (channel, a)
+            if kind == NOTE_ON and b > 0:
+                numbers = sounding.get(key)
+                if numbers is None:
+                    numbers = sounding[key] = deque()
+                numbers.append(started)
+                held[started] = (key, seconds, b)
+                started += 1
+
+                # a note that is held far too long (a missing note off) is ended, so the notes after it do not
+                # pile up waiting for it
+                while next_out in held and seconds - held[next_out][1] > max_duration:
+                    (note_channel, pitch), onset, velocity = held.pop(next_out)
+                    sounding[(note_channel, pitch)].remove(next_out)
+                    finished[next_out] = (onset, pitch, max_duration, velocity)
+                    while next_out in finished:
+                        yield finished.pop(next_out)
+                        next_out += 1
+                continue
+
+            # a note off, or a note on with velocity 0, ends the earliest note of that key
+            numbers = sounding.get(key)
+            if not numbers:
+                continue
+            number = numbers.popleft()
+            key, onset, velocity = held.pop(number)
+            finished[number] = (onset, a, seconds - onset, velocity)
+            while next_out in finished:
+                yield finished.pop(next_out)
+                next_out += 1
+
+        # notes that are never let go end with the last event
+        for number, ((channel, pitch), onset, velocity) in held.items():
+            finished[number] = (onset, pitch, min(seconds - onset, max_duration), velocity)
+        for number in sorted(finished):
+            yield finished[number]
+
+
+def loadNotes(path, channels=None, batch=4096):
+    """
+    Reads the notes of a MIDI file into a NoteStore, see MidiReader.notes()
+    batch: how many notes are added to the store at a time
+    """
+    store = NoteStore()
+    reader = MidiReader(path)
+    try:
+        onsets, pitches, durations, velocities = [], [], [], []
+        for onset, pitch, duration, velocity in reader.notes(channels):
+            onsets.append(onset)
+            pitches.append(pitch)
+            durations.append(duration)
+            velocities.append(velocity)
+            if len(onsets) >= batch:
+                store.extend(onsets, pitches, durations, velocities)
+                onsets, pitches, durations, velocities = [], [], [], []
+        store.extend(onsets, pitches, durations, velocities)
+    finally:
+        reader.close()
+    return store
+
+
+class MidiWriter():
+    """
+    Use this class to write a MIDI file event by event. Tracks are written one after another: events go to the
+    current track until endTrack() is called, and the length of the track is filled in then
+    """
+    def __init__(self, path, division=DIVISION, format=1):
+        """
+        path: the MIDI file to write
+        division: ticks per quarter note
+        format: 0 for a single track, 1 for tracks that play at the same time
+        """
+        self.path = path
+        self.division = division
+        self.format = format
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(b"MThd", 6, format, 0, division))
+        self.track_count = 0
+
+        # where the events of the current track start, None between tracks
+        self.track_start = None
+        self.tick = 0
+        self.status = 0
+
+    def startTrack(self):
+        """
+        Starts a new track, ending the current one
+        """
+        if self.track_start is not None:
+            self.endTrack()
+        if self.format == 0 and self.track_count:
+            raise MidiFileError("A format 0 MIDI file only has one track")
+        self.file.write(CHUNK.pack(b"MTrk", 0))
+        self.track_start = self.file.tell()
+        self.tick = 0
+        self.status = 0
+
+    def event(self, tick, status, a=0, b=0):
+        """
+        Writes an event, in the same form MidiReader yields them. tick is counted from the start of the track
+        and can not be before the event written before it
+        """
+        if self.track_start is None:
+            self.startTrack()
+        if tick < self.tick:
+            raise MidiFileError(f"An event at tick {tick} was written after one at tick {self.tick}")
+        data = varLen(tick - self.tick)
+        if status < SYSEX:
+            # running status: the status is left out when it is the same as the event before
+            if status != self.status:
+                data += bytes((status,))
+            self.status = status
+            if status & 0xF0 in (PROGRAM_CHANGE, CHANNEL_PRESSURE):
+                data += bytes((a,))
+            else:
+                data += bytes((a, b))
+        else:
+            data += bytes((status, a) if status == META else (status,)) + varLen(len(b)) + b
+            self.status = 0
+        self.file.write(data)
+        self.tick = tick
+
+    def noteOn(self, tick, pitch, velocity=100, channel=0):
+        self.event(tick, NOTE_ON | channel, pitch, velocity)
+
+    def noteOff(self, tick, pitch, channel=0):
+        self.event(tick, NOTE_OFF | channel, pitch, 0)
+
+    def setTempo(self, tick, bpm):
+        """
+        Changes the tempo in quarter notes per minute
+        """
+        self.event(tick, META, TEMPO, int(round(60000000 / bpm)).to_bytes(3, "big"))
+
+    def endTrack(self):
+        """
+        Ends the current track and fills in its length
+        """
+        if self.track_start is None:
+            return
+        self.event(self.tick, META, END_OF_TRACK, b"")
+        end = self.file.tell()
+        self.file.seek(self.track_start - 4)
+        self.file.write(struct.pack(">I", end - self.track_start))
+        self.file.seek(end)
+        self.track_count += 1
+        self.track_start = None
+
+    def close(self):
+        """
+        Ends the current track and fills in the number of tracks
+        """
+        self.endTrack()
+        self.file.seek(10)
+        self.file.write(struct.pack(">H", self.track_count))
+        self.file.close()
+
+
+def writeNotes(path, notes, bpm=120, division=DIVISION, channel=0, program=None):
+    """
+    Writes notes to a single track MIDI file
+    notes: (onset, pitch, duration, velocity) in seconds, in order of onset, for example a NoteStore
+    bpm: the tempo of the file. It only changes how the notes look in a score, they play at the same times
+    program: the General MIDI instrument (0 to 127), by default the player's own
+    returns the number of notes written
+    """
+    ticks_per_second = bpm / 60.0 * division
+    writer = MidiWriter(path, division, format=0)
+    count = 0
+    try:
+        writer.setTempo(0, bpm)
+        if program is not None:
+            writer.event(0, PROGRAM_CHANGE | channel, program)
+
+        # the note offs that are still to come, as (tick, pitch), so they can be written in order between the note ons
+        offs = []
+        for onset, pitch, duration, velocity in notes:
+            start = int(round(onset * ticks_per_second))
+            while offs and offs[0][0] <= start:
+                tick, off_pitch = heapq.heappop(offs)
+                writer.noteOff(tick, off_pitch, channel)
+            writer.noteOn(start, int(pitch), int(velocity), channel)
+            heapq.heappush(offs, (start + max(1, int(round(duration * ticks_per_second))), int(pitch)))
+            count += 1
+        while offs:
+            tick, off_pitch = heapq.heappop(offs)
+            writer.noteOff(tick, off_pitch, channel)
+    finally:
+        writer.close()
+    return count
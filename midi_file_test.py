@@ -0,0 +1,162 @@
+"""
+Description: Tests for reading and writing MIDI files.
+"""
+from midi_file import *
+import pytest
+
+
+SCALE = [(i * 0.5, 60 + i, 0.4, 90) for i in range(8)]
+
+
+class TestMidiFile:
+    def test_varLen(self):
+        assert varLen(0) == b"\x00"
+        assert varLen(0x7F) == b"\x7f"
+        assert varLen(0x80) == b"\x81\x00"
+        assert varLen(0x0FFFFFFF) == b"\xff\xff\xff\x7f"
+
+    def test_roundTrip(self, tmp_path):
+        path = str(tmp_path / "scale.mid")
+        assert writeNotes(path, SCALE, program=0) == 8
+        store = loadNotes(path)
+        assert len(store) == 8
+        for read, written in zip(store, SCALE):
+            assert read[1] == written[1] and read[3] == written[3]
+            assert read[0] == pytest.approx(written[0], abs=1e-3)
+            assert read[2] == pytest.approx(written[2], abs=1e-3)
+
+    def test_runningStatus(self, tmp_path):
+        # the second and third notes leave out the status byte
+        path = str(tmp_path / "running.mid")
+        writer = MidiWriter(path)
+        writer.noteOn(0, 60)
+        writer.noteOn(10, 62)
+        writer.noteOn(20, 64, 0)
+        writer.close()
+        with open(path, "rb") as f:
+            data = f.read()
+        assert data.count(bytes((NOTE_ON,))) == 1
+        reader = MidiReader(path)
+        assert list(reader.events(0)) == [(0, NOTE_ON, 60, 100), (10, NOTE_ON, 62, 100), (20, NOTE_ON, 64, 0)]
+        reader.close()
+
+    def test_tempoAcrossTracks(self, tmp_path):
+        # the tempo is in the first track and the notes in the second, the way format 1 files are made
+        path = str(tmp_path / "tempo.mid")
+        writer = MidiWriter(path, division=100)
+        writer.setTempo(0, 120)
+        writer.setTempo(200, 60)
+        writer.startTrack()
+        writer.noteOn(100, 60)
+        writer.noteOff(300, 60)
+        writer.close()
+        reader = MidiReader(path)
+        assert reader.format == 1 and len(reader.tracks) == 2
+        assert list(reader.notes()) == [(pytest.approx(0.5), 60, pytest.approx(1.5), 100)]
+        reader.close()
+
+    def test_mergeSpans(self, tmp_path):
+        # tracks with events far apart are merged across many spans, in order of time and then of track
+        path = str(tmp_path / "merge.mid")
+        writer = MidiWriter(path)
+        for track, step in enumerate((1000, 3000, 7000)):
+            writer.startTrack()
+            for i in range(30):
+                writer.noteOn(i * step, 60 + track)
+        writer.close()
+        reader = MidiReader(path)
+        events = list(reader.merged())
+        reader.close()
+        assert len(events) == 90
+        assert [event[0] for event in events] == sorted(event[0] for event in events)
+        assert [event[2] for event in events[:3]] == [60, 61, 62]
+
+    def test_notesInOnsetOrder(self, tmp_path):
+        # a long note that ends after the short ones still comes out first, and repeated keys pair in order
+        path = str(tmp_path / "overlap.mid")
+        writer = MidiWriter(path, division=100)
+        writer.noteOn(0, 48)
+        writer.noteOn(0, 60)
+        writer.noteOn(50, 60)
+        writer.noteOff(100, 60)
+        writer.noteOff(150, 60)
+        writer.noteOn(150, 64)
+        writer.noteOff(200, 64)
+        writer.noteOff(400, 48)
+        writer.close()
+        reader = MidiReader(path, block_size=5)
+        notes = [(round(onset, 3), pitch, round(duration, 3)) for onset, pitch, duration, velocity in reader.notes()]
+        assert notes == [(0.0, 48, 2.0), (0.0, 60, 0.5), (0.25, 60, 0.5), (0.75, 64, 0.25)]
+        reader.close()
+
+    def test_smallBlocks(self, tmp_path):
+        # events and meta data cut across many buffer refills
+        path = str(tmp_path / "blocks.mid")
+        writer = MidiWriter(path)
+        writer.event(0, META, 0x03, b"a track name longer than the block")
+        for i in range(200):
+            writer.noteOn(i * 1000, 40 + i % 40)
+        writer.close()
+        events = list(MidiReader(path, block_size=3).events(0))
+        assert events[0] == (0, META, 0x03, b"a track name longer than the block")
+        assert len(events) == 201 and events[-1] == (199000, NOTE_ON, 79, 100)
+
+    def test_outOfOrder(self, tmp_path):
+        writer = MidiWriter(str(tmp_path / "order.mid"))
+        writer.noteOn(10, 60)
+        with pytest.raises(MidiFileError):
+            writer.noteOn(5, 62)
+        writer.close()
+
+    def test_notMidi(self, tmp_path):
+        path = tmp_path / "text.mid"
+        path.write_bytes(b"not a midi file at all")
+        with pytest.raises(MidiFileError):
+            MidiReader(str(path))
+
+    def test_cutOff(self, tmp_path):
+        path = tmp_path / "cut.mid"
+        writeNotes(str(path), SCALE)
+        path.write_bytes(path.read_bytes()[:-10])
+        with pytest.raises(MidiFileError):
+            list(MidiReader(str(path)).notes())
+
+    def test_runningStatusAcrossMeta(self, tmp_path):
+        # 90 3C 64, a text event, then 3C 00 with the note on status left out
+        track = bytes((0x00, 0x90, 0x3C, 0x64, 0x10, 0xFF, 0x01, 0x02)) + b"hi" + bytes((0x10, 0x3C, 0x00))
+        track += bytes((0x00, 0xFF, END_OF_TRACK, 0x00))
+        path = tmp_path / "meta.mid"
+        path.write_bytes(HEADER.pack(b"MThd", 6, 0, 1, 96) + CHUNK.pack(b"MTrk", len(track)) + track)
+        reader = MidiReader(str(path))
+        assert list(reader.events(0)) == [(0, NOTE_ON, 0x3C, 0x64), (16, META, 0x01, b"hi"), (32, NOTE_ON, 0x3C, 0)]
+        reader.close()
+
+    def test_trackLongerThanFile(self, tmp_path):
+        # cut off between two events, so only the length of the track shows the file is incomplete
+        path = tmp_path / "long.mid"
+        writer = MidiWriter(str(path))
+        for i in range(2000):
+            writer.noteOn(i * 10, 60)
+        writer.close()
+        data = path.read_bytes()
+        path.write_bytes(data[:HEADER.size + CHUNK.size + 4 * 100])
+        reader = MidiReader(str(path))
+        with pytest.raises(MidiFileError):
+            list(reader.events(0))
+        reader.close()
+
+    def test_hungNote(self, tmp_path):
+        # the first note is never let go, the notes after it still come out before the file is read to the end
+        path = str(tmp_path / "hung.mid")
+        writer = MidiWriter(path, division=100)
+        writer.noteOn(0, 40)
+        for i in range(1, 400):
+            writer.noteOn(i * 100, 60)
+            writer.noteOff(i * 100 + 50, 60)
+        writer.close()
+        reader = MidiReader(path)
+        notes = reader.notes(max_duration=10.0)
+        assert next(notes) == (0.0, 40, 10.0, 100)
+        assert next(notes)[0] == pytest.approx(0.5)
+        assert len(list(notes)) == 398
+        reader.close()
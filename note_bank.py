@@ -0,0 +1,194 @@
+import argparse
+import mmap
+import struct
+import time
+import numpy as np
+import pygame
+from config import SAMPLE_RATE, NOTE_BANK_FILE
+from synth import initMixer, synthesize, timbres
+"""
+This file builds and reads the note bank: every note the activities play (all pitches, in several timbres and
+lengths) rendered ahead of time into one file.
+At runtime the file is memory-mapped, so opening it only reads the small index, and the samples of a note are a
+view of the file that the operating system loads when the note is first played.
+
+Build the bank with:
+    python note_bank.py --output notes.bank
+"""
+
+# the start of the file: tag, version, sample rate, channels, number of notes, size of the timbre names
+HEADER = struct.Struct("<4sHIHII")
+MAGIC = b"BANK"
+VERSION = 1
+
+# one entry of the index for every note. offset is where its samples start in the file, frames how many there are
+INDEX = np.dtype([("pitch", "<f4"), ("duration", "<f4"), ("timbre", "<u2"), ("offset", "<u8"), ("frames", "<u4")])
+
+DEFAULT_PITCHES = range(36, 97)
+DEFAULT_TIMBRES = ("sine", "square", "triangle")
+DEFAULT_DURATIONS = (0.25, 0.5, 1.0)
+
+
+class NoteBankError(Exception):
+    """
+    raise this exception if a note bank can not be read, or was built for another mixer format
+    """
+    pass
+
+
+def buildBank(path, pitches=DEFAULT_PITCHES, timbre_names=DEFAULT_TIMBRES, durations=DEFAULT_DURATIONS,
+              rate=SAMPLE_RATE, channels=2):
+    """
+    Renders every combination of pitch, timbre and duration and writes them to a note bank file.
+    The samples are stored as 16 bit integers, interleaved for the number of channels of the mixer, so they
+    can be handed to pygame.sndarray as they are
+    returns the number of notes written
+    """
+    names = "\n".join(timbre_names).encode("utf-8")
+    notes = [(pitch, duration, number) for number in range(len(timbre_names))
+             for pitch in pitches for duration in durations]
+    index = np.zeros(len(notes), INDEX)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, rate, channels, len(notes), len(names)))
+        f.write(names)
+        index_offset = f.tell()
+        f.write(index.tobytes())
+
+        for i, (pitch, duration, number) in enumerate(notes):
+            samples = synthesize(pitch, duration, timbre_names[number], rate)
+            data = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+            if channels > 1:
+                data = np.repeat(data[:, np.newaxis], channels, axis=1)
+
+            # samples start on an even byte so they can be viewed as 16 bit integers
+            if f.tell() % 2:
+                f.write(b"\0")
+            index[i] = (pitch, duration, number, f.tell(), len(samples))
+            f.write(data.tobytes())
+
+        # the index is written again now that the offsets are known
+        f.seek(index_offset)
+        f.write(index.tobytes())
+    return len(notes)
+
+
+class NoteBank():
+    """
+    A note bank opened with mmap. Looking up a note returns a view of the file, nothing is copied or read
+    until the samples are used
+    """
+    def __init__(self, path):
+        """
+        path: the note bank file made by buildBank()
+        """
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = None
+
+        # whatever is wrong with the file, the handles are closed and the caller gets a NoteBankError
+        try:
+            self.readIndex()
+        except NoteBankError:
+            self.close()
+            raise
+        except (ValueError, IndexError) as error:
+            self.close()
+            raise NoteBankError(f"{path} is not a note bank, or is damaged ({error})")
+
+    def readIndex(self):
+        """
+        Maps the file and reads its header, timbre names and index
+        """
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise NoteBankError(f"{self.path} is empty")
+
+        if len(self.map) < HEADER.size:
+            raise NoteBankError(f"{self.path} is not a note bank")
+        magic, version, self.rate, self.channels, count, names_size = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise NoteBankError(f"{self.path} is not a note bank, or was built by another version")
+
+        names = self.map[HEADER.size:HEADER.size + names_size].decode("utf-8")
+        self.timbre_names = names.split("\n") if names else []
+        # the index is copied out of the file right away, so no view keeps the map from being closed
+        index = np.frombuffer(self.map, INDEX, count, HEADER.size + names_size).tolist()
+
+        # maps (pitch, duration, timbre) to (offset, frames). Pitches and durations are kept as float32
+        # in the file, so they are looked up the same way
+        self.notes = {}
+        for pitch, duration, number, offset, frames in index:
+            if offset + frames * self.channels * 2 > len(self.map):
+                raise NoteBankError(f"{self.path} is cut off")
+            self.notes[(pitch, duration, self.timbre_names[number])] = (offset, frames)
+
+    def key(self, pitch, duration, timbre):
+        return (float(np.float32(pitch)), float(np.float32(duration)), timbre)
+
+    def has(self, pitch, duration, timbre="sine"):
+        return self.key(pitch, duration, timbre) in self.notes
+
+    def samples(self, pitch, duration, timbre="sine"):
+        """
+        Returns the samples of a note as a (frames, channels) int16 view of the file, or None if it is not
+        in the bank
+        """
+        entry = self.notes.get(self.key(pitch, duration, timbre))
+        if entry is None:
+            return None
+        offset, frames = entry
+        data = np.frombuffer(self.map, np.dtype("<i2"), frames * self.channels, offset)
+        return data.reshape(frames, self.channels) if self.channels > 1 else data
+
+    def sound(self, pitch, duration, timbre="sine"):
+        """
+        Returns the note as a pygame.mixer.Sound, or None if it is not in the bank or the mixer was started
+        with another format than the bank was built for (signed 16 bit samples at the rate and channels of
+        the bank), in which case the note has to be synthesized
+        """
+        frequency, size, channels = initMixer()
+        if frequency != self.rate or size != -16 or channels != self.channels:
+            return None
+        samples = self.samples(pitch, duration, timbre)
+        if samples is None:
+            return None
+        return pygame.sndarray.make_sound(samples)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+
+def openBank(path=NOTE_BANK_FILE):
+    """
+    Returns the NoteBank at path, or None if it has not been built or can not be read
+    """
+    try:
+        return NoteBank(path)
+    except (OSError, NoteBankError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the note bank")
+    parser.add_argument("--output", default=NOTE_BANK_FILE, help="the file to write (default %(default)s)")
+    parser.add_argument("--low", type=int, default=DEFAULT_PITCHES[0], help="the lowest MIDI note")
+    parser.add_argument("--high", type=int, default=DEFAULT_PITCHES[-1], help="the highest MIDI note")
+    parser.add_argument("--timbres", default=",".join(DEFAULT_TIMBRES),
+                        help="comma separated timbres, from: " + ", ".join(timbres))
+    parser.add_argument("--durations", default=",".join(str(d) for d in DEFAULT_DURATIONS),
+                        help="comma separated note lengths in seconds")
+    parser.add_argument("--channels", type=int, default=2, help="the number of channels of the mixer")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = buildBank(args.output, range(args.low, args.high + 1), args.timbres.split(","),
+                      [float(d) for d in args.durations.split(",")], channels=args.channels)
+    print(f"wrote {count} notes to {args.output} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Description: Tests for building and reading the note bank.
+"""
+from note_bank import *
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def bank(tmp_path):
+    path = tmp_path / "notes.bank"
+    buildBank(str(path), range(60, 62), ("sine",), (0.25,), channels=1)
+    return path
+
+
+def damage(bank, data):
+    bank.write_bytes(data)
+    with pytest.raises(NoteBankError):
+        NoteBank(str(bank))
+    assert openBank(str(bank)) is None
+
+
+class TestNoteBank:
+    def test_roundTrip(self, bank):
+        notes = NoteBank(str(bank))
+        assert notes.has(60, 0.25) and not notes.has(62, 0.25)
+        expected = (np.clip(synthesize(61, 0.25, "sine", notes.rate), -1.0, 1.0) * 32767).astype("<i2")
+        assert np.array_equal(notes.samples(61, 0.25), expected)
+        notes.close()
+
+    def test_empty(self, bank):
+        damage(bank, b"")
+
+    def test_shortHeader(self, bank):
+        damage(bank, bank.read_bytes()[:10])
+
+    def test_wrongMagic(self, bank):
+        damage(bank, b"XXXX" + bank.read_bytes()[4:])
+
+    def test_shortIndex(self, bank):
+        damage(bank, bank.read_bytes()[:HEADER.size + len(b"sine") + 10])
+
+    def test_badTimbre(self, bank):
+        data = bytearray(bank.read_bytes())
+        start = HEADER.size + len(b"sine")
+        entry = np.frombuffer(bytes(data[start:start + INDEX.itemsize]), INDEX).copy()
+        entry["timbre"] = 7
+        data[start:start + INDEX.itemsize] = entry.tobytes()
+        damage(bank, bytes(data))
+
+    def test_cutOff(self, bank):
+        damage(bank, bank.read_bytes()[:-100])
+
+    def test_soundStartsMixer(self, tmp_path):
+        # the mixer is started if nothing else has started it yet
+        path = str(tmp_path / "stereo.bank")
+        buildBank(path, range(60, 61), ("sine",), (0.25,), channels=2)
+        notes = NoteBank(path)
+        pygame.mixer.quit()
+        assert notes.sound(60, 0.25) is not None
+        assert notes.sound(61, 0.25) is None
+        notes.close()
+
+    @pytest.mark.parametrize("mixer", [(SAMPLE_RATE, 16, 2), (SAMPLE_RATE, -16, 1), (22050, -16, 2)])
+    def test_otherMixerFormat(self, tmp_path, monkeypatch, mixer):
+        # a mixer that does not take the samples of the bank as they are gets None, so the note is synthesized
+        path = str(tmp_path / "stereo.bank")
+        buildBank(path, range(60, 61), ("sine",), (0.25,), channels=2)
+        notes = NoteBank(path)
+        monkeypatch.setattr("note_bank.initMixer", lambda: mixer)
+        assert notes.sound(60, 0.25) is None
+        notes.close()
@@ -0,0 +1,249 @@
+import struct
+import numpy as np
+"""
+This file defines the NoteStore() class, which keeps the notes of a recording (Free Play, Combination Game)
+as columns of NumPy arrays instead of a list of objects: one array each for onset, pitch, duration and velocity.
+Notes are kept sorted by onset, so finding the notes at any time is a binary search, ranges of notes are views
+of the arrays instead of copies, and a recording is saved as the raw bytes of the columns.
+"""
+
+# the type of each column
+COLUMNS = (("onset", np.float64), ("pitch", np.int16), ("duration", np.float32), ("velocity", np.uint8))
+
+# the start of a saved recording: a tag, the format version and the number of notes
+HEADER = struct.Struct("<4sHI")
+MAGIC = b"NOTE"
+VERSION = 1
+
+
+class NoteFileError(Exception):
+    """
+    raise this exception if a saved recording can not be read
+    """
+    pass
+
+
+class NoteView():
+    """
+    A range of notes of a NoteStore. The columns are views of the store's arrays, so making one does not copy anything.
+    A view is only valid until more notes are added to the store
+    """
+    def __init__(self, onset, pitch, duration, velocity):
+        self.onset = onset
+        self.pitch = pitch
+        self.duration = duration
+        self.velocity = velocity
+
+    def __len__(self):
+        return len(self.onset)
+
+    def __getitem__(self, index):
+        """
+        Returns note number index as (onset, pitch, duration, velocity)
+        """
+        return (float(self.onset[index]), int(self.pitch[index]), float(self.duration[index]),
+                int(self.velocity[index]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def seek(self, time):
+        """
+        Returns the index of the first note starting at or after time
+        """
+        return int(np.searchsorted(self.onset, time, side="left"))
+
+    def between(self, start, end):
+        """
+        Returns the notes starting at or after start and before end, without copying them
+        """
+        first = self.seek(start)
+        last = self.seek(end)
+        return self.range(first, last)
+
+    def range(self, first, last):
+        """
+        Returns notes first up to (not including) last, without copying them
+        """
+        return NoteView(self.onset[first:last], self.pitch[first:last], self.duration[first:last],
+                        self.velocity[first:last])
+
+    def melody(self, timbre="sine"):
+        """
+        Yields the notes as (onset, pitch, duration, timbre), which is what wav_recorder.py renders
+        """
+        for onset, pitch, duration, velocity in self:
+            yield (onset, pitch, duration, timbre)
+
+
+class NoteStore(NoteView):
+    """
+    Use this class to record notes and look them up by time
+    """
+    def __init__(self, capacity=256):
+        """
+        capacity: how many notes there is room for before the arrays have to grow
+        """
+        self.count = 0
+        self.buffers = {name: np.zeros(capacity, dtype) for name, dtype in COLUMNS}
+
+        # the longest note, so the notes still sounding at a time can be found with a binary search
+        self.longest = 0.0
+        self.updateViews()
+
+    def updateViews(self):
+        """
+        Points the columns at the filled part of the arrays
+        """
+        NoteView.__init__(self, *(self.buffers[name][:self.count] for name, dtype in COLUMNS))
+
+    def reserve(self, capacity):
+        """
+        Makes room for at least capacity notes. The arrays grow to double their size, so adding notes one at
+        a time only copies them a few times overall
+        """
+        current = len(self.buffers["onset"])
+        if capacity <= current:
+            return
+        size = max(capacity, current * 2)
+        for name, dtype in COLUMNS:
+            grown = np.zeros(size, dtype)
+            grown[:self.count] = self.buffers[name][:self.count]
+            self.buffers[name] = grown
+
+    def append(self, onset, pitch, duration, velocity=100):
+        """
+        Adds a note. Notes are normally added in the order they are played, which is O(1). A note that
+        starts before the last one makes the notes get sorted again
+        """
+        self.extend([onset], [pitch], [duration], [velocity])
+
+    def extend(self, onsets, pitches, durations, velocities=None):
+        """
+        Adds many notes at once, given as arrays or lists of the same length
+        """
+        onsets = np.asarray(onsets, dtype=np.float64)
+        columns = [onsets, pitches, durations, velocities if velocities is not None else np.full(len(onsets), 100)]
+        added = len(onsets)
+        if added == 0:
+            return
+        self.reserve(self.count + added)
+        for (name, dtype), values in zip(COLUMNS, columns):
+            self.buffers[name][self.count:self.count + added] = values
+        self.count += added
+        self.longest = max(self.longest, float(np.max(durations)))
+
+        # the notes are sorted again if any of the new ones start before the one added before them
+        start = self.count - added
+        if (start > 0 and onsets[0] < self.buffers["onset"][start - 1]) or np.any(np.diff(onsets) < 0):
+            order = np.argsort(self.buffers["onset"][:self.count], kind="stable")
+            for name, dtype in COLUMNS:
+                self.buffers[name][:self.count] = self.buffers[name][:self.count][order]
+        self.updateViews()
+
+    def clear(self):
+        self.count = 0
+        self.longest = 0.0
+        self.updateViews()
+
+    def sounding(self, time):
+        """
+        Returns the indexes of the notes that are sounding at time, for drawing or playing from the middle
+        of a recording. Only the notes that started less than the longest note ago are looked at
+        """
+        first = self.seek(time - self.longest)
+        last = int(np.searchsorted(self.onset, time, side="right"))
+        ends = self.onset[first:last] + self.duration[first:last]
+        return np.flatnonzero(ends > time) + first
+
+    def toBytes(self):
+        """
+        Returns the recording as bytes: the header and then every column as raw little endian values
+        """
+        parts = [HEADER.pack(MAGIC, VERSION, self.count)]
+        for name, dtype in COLUMNS:
+            parts.append(self.buffers[name][:self.count].astype(np.dtype(dtype).newbyteorder("<")).tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def fromBytes(cls, data):
+        """
+        Makes a NoteStore from bytes made by toBytes()
+        """
+        if len(data) < HEADER.size:
+            raise NoteFileError("The recording is too short")
+        magic, version, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise NoteFileError("This is not a recording, or it was saved by another version")
+
+        # the size is checked before the columns are made, so a damaged count can not ask for more memory
+        # than the file could fill
+        record_size = sum(np.dtype(dtype).itemsize for name, dtype in COLUMNS)
+        if HEADER.size + count * record_size > len(data):
+            raise NoteFileError("The recording is cut off")
+
+        store = cls(max(count, 1))
+        offset = HEADER.size
+        for name, dtype in COLUMNS:
+            dtype = np.dtype(dtype).newbyteorder("<")
+            size = dtype.itemsize * count
+            store.buffers[name][:count] = np.frombuffer(data, dtype, count, offset)
+            offset += size
+        store.count = count
+        store.longest = float(store.buffers["duration"][:count].max()) if count else 0.0
+        store.updateViews()
+        return store
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.toBytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.fromBytes(f.read())
+
+
+class PlaybackCursor():
+    """
+    Plays a NoteStore back, handing out the notes that start in each frame. Moving the cursor is a binary
+    search and every frame only looks at the notes it hands out, so scrubbing and looping long recordings
+    costs the same as short ones
+    """
+    def __init__(self, store, loop_start=None, loop_end=None):
+        """
+        store: the notes to play
+        loop_start, loop_end: the part of the recording that is repeated, in seconds. Without a loop_end
+        the recording plays once
+        """
+        self.store = store
+        self.loop_start = loop_start if loop_start is not None else 0.0
+        self.loop_end = loop_end
+        self.time = self.loop_start
+        self.index = store.seek(self.time)
+
+    def seek(self, time):
+        """
+        Jumps to a time in the recording
+        """
+        self.time = time
+        self.index = self.store.seek(time)
+
+    def advance(self, seconds):
+        """
+        Moves the cursor forward
+        returns a list of NoteView with the notes that start during that time, more than one if the loop wrapped
+        """
+        views = []
+        end = self.time + seconds
+        while self.loop_end is not None and end >= self.loop_end and self.loop_end > self.loop_start:
+            last = self.store.seek(self.loop_end)
+            views.append(self.store.range(self.index, last))
+            end = self.loop_start + (end - self.loop_end)
+            self.index = self.store.seek(self.loop_start)
+        last = self.store.seek(end)
+        views.append(self.store.range(self.index, last))
+        self.index = last
+        self.time = end
+        return views
@@ -0,0 +1,79 @@
+"""
+Description: Tests for the NoteStore class used to keep recorded notes.
+"""
+from note_store import *
+import numpy as np
+import pytest
+
+
+def scale():
+    # eight notes half a second apart
+    store = NoteStore(capacity=2)
+    for i in range(8):
+        store.append(i * 0.5, 60 + i, 0.4, 90)
+    return store
+
+
+class TestNoteStore:
+    def test_appendGrows(self):
+        store = scale()
+        assert len(store) == 8
+        assert store[3] == (1.5, 63, pytest.approx(0.4), 90)
+        assert list(store.pitch) == list(range(60, 68))
+
+    def test_appendOutOfOrder(self):
+        store = scale()
+        store.append(0.25, 50, 0.1)
+        assert list(store.onset[:3]) == [0.0, 0.25, 0.5]
+        assert store[1][1] == 50
+
+    def test_seek(self):
+        store = scale()
+        assert store.seek(0) == 0
+        assert store.seek(1.5) == 3
+        assert store.seek(1.6) == 4
+        assert store.seek(100) == 8
+
+    def test_betweenIsView(self):
+        store = scale()
+        view = store.between(1.0, 2.0)
+        assert [note[1] for note in view] == [62, 63]
+        assert np.shares_memory(view.onset, store.buffers["onset"])
+
+    def test_sounding(self):
+        store = NoteStore()
+        store.append(0.0, 60, 3.0)
+        store.append(1.0, 62, 0.5)
+        store.append(2.0, 64, 0.5)
+        assert list(store.sounding(1.2)) == [0, 1]
+        assert list(store.sounding(1.6)) == [0]
+        assert list(store.sounding(5.0)) == []
+
+    def test_bytes(self):
+        store = scale()
+        copy = NoteStore.fromBytes(store.toBytes())
+        assert list(copy) == list(store)
+        assert len(store.toBytes()) == HEADER.size + 8 * (8 + 2 + 4 + 1)
+
+    def test_badBytes(self):
+        with pytest.raises(NoteFileError):
+            NoteStore.fromBytes(b"nope")
+        data = scale().toBytes()
+        with pytest.raises(NoteFileError):
+            NoteStore.fromBytes(data[:-3])
+
+    def test_inflatedCount(self):
+        # a damaged count is caught before any memory is allocated for it
+        data = bytearray(scale().toBytes())
+        data[:HEADER.size] = HEADER.pack(MAGIC, VERSION, 0xFFFFFFFF)
+        with pytest.raises(NoteFileError):
+            NoteStore.fromBytes(bytes(data))
+
+    def test_cursorLoop(self):
+        store = scale()
+        cursor = PlaybackCursor(store, 1.0, 2.0)
+        assert [len(view) for view in cursor.advance(0.6)] == [2]
+        # wraps past the end of the loop back to its start
+        views = cursor.advance(0.6)
+        assert [note[1] for view in views for note in view] == [62]
+        assert cursor.time == pytest.approx(1.2)
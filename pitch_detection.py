@@ -0,0 +1,231 @@
+import math
+import os
+import struct
+import numpy as np
+"""
+This file finds the pitch of recorded notes, so the Pitch Matching activity can grade sung or played attempts
+from WAV files without a live microphone.
+The WAV file is memory-mapped and read in fixed-size chunks, so a long recording never has to fit in memory,
+and the pitch of every frame of a chunk is found at once with a vectorized YIN estimator.
+"""
+
+# WAV sample formats
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavFormatError(Exception):
+    """
+    raise this exception if a file is not a WAV file or uses a sample format that can not be read
+    """
+    pass
+
+
+class WavFile():
+    """
+    A WAV file whose samples are memory-mapped instead of read into memory
+    """
+    def __init__(self, path):
+        """
+        path: the path of the WAV file
+        """
+        self.path = path
+        self.readHeader()
+
+        # 24 bit samples have no NumPy type, so their bytes are mapped and put together chunk by chunk.
+        # A file without any samples can not be mapped, so it gets an empty array instead
+        if self.sample_width == 3:
+            dtype, shape = np.uint8, (self.frames, self.channels, 3)
+        else:
+            dtype, shape = self.dtype, (self.frames, self.channels)
+        if self.frames:
+            self.samples = np.memmap(path, dtype, "r", self.data_offset, shape)
+        else:
+            self.samples = np.zeros(shape, dtype)
+
+    def readHeader(self):
+        """
+        Reads the format and finds where the samples start, walking the RIFF chunks of the file
+        """
+        with open(self.path, "rb") as f:
+            header = f.read(12)
+            if len(header) < 12:
+                raise WavFormatError(f"{self.path} is not a WAV file")
+            riff, size, wave = struct.unpack("<4sI4s", header)
+            if riff != b"RIFF" or wave != b"WAVE":
+                raise WavFormatError(f"{self.path} is not a WAV file")
+
+            fmt = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise WavFormatError(f"{self.path} has no data chunk")
+                name, size = struct.unpack("<4sI", header)
+                if name == b"fmt ":
+                    fmt = f.read(size)
+                elif name == b"data":
+                    self.data_offset = f.tell()
+                    data_size = size
+                    break
+                else:
+                    f.seek(size, 1)
+                # chunks are padded to an even number of bytes
+                if size % 2:
+                    f.seek(1, 1)
+
+        if fmt is None:
+            raise WavFormatError(f"{self.path} has no format chunk")
+        if len(fmt) < 16:
+            raise WavFormatError(f"{self.path} has a format chunk that is too short")
+        tag, self.channels, self.rate, rate_bytes, align, bits = struct.unpack("<HHIIHH", fmt[:16])
+        if self.channels == 0 or self.rate == 0:
+            raise WavFormatError(f"{self.path} has no channels or no sample rate")
+        if tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            tag = struct.unpack("<H", fmt[24:26])[0]
+        self.sample_width = bits // 8
+
+        if tag == WAVE_FORMAT_PCM and self.sample_width in (1, 2, 3, 4):
+            self.dtype = {1: np.uint8, 2: np.dtype("<i2"), 3: None, 4: np.dtype("<i4")}[self.sample_width]
+        elif tag == WAVE_FORMAT_IEEE_FLOAT and self.sample_width in (4, 8):
+            self.dtype = np.dtype("<f4") if self.sample_width == 4 else np.dtype("<f8")
+        else:
+            raise WavFormatError(f"{self.path} uses an unsupported sample format ({tag}, {bits} bits)")
+        self.float_format = tag == WAVE_FORMAT_IEEE_FLOAT
+
+        # a recording cut off while it was written, or one written as a stream (data size 0xFFFFFFFF), can have
+        # a data size longer than the file, so only the samples that are really there are read
+        data_size = min(data_size, max(0, os.path.getsize(self.path) - self.data_offset))
+        self.frames = data_size // (self.channels * self.sample_width)
+
+    def read(self, start, count):
+        """
+        Returns count frames starting at frame start, mixed down to mono float32 from -1 to 1
+        """
+        raw = self.samples[start:start + count]
+        if self.sample_width == 3:
+            # little endian bytes, shifted into the top of a 32 bit integer so the sign comes out right
+            raw = raw.astype(np.int32)
+            data = ((raw[..., 0] << 8) | (raw[..., 1] << 16) | (raw[..., 2] << 24)).astype(np.float32) / 2 ** 31
+        elif self.float_format:
+            data = raw.astype(np.float32)
+        elif self.sample_width == 1:
+            data = (raw.astype(np.float32) - 128) / 128
+        else:
+            data = raw.astype(np.float32) / float(np.iinfo(self.dtype).max)
+        return data.mean(axis=1)
+
+    def chunks(self, chunk_frames):
+        """
+        Yields the file as mono float32 arrays of chunk_frames frames, the last one can be shorter
+        """
+        for start in range(0, self.frames, chunk_frames):
+            yield self.read(start, chunk_frames)
+
+
+def yin(frames, rate, fmin=60.0, fmax=1500.0, threshold=0.15):
+    """
+    Estimates the pitch of many frames at once with the YIN method
+    frames: a 2D array with one frame of samples per row. Half of the frame length is the integration window,
+    so it has to be longer than the period of fmin
+    rate: the sample rate
+    fmin: the lowest frequency looked for
+    fmax: the highest frequency looked for
+    threshold: how low the normalized difference has to dip for a period to be accepted, lower is stricter
+    returns (f0, confidence) arrays with a value for every frame. The confidence goes from 0 to 1, and frames
+    without a clear pitch (silence, noise) have a low confidence
+    """
+    count, length = frames.shape
+    window = length // 2
+    tau_min = max(2, int(rate / fmax))
+    tau_max = min(window - 1, int(math.ceil(rate / fmin)))
+
+    # difference function d(tau) = e(0) + e(tau) - 2 r(tau): the energies come from a running sum of squares
+    # and the correlation r(tau) of the first half of the frame with the whole frame from an FFT
+    size = 1 << int(math.ceil(math.log2(2 * length)))
+    spectrum = np.fft.rfft(frames, size)
+    first_half = np.fft.rfft(frames[:, :window], size)
+    correlation = np.fft.irfft(np.conj(first_half) * spectrum, size)[:, :tau_max + 2]
+    squares = np.concatenate((np.zeros((count, 1)), np.cumsum(frames.astype(np.float64) ** 2, axis=1)), axis=1)
+    taus = np.arange(tau_max + 2)
+    energy = squares[:, taus + window] - squares[:, taus]
+    difference = energy[:, :1] + energy - 2 * correlation
+
+    # cumulative mean normalized difference, which is 1 on average and dips towards 0 at the period
+    running = np.cumsum(difference[:, 1:], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized = np.ones_like(difference)
+        normalized[:, 1:] = difference[:, 1:] * taus[1:] / running
+    normalized = np.nan_to_num(normalized, nan=1.0, posinf=1.0)
+
+    # the first local minimum under the threshold is the period. Frames without one use their lowest point
+    inner = normalized[:, tau_min:tau_max + 1]
+    before = normalized[:, tau_min - 1:tau_max]
+    after = normalized[:, tau_min + 1:tau_max + 2]
+    candidates = (inner < threshold) & (inner <= before) & (inner <= after)
+    found = candidates.any(axis=1)
+    tau = np.where(found, candidates.argmax(axis=1), inner.argmin(axis=1)) + tau_min
+
+    # parabolic interpolation between the neighbouring lags gives a period between two samples
+    rows = np.arange(count)
+    left, middle, right = normalized[rows, tau - 1], normalized[rows, tau], normalized[rows, tau + 1]
+    curve = left - 2 * middle + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(curve > 0, 0.5 * (left - right) / curve, 0.0)
+    period = tau + np.clip(shift, -1, 1)
+
+    f0 = rate / period
+    confidence = np.clip(1 - middle, 0, 1)
+    return f0, confidence
+
+
+def detectPitch(path, frame_size=2048, hop=512, chunk_frames=65536, fmin=60.0, fmax=1500.0, threshold=0.15):
+    """
+    Finds the pitch of a WAV file, reading it chunk by chunk
+    path: the path of the WAV file
+    frame_size: the number of samples looked at for every pitch estimate
+    hop: the number of samples between estimates
+    chunk_frames: the number of samples read from the file at a time, which bounds the memory used
+    fmin, fmax, threshold: see yin()
+    yields (times, f0, confidence) arrays for every chunk. times are the middle of each frame in seconds
+    """
+    wav = WavFile(path)
+    if frame_size // 2 <= wav.rate / fmin:
+        raise ValueError(f"frame_size {frame_size} is too short for frequencies down to {fmin} Hz")
+
+    # samples left over from the last chunk, for the frames that cross into the next one
+    carry = np.zeros(0, dtype=np.float32)
+    frame_index = 0
+    for chunk in wav.chunks(chunk_frames):
+        buffer = np.concatenate((carry, chunk))
+        count = (len(buffer) - frame_size) // hop + 1
+        if count <= 0:
+            carry = buffer
+            continue
+
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, frame_size)[::hop][:count]
+        f0, confidence = yin(frames, wav.rate, fmin, fmax, threshold)
+        times = ((frame_index + np.arange(count)) * hop + frame_size / 2) / wav.rate
+        yield times, f0, confidence
+
+        frame_index += count
+        carry = buffer[count * hop:]
+
+
+def pitchTrack(path, **options):
+    """
+    Finds the pitch of a whole WAV file, see detectPitch()
+    returns (times, f0, confidence) arrays for the whole file
+    """
+    parts = list(detectPitch(path, **options))
+    if not parts:
+        return np.zeros(0), np.zeros(0), np.zeros(0)
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def frequencyToPitch(frequency):
+    """
+    Returns the MIDI note number of a frequency in Hz, with a fraction for notes between the keys.
+    This is the inverse of synth.noteFrequency()
+    """
+    return 69 + 12 * np.log2(np.asarray(frequency) / 440.0)
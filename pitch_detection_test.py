@@ -0,0 +1,124 @@
+"""
+Description: Tests for the pitch detection used to grade recorded attempts.
+"""
+from pitch_detection import *
+import numpy as np
+import pytest
+
+RATE = 44100
+
+
+def writeWav(path, samples, bits=16, float_format=False, data_size=None):
+    """
+    Writes mono samples from -1 to 1 as a WAV file, with the data size from the header set to data_size if given
+    """
+    if float_format:
+        data = samples.astype("<f4").tobytes()
+    elif bits == 8:
+        data = np.round(samples * 127 + 128).astype(np.uint8).tobytes()
+    elif bits == 24:
+        values = np.round(samples * (2 ** 23 - 1)).astype("<i4")
+        data = values.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    else:
+        data = np.round(samples * (2 ** (bits - 1) - 1)).astype(f"<i{bits // 8}").tobytes()
+    tag = WAVE_FORMAT_IEEE_FLOAT if float_format else WAVE_FORMAT_PCM
+    width = bits // 8
+    fmt = struct.pack("<HHIIHH", tag, 1, RATE, RATE * width, width, bits)
+    size = len(data) if data_size is None else data_size
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sI4s", b"RIFF", 4 + 8 + len(fmt) + 8 + len(data), b"WAVE"))
+        f.write(struct.pack("<4sI", b"fmt ", len(fmt)) + fmt)
+        f.write(struct.pack("<4sI", b"data", size) + data)
+    return str(path)
+
+
+def tone(frequency, seconds=1.0):
+    return 0.5 * np.sin(2 * np.pi * frequency * np.arange(int(seconds * RATE)) / RATE)
+
+
+def cents(found, expected):
+    return 1200 * np.log2(found / expected)
+
+
+class TestPitchDetection:
+    @pytest.mark.parametrize("frequency", [100.0, 440.0, 1000.0])
+    def test_knownTones(self, tmp_path, frequency):
+        times, f0, confidence = pitchTrack(writeWav(tmp_path / "tone.wav", tone(frequency)))
+        assert abs(cents(np.median(f0), frequency)) < 5
+        assert np.median(confidence) > 0.9
+
+    @pytest.mark.parametrize("bits, float_format", [(8, False), (16, False), (24, False), (32, True)])
+    def test_sampleFormats(self, tmp_path, bits, float_format):
+        path = writeWav(tmp_path / "tone.wav", tone(220.0), bits, float_format)
+        wav = WavFile(path)
+        assert wav.frames == RATE
+        assert np.abs(wav.read(0, RATE) - tone(220.0)).max() < 0.01
+        times, f0, confidence = pitchTrack(path)
+        assert abs(cents(np.median(f0), 220.0)) < 10
+        assert frequencyToPitch(np.median(f0)) == pytest.approx(57, abs=0.1)
+
+    def test_silence(self, tmp_path):
+        times, f0, confidence = pitchTrack(writeWav(tmp_path / "silence.wav", np.zeros(RATE)))
+        assert len(confidence) > 0
+        assert confidence.max() < 0.1
+
+    def test_chunkBoundaries(self, tmp_path):
+        # a glide, so every frame has a different pitch, read in chunks that are not a multiple of the hop
+        samples = 0.5 * np.sin(2 * np.pi * np.cumsum(np.linspace(200, 400, RATE)) / RATE)
+        path = writeWav(tmp_path / "glide.wav", samples)
+        whole = pitchTrack(path, chunk_frames=RATE)
+        chunked = pitchTrack(path, chunk_frames=3001)
+        for a, b in zip(whole, chunked):
+            assert len(a) == len(b)
+            assert np.allclose(a, b)
+        assert np.all(np.diff(whole[0]) > 0)
+
+    def test_frameTooShort(self, tmp_path):
+        path = writeWav(tmp_path / "tone.wav", tone(440.0))
+        with pytest.raises(ValueError):
+            list(detectPitch(path, frame_size=512, fmin=60.0))
+
+    def test_cutOff(self, tmp_path):
+        # the header says one second, but the file only has half of it
+        path = writeWav(tmp_path / "cut.wav", tone(440.0))
+        with open(path, "r+b") as f:
+            f.truncate(44 + RATE)
+        wav = WavFile(path)
+        assert wav.frames == RATE // 2
+        times, f0, confidence = pitchTrack(path)
+        assert abs(cents(np.median(f0), 440.0)) < 5
+
+    def test_streamingHeader(self, tmp_path):
+        path = writeWav(tmp_path / "stream.wav", tone(440.0), data_size=0xFFFFFFFF)
+        assert WavFile(path).frames == RATE
+
+    def test_notWav(self, tmp_path):
+        path = tmp_path / "text.wav"
+        path.write_bytes(b"this is not a riff file")
+        with pytest.raises(WavFormatError):
+            WavFile(str(path))
+
+    def test_truncatedRiff(self, tmp_path):
+        path = tmp_path / "short.wav"
+        path.write_bytes(b"RIFF\x00\x00")
+        with pytest.raises(WavFormatError):
+            WavFile(str(path))
+
+    def test_shortFormat(self, tmp_path):
+        path = tmp_path / "fmt.wav"
+        fmt = struct.pack("<HHI", WAVE_FORMAT_PCM, 1, RATE)
+        path.write_bytes(struct.pack("<4sI4s", b"RIFF", 4 + 8 + len(fmt) + 8, b"WAVE")
+                         + struct.pack("<4sI", b"fmt ", len(fmt)) + fmt + struct.pack("<4sI", b"data", 0))
+        with pytest.raises(WavFormatError):
+            WavFile(str(path))
+
+    @pytest.mark.parametrize("channels, bits", [(0, 16), (1, 0)])
+    def test_zeroFields(self, tmp_path, channels, bits):
+        path = writeWav(tmp_path / "zero.wav", tone(440.0, 0.1))
+        with open(path, "r+b") as f:
+            f.seek(22)
+            f.write(struct.pack("<H", channels))
+            f.seek(34)
+            f.write(struct.pack("<H", bits))
+        with pytest.raises(WavFormatError):
+            WavFile(path)
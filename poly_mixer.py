@@ -0,0 +1,241 @@
+import atexit
+import heapq
+import itertools
+import threading
+import time
+import numpy as np
+import pygame
+from config import SAMPLE_RATE
+from synth import initMixer, noteFrequency, reserveChannels, timbres
+"""
+This file defines the PolyMixer() class, a software mixer for Free Play. pygame.mixer only has a few channels
+and silently drops notes when they run out, so the held notes (voices) are mixed here with NumPy into blocks
+of audio that are queued one after another on a single mixer channel.
+When every voice is in use, the least important one (released notes first, then the quietest, then the oldest)
+is faded out to make room for the new note.
+"""
+
+# how loud every voice is before mixing, so a few notes at once do not clip
+VOICE_GAIN = 0.25
+
+# how many seconds a stolen voice takes to fade out, so it does not click
+STEAL_FADE = 0.005
+
+
+class Voice():
+    """
+    One note that is being held or released, rendered block by block
+    """
+    def __init__(self, pitch, velocity, timbre, rate, order):
+        """
+        pitch: the MIDI note number
+        velocity: how loud the note is, from 0 to 1
+        timbre: the Timbre from synth.timbres
+        rate: the sample rate
+        order: a number that goes up with every note, so older voices can be found
+        """
+        self.pitch = pitch
+        self.gain = velocity * VOICE_GAIN
+        self.timbre = timbre
+        self.rate = rate
+        self.order = order
+
+        # samples rendered so far, and the sample the note was released at (None while it is held)
+        self.position = 0
+        self.released_at = None
+        self.release_level = 0.0
+
+        # the envelope level at the end of the last block, used to find the quietest voice
+        self.level = 0.0
+        self.finished = False
+
+        if timbre.sample is None:
+            self.step = noteFrequency(pitch) / rate
+        else:
+            self.step = noteFrequency(pitch) / noteFrequency(timbre.root_pitch) * timbre.sample_rate / rate
+
+    def release(self, fade=None):
+        """
+        Lets go of the note, which then fades out over the release of its envelope, or over fade seconds
+        """
+        if self.released_at is None or fade is not None:
+            self.released_at = self.position
+            self.release_level = self.level
+            self.release_time = fade if fade is not None else self.timbre.envelope.release
+
+    def envelope(self, frames):
+        """
+        Returns the envelope for the next frames samples
+        """
+        envelope = self.timbre.envelope
+        t = (self.position + np.arange(frames, dtype=np.float32)) / self.rate
+        attack, decay = envelope.attack, envelope.decay
+        if self.released_at is None:
+            return np.interp(t, [0.0, attack, attack + decay], [0.0, 1.0, envelope.sustain]).astype(np.float32)
+
+        since = t - self.released_at / self.rate
+        remaining = 1.0 - since / max(self.release_time, 1e-6)
+        return (self.release_level * np.clip(remaining, 0.0, 1.0)).astype(np.float32)
+
+    def render(self, frames):
+        """
+        Returns the next frames samples of the note
+        """
+        positions = (self.position + np.arange(frames, dtype=np.float64)) * self.step
+        if self.timbre.sample is None:
+            samples = self.timbre.wave(positions)
+        else:
+            sample = self.timbre.sample
+            samples = np.interp(positions, np.arange(len(sample)), sample, right=0.0)
+            if positions[-1] >= len(sample):
+                self.finished = True
+
+        envelope = self.envelope(frames)
+        self.level = float(envelope[-1])
+        self.position += frames
+        if self.released_at is not None and self.level <= 0.0:
+            self.finished = True
+        return samples.astype(np.float32) * envelope * self.gain
+
+    def stealPriority(self):
+        """
+        Returns the key of this voice for stealing, the smallest key is stolen first
+        """
+        return (self.released_at is None, self.level, self.order)
+
+
+class PolyMixer():
+    """
+    Use this class to play and hold many notes at once
+    """
+    def __init__(self, max_voices=64, block_frames=1024, channel=4, rate=SAMPLE_RATE):
+        """
+        max_voices: how many notes can sound at once before voices are stolen
+        block_frames: the number of samples mixed at a time. Two blocks are queued ahead, so this sets the delay
+        channel: the number of the mixer channel the blocks are played on. It is reserved so pygame does
+        not use it for other sounds
+        rate: the sample rate, used when mixing without the pygame mixer (for example to render offline)
+        """
+        self.max_voices = max_voices
+        self.block_frames = block_frames
+        self.channel_number = channel
+        self.rate = rate
+
+        # voice id to Voice, and the stolen voices that are fading out
+        self.voices = {}
+        self.fading = []
+        self.ids = itertools.count()
+
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.channel = None
+
+        # counts blocks that were not ready when the channel needed them
+        self.underruns = 0
+
+    def noteOn(self, pitch, velocity=1.0, timbre="sine"):
+        """
+        Starts a note, stealing a voice if every voice is in use
+        returns the id of the voice, for noteOff()
+        """
+        with self.lock:
+            while len(self.voices) >= self.max_voices:
+                self.steal()
+            voice_id = next(self.ids)
+            self.voices[voice_id] = Voice(pitch, velocity, timbres[timbre], self.rate, voice_id)
+        return voice_id
+
+    def noteOff(self, voice_id):
+        """
+        Releases a note. It keeps sounding until its envelope has faded out
+        """
+        with self.lock:
+            voice = self.voices.get(voice_id)
+            if voice is not None:
+                voice.release()
+
+    def allNotesOff(self):
+        with self.lock:
+            for voice in self.voices.values():
+                voice.release()
+
+    def steal(self):
+        """
+        Moves the least important voice to the fading voices. Called with the lock held
+        """
+        heap = [(voice.stealPriority(), voice_id) for voice_id, voice in self.voices.items()]
+        heapq.heapify(heap)
+        priority, voice_id = heapq.heappop(heap)
+        voice = self.voices.pop(voice_id)
+        voice.release(STEAL_FADE)
+        self.fading.append(voice)
+
+    def render(self, frames=None):
+        """
+        Mixes the next block of every voice into one mono float32 array
+        """
+        frames = frames or self.block_frames
+        block = np.zeros(frames, dtype=np.float32)
+        with self.lock:
+            for voice in list(self.voices.values()) + self.fading:
+                block += voice.render(frames)
+            self.voices = {voice_id: voice for voice_id, voice in self.voices.items() if not voice.finished}
+            self.fading = [voice for voice in self.fading if not voice.finished]
+
+        # soft clipping, so many loud notes at once get squashed instead of wrapping around
+        return np.tanh(block)
+
+    def start(self):
+        """
+        Starts the mixer and the thread that keeps the channel fed with blocks
+        """
+        if self.running:
+            return
+        self.rate, size, self.channels = initMixer()
+        reserveChannels(self.channel_number + 1)
+        self.channel = pygame.mixer.Channel(self.channel_number)
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="PolyMixer", daemon=True)
+        self.thread.start()
+
+        # the thread has to be stopped before pygame shuts the mixer down, or it crashes the program on exit
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Stops the mixing thread and the channel. Does nothing if the mixer was not started
+        """
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+            atexit.unregister(self.stop)
+        if self.channel is not None and pygame.mixer.get_init():
+            self.channel.stop()
+
+    def toSound(self, block):
+        data = (block * 32767).astype(np.int16)
+        if self.channels > 1:
+            data = np.repeat(data[:, np.newaxis], self.channels, axis=1)
+        return pygame.sndarray.make_sound(data)
+
+    def run(self):
+        """
+        The mixing thread. Whenever the channel has room in its queue the next block is mixed and queued
+        """
+        block_time = self.block_frames / self.rate
+        while self.running:
+            if not self.channel.get_busy():
+                # the channel ran dry, so a gap was heard unless nothing was playing
+                if self.voices or self.fading:
+                    self.underruns += 1
+                self.channel.play(self.toSound(self.render()))
+            # stop() may have been called while the block was mixed, and pygame is not touched after that
+            if self.running and self.channel.get_queue() is None:
+                self.channel.queue(self.toSound(self.render()))
+            time.sleep(block_time / 4)
+
+
+# the mixer shared by the activities
+poly_mixer = PolyMixer()
@@ -0,0 +1,77 @@
+"""
+Description: Tests for the PolyMixer class used to play many notes at once in Free Play.
+"""
+from poly_mixer import *
+import numpy as np
+import pytest
+
+RATE = 44100
+
+
+def held(mixer):
+    return sorted(voice.pitch for voice in mixer.voices.values())
+
+
+class TestPolyMixer:
+    def test_silent(self):
+        mixer = PolyMixer(rate=RATE)
+        assert not np.any(mixer.render(256))
+
+    def test_stealReleasedFirst(self):
+        mixer = PolyMixer(max_voices=3, rate=RATE)
+        ids = [mixer.noteOn(pitch) for pitch in (60, 62, 64)]
+        mixer.render(2048)
+        mixer.noteOff(ids[1])
+        mixer.noteOn(67)
+        assert held(mixer) == [60, 64, 67]
+        assert [voice.pitch for voice in mixer.fading] == [62]
+
+    def test_stealQuietestThenOldest(self):
+        mixer = PolyMixer(max_voices=3, rate=RATE)
+        ids = [mixer.noteOn(pitch) for pitch in (60, 62, 64)]
+        mixer.voices[ids[0]].level = 0.8
+        mixer.voices[ids[1]].level = 0.3
+        mixer.voices[ids[2]].level = 0.8
+        mixer.noteOn(67)
+        assert held(mixer) == [60, 64, 67]
+
+        # the two left from before are equally loud, so the older one goes
+        for voice in mixer.voices.values():
+            voice.level = 0.8
+        mixer.noteOn(69)
+        assert held(mixer) == [64, 67, 69]
+
+    def test_finishAfterRelease(self):
+        mixer = PolyMixer(rate=RATE)
+        voice_id = mixer.noteOn(60, timbre="sine")
+        mixer.render(4096)
+        mixer.noteOff(voice_id)
+        assert len(mixer.voices) == 1
+        release = timbres["sine"].envelope.release
+        mixer.render(int(release * RATE) + 1024)
+        assert mixer.voices == {}
+        assert not np.any(mixer.render(256))
+
+    def test_stealFade(self):
+        mixer = PolyMixer(max_voices=1, rate=RATE)
+        mixer.noteOn(60, timbre="square")
+        mixer.render(4096)
+        with mixer.lock:
+            mixer.steal()
+        block = mixer.render(1024)
+        fade = int(STEAL_FADE * RATE)
+        # still sounding at the start of the fade, silent once it is over
+        assert np.abs(block[:fade // 2]).max() > 0.01
+        assert not np.any(block[fade + 1:])
+        assert mixer.fading == []
+
+    def test_softClip(self):
+        mixer = PolyMixer(rate=RATE)
+        for i in range(32):
+            mixer.noteOn(60, 1.0, "square")
+        block = mixer.render(4096)
+        assert np.abs(block).max() < 1.0
+        assert np.abs(block).max() > 0.99
+
+    def test_stopBeforeStart(self):
+        PolyMixer(rate=RATE).stop()
@@ -0,0 +1,173 @@
+import numpy as np
+"""
+This file scores the taps of a student against the rhythm they were asked to play.
+Every tap is matched to the nearest beat of the rhythm with np.searchsorted, each beat keeps only its closest
+tap, and the leftover beats and taps are counted as missed and extra. A student who keeps the rhythm but
+slowly speeds up or slows down can have that tempo drift taken out before scoring.
+Everything works on whole arrays, and many attempts (for example a whole class) can be scored in one call.
+"""
+
+# the lowest score in percent for each grade, best first
+GRADES = [("A", 90), ("B", 80), ("C", 70), ("D", 60), ("F", 0)]
+
+# how much an extra tap counts against the score, as a fraction of a beat
+EXTRA_PENALTY = 0.5
+
+# tempo drift corrections outside this range are not believed, the taps probably do not follow the rhythm at all
+MAX_DRIFT = (0.8, 1.25)
+
+# the fraction of the rhythm used by each pass of the drift correction. Drift adds up over time, so late taps
+# can be closer to the next beat than to their own until the drift of the earlier ones has been taken out
+DRIFT_PASSES = (0.25, 0.5, 1.0)
+
+
+class RhythmScore():
+    """
+    The result of scoring one attempt
+    errors: for every beat, how late (positive) or early (negative) its tap was in seconds, NaN if it was missed
+    taps: for every beat, the index of the tap matched to it, -1 if it was missed
+    missed: how many beats had no tap
+    extra: how many taps did not belong to a beat
+    mean_error: the average distance of the matched taps from their beats in seconds
+    score: from 0 to 100, 100 is every beat hit exactly and no extra taps
+    grade: the letter grade of the score, see GRADES
+    tempo: how much slower (above 1) or faster (below 1) the student played, 1 unless drift correction was used
+    """
+    def __init__(self, errors, taps, extra, score, tempo):
+        self.errors = errors
+        self.taps = taps
+        self.missed = int(np.isnan(errors).sum())
+        self.extra = int(extra)
+        hits = errors[~np.isnan(errors)]
+        self.mean_error = float(np.abs(hits).mean()) if len(hits) else float("nan")
+        self.score = float(score)
+        self.grade = gradeOf(self.score)
+        self.tempo = float(tempo)
+
+
+def gradeOf(score):
+    """
+    Returns the letter grade of a score from 0 to 100
+    """
+    for grade, lowest in GRADES:
+        if score >= lowest:
+            return grade
+    return GRADES[-1][0]
+
+
+def nearestBeats(reference, taps):
+    """
+    Returns (beat, error): the index of the nearest beat to every tap, and how far the tap is from it in seconds
+    reference: the sorted beat times
+    taps: the tap times, in any order
+    """
+    right = np.searchsorted(reference, taps).clip(0, len(reference) - 1)
+    left = (right - 1).clip(0, len(reference) - 1)
+    use_left = np.abs(taps - reference[left]) <= np.abs(reference[right] - taps)
+    beat = np.where(use_left, left, right)
+    return beat, taps - reference[beat]
+
+
+def correctDrift(reference, taps, owner, count, window):
+    """
+    Fits a straight line through the tap times against their nearest beat times for every attempt, and
+    stretches the taps so the line has a slope of 1. The offset at the first beat is kept, so a student who
+    is late the whole time is still late, only the gradual drift is taken out.
+    The line is fitted again for every pass in DRIFT_PASSES, using more of the rhythm each time and matching
+    the taps corrected by the previous pass
+    reference: the sorted beat times
+    taps: the tap times of every attempt, one after another
+    owner: which attempt each tap belongs to
+    count: how many attempts there are
+    window: only taps this close to a beat (in seconds) are used for the fit
+    returns (corrected taps, tempo of every attempt)
+    """
+    start = reference[0]
+    span = reference[-1] - start
+    slope = np.ones(count)
+    corrected = taps
+    for fraction in DRIFT_PASSES:
+        beat, error = nearestBeats(reference, corrected)
+        x = reference[beat]
+        y = taps
+        used = ((np.abs(error) <= window) & (x <= start + fraction * span)).astype(float)
+
+        # least squares for every attempt at once, from the sums of each attempt's taps
+        n = np.bincount(owner, used, count)
+        sx = np.bincount(owner, used * x, count)
+        sy = np.bincount(owner, used * y, count)
+        sxx = np.bincount(owner, used * x * x, count)
+        sxy = np.bincount(owner, used * x * y, count)
+        denominator = n * sxx - sx * sx
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fitted = (n * sxy - sx * sy) / denominator
+            intercept = (sy - fitted * sx) / n
+            offset = fitted * start + intercept - start
+            stretched = (taps - intercept[owner]) / fitted[owner] + offset[owner]
+
+        # attempts with too few taps, or a slope that cannot be right, keep the result of the last pass
+        valid = (n >= 3) & (denominator > 0) & (fitted >= MAX_DRIFT[0]) & (fitted <= MAX_DRIFT[1])
+        slope = np.where(valid, fitted, slope)
+        corrected = np.where(valid[owner], stretched, corrected)
+    return corrected, slope
+
+
+def scoreBatch(reference, attempts, window=0.1, drift=False, offset=0.0):
+    """
+    Scores many attempts at the same rhythm at once
+    reference: the beat times of the rhythm in seconds
+    attempts: a list with the tap times of every attempt, in seconds on the same clock as reference
+    window: how far in seconds a tap can be from a beat and still count for it
+    drift: if True, gradual tempo drift is taken out before scoring, see correctDrift()
+    offset: the latency of the machine in seconds, see latency.py. It is subtracted from every tap
+    returns a list with a RhythmScore for every attempt
+    """
+    reference = np.sort(np.asarray(reference, dtype=float))
+    count = len(attempts)
+    beats = len(reference)
+    attempts = [np.asarray(attempt, dtype=float).ravel() for attempt in attempts]
+    lengths = np.array([len(attempt) for attempt in attempts], dtype=int)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(int)
+    taps = np.concatenate(attempts) - offset if count else np.zeros(0)
+    owner = np.repeat(np.arange(count), lengths)
+
+    tempo = np.ones(count)
+    if beats == 0 or len(taps) == 0:
+        errors = np.full((count, beats), np.nan)
+        matched = np.full((count, beats), -1)
+        return [RhythmScore(errors[i], matched[i], lengths[i], 0.0, 1.0) for i in range(count)]
+
+    if drift:
+        taps, tempo = correctDrift(reference, taps, owner, count, window)
+    beat, error = nearestBeats(reference, taps)
+
+    # every beat keeps the closest of the taps inside the window: the candidates are sorted by beat and then
+    # by distance, and the first one of each beat is kept
+    candidates = np.flatnonzero(np.abs(error) <= window)
+    key = owner[candidates] * beats + beat[candidates]
+    order = np.lexsort((np.abs(error[candidates]), key))
+    key = key[order]
+    first = np.ones(len(key), dtype=bool)
+    first[1:] = key[1:] != key[:-1]
+    chosen = candidates[order[first]]
+    chosen_key = key[first]
+
+    errors = np.full((count, beats), np.nan)
+    errors.flat[chosen_key] = error[chosen]
+    matched = np.full((count, beats), -1)
+    matched.flat[chosen_key] = chosen - starts[owner[chosen]]
+
+    # every hit scores from 1 (exactly on the beat) down to 0 (at the edge of the window)
+    hits = np.bincount(owner[chosen], minlength=count)
+    points = np.bincount(owner[chosen], 1 - np.abs(error[chosen]) / window, count)
+    extra = lengths - hits
+    scores = 100 * points / (beats + EXTRA_PENALTY * extra)
+    return [RhythmScore(errors[i], matched[i], extra[i], scores[i], tempo[i]) for i in range(count)]
+
+
+def score(reference, taps, window=0.1, drift=False, offset=0.0):
+    """
+    Scores one attempt, see scoreBatch()
+    returns a RhythmScore
+    """
+    return scoreBatch(reference, [taps], window, drift, offset)[0]
@@ -0,0 +1,66 @@
+"""
+Description: Tests for the rhythm scoring functions.
+"""
+from rhythm_scoring import *
+import numpy as np
+import pytest
+
+
+class TestRhythmScoring:
+    def test_perfect(self):
+        beats = np.arange(8) * 0.5
+        result = score(beats, beats)
+        assert result.score == pytest.approx(100)
+        assert result.grade == "A"
+        assert result.missed == 0 and result.extra == 0
+        assert list(result.taps) == list(range(8))
+
+    def test_errors(self):
+        beats = [0.0, 0.5, 1.0]
+        result = score(beats, [0.02, 0.49, 1.05])
+        assert result.errors == pytest.approx([0.02, -0.01, 0.05])
+        assert result.mean_error == pytest.approx(0.08 / 3)
+
+    def test_missedAndExtra(self):
+        # the beat at 1.0 has no tap, and the tap at 2.0 is far from every beat
+        beats = [0.0, 0.5, 1.0, 1.5]
+        result = score(beats, [0.0, 0.5, 1.5, 2.0])
+        assert result.missed == 1
+        assert result.extra == 1
+        assert np.isnan(result.errors[2])
+        assert result.taps[2] == -1
+
+    def test_closestTapWins(self):
+        # two taps near the same beat, the closer one is matched and the other is extra
+        result = score([0.0, 1.0], [0.95, 1.01, 0.0])
+        assert result.taps[1] == 1
+        assert result.extra == 1
+
+    def test_offset(self):
+        beats = np.arange(4) * 0.5
+        result = score(beats, beats + 0.03, offset=0.03)
+        assert result.score == pytest.approx(100)
+
+    def test_drift(self):
+        # the student plays 5% slower than the rhythm, so the later taps fall outside the window
+        beats = np.arange(20) * 0.5
+        taps = beats * 1.05
+        assert score(beats, taps).missed > 0
+        result = score(beats, taps, drift=True)
+        assert result.missed == 0
+        assert result.tempo == pytest.approx(1.05)
+        assert result.score == pytest.approx(100)
+
+    def test_batch(self):
+        beats = np.arange(4) * 0.5
+        results = scoreBatch(beats, [beats, [], beats[:2], beats + 0.05])
+        assert [result.missed for result in results] == [0, 4, 2, 0]
+        assert results[0].score == pytest.approx(100)
+        assert results[1].score == 0
+        assert results[3].score == pytest.approx(50)
+        assert list(results[2].taps) == [0, 1, -1, -1]
+
+    def test_grades(self):
+        assert gradeOf(95) == "A"
+        assert gradeOf(85) == "B"
+        assert gradeOf(59.9) == "F"
@@ -0,0 +1,108 @@
+import pygame
+"""
+This file defines the ScaledDisplay() class. Scenes draw into a backbuffer with a fixed logical resolution,
+which is scaled to fit the window (keeping its aspect ratio, with bars on the sides if needed).
+Layout then does not depend on the window or projector resolution, and resizing the window only changes the
+scale instead of laying every scene out again.
+"""
+
+# color of the bars around the scaled picture when the window has a different aspect ratio
+LETTERBOX_COLOR = (255, 255, 165)
+
+
+class ScaledDisplay():
+    """
+    Use this class to draw at a logical resolution and show the result in a window of any size
+    """
+    def __init__(self, window, logical_size):
+        """
+        window: the display surface
+        logical_size: the size scenes draw at
+        """
+        self.logical_size = tuple(logical_size)
+
+        # the backbuffer scenes draw into, in the pixel format of the window
+        self.surface = pygame.Surface(self.logical_size).convert(window)
+        self.window = None
+        self.setWindow(window)
+
+    def setWindow(self, window):
+        """
+        Works out the scale and position of the picture for the window size. This is only done again when
+        the window size changes, so every frame reuses the same transform
+        window: the display surface
+        """
+        if self.window is window and self.window_size == window.get_size():
+            return
+        self.window = window
+        self.window_size = window.get_size()
+
+        width, height = self.window_size
+        self.scale = min(width / self.logical_size[0], height / self.logical_size[1])
+        scaled_size = (max(1, round(self.logical_size[0] * self.scale)), max(1, round(self.logical_size[1] * self.scale)))
+        self.offset = ((width - scaled_size[0]) // 2, (height - scaled_size[1]) // 2)
+        self.picture = pygame.Rect(self.offset, scaled_size)
+
+        # the whole backbuffer is scaled into this surface, so it is not allocated again every frame
+        self.scaled = None if self.scale == 1 else pygame.Surface(scaled_size).convert(window)
+
+    def toLogical(self, pos):
+        """
+        Converts a position in the window to a position in the backbuffer
+        """
+        return (int((pos[0] - self.offset[0]) / self.scale), int((pos[1] - self.offset[1]) / self.scale))
+
+    def toWindow(self, rect):
+        """
+        Converts a rectangle of the backbuffer to the rectangle of the window it is shown in. The edges are rounded
+        outwards, and clipped to the picture so they never reach into the bars
+        """
+        left = int(rect.left * self.scale) + self.offset[0]
+        top = int(rect.top * self.scale) + self.offset[1]
+        right = int(rect.right * self.scale + 0.999) + self.offset[0]
+        bottom = int(rect.bottom * self.scale + 0.999) + self.offset[1]
+        return pygame.Rect(left, top, right - left, bottom - top).clip(self.picture)
+
+    def translateEvent(self, ev):
+        """
+        Returns the event with its mouse position converted to backbuffer coordinates
+        """
+        if not hasattr(ev, "pos"):
+            return ev
+        attributes = dict(ev.dict)
+        attributes["pos"] = self.toLogical(ev.pos)
+        if "rel" in attributes:
+            attributes["rel"] = (int(ev.rel[0] / self.scale), int(ev.rel[1] / self.scale))
+        return pygame.event.Event(ev.type, attributes)
+
+    def present(self, rects, full=False):
+        """
+        Copies the changed parts of the backbuffer to the window
+        rects: the changed rectangles of the backbuffer
+        full: copy the whole backbuffer and repaint the bars, for example after the window was resized
+        returns the rectangles of the window that changed, for pygame.display.update()
+        """
+        bounds = self.surface.get_rect()
+        if full or (len(rects) == 1 and rects[0].contains(bounds)):
+            self.window.fill(LETTERBOX_COLOR)
+            if self.scaled is None:
+                self.window.blit(self.surface, self.offset)
+            else:
+                pygame.transform.smoothscale(self.surface, self.picture.size, self.scaled)
+                self.window.blit(self.scaled, self.offset)
+            return [self.window.get_rect()]
+
+        changed = []
+        for rect in rects:
+            # a pixel of margin hides the seams from rounding and from the smoothing at the edges
+            rect = rect.inflate(2, 2).clip(bounds)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            target = self.toWindow(rect)
+            if self.scaled is None:
+                self.window.blit(self.surface, target.topleft, rect)
+            else:
+                piece = pygame.transform.smoothscale(self.surface.subsurface(rect), target.size)
+                self.window.blit(piece, target)
+            changed.append(target)
+        return changed
@@ -0,0 +1,67 @@
+"""
+Description: Tests for the ScaledDisplay class that scales a fixed size backbuffer into the window.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from scaled_display import *
+import pygame
+import pytest
+
+LOGICAL = (1100, 800)
+
+# the backbuffer is converted to the pixel format of the window, which needs the display
+pygame.display.init()
+
+
+class TestScaledDisplay:
+    def test_doubleSize(self):
+        display = ScaledDisplay(pygame.Surface((2200, 1600)), LOGICAL)
+        assert display.scale == 2 and display.offset == (0, 0)
+        assert display.toLogical((440, 1000)) == (220, 500)
+
+    def test_letterbox(self):
+        # a wider window gets bars on the sides, and positions on the bars are outside the backbuffer
+        display = ScaledDisplay(pygame.Surface((1650, 800)), LOGICAL)
+        assert display.scale == 1 and display.offset == (275, 0)
+        assert display.scaled is None
+        assert display.toLogical((275, 0)) == (0, 0)
+        assert display.toLogical((100, 10))[0] < 0
+
+    @pytest.mark.parametrize("window", [(2200, 1600), (550, 400), (1650, 800), (1000, 1000)])
+    def test_roundTrip(self, window):
+        # a backbuffer point shown in the window comes back to the same point
+        display = ScaledDisplay(pygame.Surface(window), LOGICAL)
+        for rect in (pygame.Rect(0, 0, 10, 10), pygame.Rect(425, 380, 250, 40), pygame.Rect(1090, 790, 10, 10)):
+            shown = display.toWindow(rect)
+            assert display.picture.contains(shown)
+            x, y = display.toLogical(shown.center)
+            assert abs(x - rect.centerx) <= 1 and abs(y - rect.centery) <= 1
+
+    def test_translateEvent(self):
+        display = ScaledDisplay(pygame.Surface((550, 400)), LOGICAL)
+        click = display.translateEvent(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(100, 50), button=1))
+        assert click.type == pygame.MOUSEBUTTONDOWN and click.pos == (200, 100) and click.button == 1
+        motion = display.translateEvent(pygame.event.Event(pygame.MOUSEMOTION, pos=(10, 10), rel=(3, -4), buttons=(0, 0, 0)))
+        assert motion.pos == (20, 20) and motion.rel == (6, -8)
+
+        # events without a position are passed on as they are
+        key = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+        assert display.translateEvent(key) is key
+
+    def test_setWindowResize(self):
+        window = pygame.Surface((1100, 800))
+        display = ScaledDisplay(window, LOGICAL)
+        assert display.scale == 1
+        display.setWindow(pygame.Surface((550, 400)))
+        assert display.scale == 0.5 and display.toLogical((550, 400)) == LOGICAL
+
+    def test_present(self):
+        window = pygame.Surface((550, 400))
+        display = ScaledDisplay(window, LOGICAL)
+        display.surface.fill((255, 0, 0), (100, 100, 200, 100))
+        changed = display.present([pygame.Rect(100, 100, 200, 100)])
+        assert len(changed) == 1 and changed[0].contains(pygame.Rect(50, 50, 100, 50))
+        red, green, blue = window.get_at((100, 75))[:3]
+        assert red > 250 and green == blue == 0
+        assert display.present([], full=True) == [window.get_rect()]
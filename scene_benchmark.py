@@ -0,0 +1,276 @@
+"""
+Headless frame-time benchmark for the scenes.
+Runs the main game loop without a window (SDL_VIDEODRIVER=dummy), feeds every scene a scripted sequence of
+mouse movement, clicks, typing and resizes, and reports per scene:
+    - frame time percentiles (p50/p95/p99) in milliseconds
+    - memory allocated per frame and the net number of allocated memory blocks per frame
+    - blits and fills drawn onto the screen per frame
+The report is JSON so results from different versions can be compared.
+
+Usage:
+    python scene_benchmark.py [--repeat N] [--scene NAME] [--output results.json]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import inspect
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import pygame
+import SceneManager
+from SceneManager import StartMenu, MainMenu
+from scene_registry import registry
+from game_loop import GameLoop
+from frame_scheduler import FrameScheduler
+from config import RESOLUTION
+from benchmark_stats import summary
+
+
+class CountingSurface(pygame.Surface):
+    """
+    A surface that counts how many times it is blitted and filled onto, used in place of the display surface
+    """
+    def __init__(self, size):
+        pygame.Surface.__init__(self, size)
+        self.blits = 0
+        self.fills = 0
+
+    def blit(self, *args, **kwargs):
+        self.blits += 1
+        return pygame.Surface.blit(self, *args, **kwargs)
+
+    def fill(self, *args, **kwargs):
+        self.fills += 1
+        return pygame.Surface.fill(self, *args, **kwargs)
+
+
+# ------------------------ Scripted input --------------
+
+def idle(frames, mouse=(0, 0)):
+    """
+    Frames with no events
+    """
+    return [([], mouse) for i in range(frames)]
+
+
+def mouseSweep(size, frames):
+    """
+    Moves the mouse over the whole screen in a zigzag, one MOUSEMOTION event per frame
+    """
+    script = []
+    rows = 8
+    for i in range(frames):
+        row = i * rows // frames
+        x = (i * rows % frames) * size[0] // frames
+        if row % 2:
+            x = size[0] - 1 - x
+        pos = (x, row * size[1] // rows + size[1] // (2 * rows))
+        script.append(([pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))], pos))
+    return script
+
+
+def click(pos):
+    """
+    A single click at pos: move there, press and release
+    """
+    return [([pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))], pos),
+            ([pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)], pos),
+            ([pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1)], pos)]
+
+
+def typing(text, mouse=(0, 0), backspaces=0):
+    """
+    Types text one key per frame, then presses backspace a number of times
+    """
+    script = []
+    for letter in text:
+        key = pygame.key.key_code(letter) if letter != ' ' else pygame.K_SPACE
+        script.append(([pygame.event.Event(pygame.KEYDOWN, key=key, unicode=letter, mod=0, scancode=0)], mouse))
+    for i in range(backspaces):
+        script.append(([pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, unicode='\b', mod=0, scancode=0)], mouse))
+    return script
+
+
+def resizes(sizes, mouse=(0, 0)):
+    """
+    One VIDEORESIZE event per frame for every size
+    """
+    return [([pygame.event.Event(pygame.VIDEORESIZE, size=size, w=size[0], h=size[1])], mouse) for size in sizes]
+
+
+def dragResize(start, end, frames):
+    """
+    The burst of resize events from dragging the window corner from start to end
+    """
+    sizes = []
+    for i in range(frames + 1):
+        sizes.append((start[0] + (end[0] - start[0]) * i // frames, start[1] + (end[1] - start[1]) * i // frames))
+    return resizes(sizes)
+
+
+def defaultScript(scene, size):
+    """
+    The script used for scenes without their own: idle frames, mouse movement and a window resize.
+    It has no clicks, since clicking an unknown scene could quit the program
+    """
+    return (idle(30) + mouseSweep(size, 240) + dragResize(size, (800, 600), 20) + dragResize((800, 600), size, 20)
+            + mouseSweep(size, 120) + idle(30))
+
+
+def startMenuScript(scene, size):
+    # ends by clicking 'Visualization Tool', so the cost of switching to MainMenu is measured as well
+    return defaultScript(scene, size) + click(scene.menu_button.getRect().center) + idle(10)
+
+
+def mainMenuScript(scene, size):
+    message = scene.message_rect.center
+    key = scene.key_rect.center
+    return (idle(30) + mouseSweep(size, 240)
+            + click(message) + typing("hello world from the lab", message, 6)
+            + click(key) + typing("lemon", key, 5) + typing("music", key)
+            + dragResize(size, (800, 600), 20) + dragResize((800, 600), size, 20)
+            + mouseSweep(size, 120) + idle(30))
+
+
+# maps a scene class to the function that builds its input script. Scenes that take no constructor
+# arguments and are not listed here are benchmarked with defaultScript()
+SCRIPTS = {
+    StartMenu: startMenuScript,
+    MainMenu: mainMenuScript,
+}
+
+
+def findScenes():
+    """
+    Returns every scene class in SceneManager, and every scene in the registry (including the ones that live
+    in other modules), that can be created without arguments
+    """
+    candidates = list(vars(SceneManager).values())
+    candidates += [registry.resolve(name) for name in registry.entries]
+
+    scenes = []
+    for value in candidates:
+        if (isinstance(value, type) and issubclass(value, SceneManager.SceneManager)
+                and value is not SceneManager.SceneManager and value not in scenes):
+            # only the constructor's signature is looked at, so no scene is built and errors inside a
+            # constructor are not mistaken for a scene that needs arguments
+            try:
+                inspect.signature(value).bind()
+            except TypeError:
+                continue
+            scenes.append(value)
+    return scenes
+
+
+# ------------------------ Measuring --------------
+
+def runScript(scene_class, script_function, size, trace_memory):
+    """
+    Runs the script against a new instance of scene_class, returns a list of per frame samples
+    (scene name, frame seconds, blits, fills, allocated bytes, net allocated blocks)
+    """
+    screen = CountingSurface(size)
+    scene = scene_class()
+    # resizes are still coalesced per frame, but applied without waiting, since the script runs much faster
+    # than a real window is dragged
+    loop = GameLoop(screen, scene, FrameScheduler(0, 0, 0, False), resize_debounce=0)
+    script = script_function(scene, size)
+
+    samples = []
+    for events, mouse in script:
+        name = type(loop.active_scene).__name__
+        screen.blits = screen.fills = 0
+        if trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        blocks = sys.getallocatedblocks()
+
+        start = time.perf_counter()
+        loop.step(events, mouse)
+        elapsed = time.perf_counter() - start
+
+        blocks = sys.getallocatedblocks() - blocks
+        allocated = tracemalloc.get_traced_memory()[1] - before if trace_memory else 0
+        samples.append((name, elapsed, screen.blits, screen.fills, allocated, blocks))
+    return samples
+
+
+def benchmark(scene_classes, repeat):
+    """
+    Benchmarks every scene class, returns the report as a dictionary
+    """
+    timing = {}
+    memory = {}
+    for scene_class in scene_classes:
+        script = SCRIPTS.get(scene_class, defaultScript)
+
+        # the first run warms up the font and text caches and is not counted
+        runScript(scene_class, script, RESOLUTION, False)
+        for i in range(repeat):
+            for sample in runScript(scene_class, script, RESOLUTION, False):
+                timing.setdefault(sample[0], []).append(sample)
+
+        # memory is traced in its own run, since tracemalloc slows every allocation down
+        tracemalloc.start()
+        for sample in runScript(scene_class, script, RESOLUTION, True):
+            memory.setdefault(sample[0], []).append(sample[4])
+        tracemalloc.stop()
+
+    scenes = {}
+    for name, samples in timing.items():
+        frame_ms = [sample[1] * 1000 for sample in samples]
+        allocated = memory.get(name, [0])
+        scenes[name] = {
+            "frames": len(samples),
+            "frame_ms": summary(frame_ms),
+            "alloc_bytes_per_frame": sum(allocated) / len(allocated),
+            "net_blocks_per_frame": sum(sample[5] for sample in samples) / len(samples),
+            "blits_per_frame": sum(sample[2] for sample in samples) / len(samples),
+            "fills_per_frame": sum(sample[3] for sample in samples) / len(samples),
+        }
+
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(str(i) for i in pygame.get_sdl_version()),
+            "platform": platform.platform(),
+            "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+            "resolution": list(RESOLUTION),
+            "repeat": repeat,
+        },
+        "scenes": scenes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark for every scene")
+    parser.add_argument("--repeat", type=int, default=5, help="how many times each script is run")
+    parser.add_argument("--scene", action="append", help="only benchmark this scene, can be given more than once")
+    parser.add_argument("--output", help="write the JSON report to this file instead of printing it")
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode(RESOLUTION)
+
+    scene_classes = findScenes()
+    if args.scene:
+        scene_classes = [scene for scene in scene_classes if scene.__name__ in args.scene]
+
+    report = benchmark(scene_classes, args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
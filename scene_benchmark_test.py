@@ -0,0 +1,14 @@
+"""
+Description: Tests for the helpers of the scene benchmark.
+"""
+from scene_benchmark import *
+import pytest
+
+
+class TestSceneBenchmark:
+    def test_findScenes(self):
+        # scenes registered as 'module:Class' are found too, and scenes that need arguments are left out
+        scenes = findScenes()
+        assert StartMenu in scenes and MainMenu in scenes
+        assert "LatencyCalibration" in [scene.__name__ for scene in scenes]
+        assert len(scenes) == len(set(scenes))
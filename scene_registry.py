@@ -0,0 +1,133 @@
+import importlib
+import time
+from collections import OrderedDict, deque
+"""
+This file defines the SceneRegistry() class, which creates scenes by name and keeps them around so switching
+back to a scene does not pay for its constructor (fonts, rendered labels, audio) again.
+Scenes the user is likely to go to next can also be built ahead of time during idle frames.
+"""
+class SceneRegistry():
+    """
+    Use this class to look up scenes by name. Every scene is registered with a factory that builds it
+    """
+    def __init__(self, max_retained=4):
+        """
+        max_retained: how many scenes are kept alive at once. When more are built, the least recently used
+        scene is dropped. This should be at least 2 so the scene that was just left is kept
+        """
+        self.max_retained = max_retained
+
+        # maps the name of each scene to (factory, retain, prefetch)
+        self.entries = {}
+
+        # the scenes that are alive, least recently used first
+        self.instances = OrderedDict()
+
+        # names of scenes waiting to be built by warmUp()
+        self.pending = deque()
+
+        # the name of the scene that was asked for last, which is never dropped
+        self.current = None
+
+    def register(self, name, factory, retain=True, prefetch=()):
+        """
+        Registers a scene
+        name: the name scenes pass to SwitchToScene() to go to this scene
+        factory: a function (or scene class) that builds the scene without arguments. It can also be a string
+        'module:Class', in which case the module is only imported the first time the scene is built, so
+        scenes that are not on the first screen do not slow down startup
+        retain: if False the scene is built again every time, for scenes that are expensive to keep around
+        prefetch: names of the scenes that are likely to come next. They are built during idle frames
+        once this scene has been shown
+        """
+        self.entries[name] = (factory, retain, tuple(prefetch))
+
+    def get(self, name):
+        """
+        Returns the scene registered under name, reusing the retained instance if there is one.
+        A reused scene has Reset() called on it so it looks like a new one
+        """
+        retain, prefetch = self.entries[name][1:]
+        self.current = name
+        scene = self.instances.get(name)
+        if scene is not None:
+            self.instances.move_to_end(name)
+            scene.Reset()
+        else:
+            scene = self.build(name)
+            if retain:
+                self.instances[name] = scene
+                self.evict()
+
+        self.prefetch(*prefetch)
+        return scene
+
+    def prefetch(self, *names):
+        """
+        Queues scenes to be built by warmUp(), skipping the ones that are already alive or not retained
+        """
+        for name in names:
+            if name not in self.instances and name not in self.pending and self.entries[name][1]:
+                self.pending.append(name)
+
+    def hasPending(self):
+        """
+        Returns True if there are scenes waiting to be built by warmUp()
+        """
+        return len(self.pending) > 0
+
+    def warmUp(self, budget=0.008):
+        """
+        Builds queued scenes until budget seconds have passed. A scene constructor cannot be split up,
+        so at least one scene is built per call. Called by the game loop on frames without input
+        returns True if there are scenes left to build
+        """
+        deadline = time.perf_counter() + budget
+        while self.pending:
+            name = self.pending.popleft()
+            if name not in self.instances:
+                self.instances[name] = self.build(name)
+                self.evict()
+                if time.perf_counter() >= deadline:
+                    break
+        return self.hasPending()
+
+    def build(self, name):
+        """
+        Builds a new instance of the scene registered under name, importing its module first if needed
+        """
+        return self.resolve(name)()
+
+    def resolve(self, name):
+        """
+        Returns the factory registered under name, importing its module first if it was given as 'module:Class'
+        """
+        factory, retain, prefetch = self.entries[name]
+        if isinstance(factory, str):
+            module_name, attribute = factory.split(":")
+            factory = getattr(importlib.import_module(module_name), attribute)
+            self.entries[name] = (factory, retain, prefetch)
+        return factory
+
+    def evict(self):
+        """
+        Drops the least recently used scenes until no more than max_retained are alive.
+        The current scene is never dropped
+        """
+        for name in list(self.instances):
+            if len(self.instances) <= self.max_retained:
+                break
+            if name != self.current:
+                del self.instances[name]
+
+    def clear(self):
+        """
+        Drops every retained scene and every queued warm-up
+        """
+        self.instances.clear()
+        self.pending.clear()
+        self.current = None
+
+
+# the registry shared by every scene
+registry = SceneRegistry()
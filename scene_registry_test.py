@@ -0,0 +1,90 @@
+"""
+Description: Tests for the SceneRegistry class that builds and keeps scenes by name.
+"""
+from scene_registry import *
+import sys
+import pytest
+
+
+class Scene:
+    built = 0
+
+    def __init__(self):
+        Scene.built += 1
+        self.resets = 0
+
+    def Reset(self):
+        self.resets += 1
+
+
+class Other(Scene):
+    pass
+
+
+def lazyModule(tmp_path, monkeypatch, name):
+    # a module that is only imported when its scene is first needed
+    (tmp_path / f"{name}.py").write_text("class LazyScene:\n    def Reset(self):\n        pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, name, raising=False)
+
+
+class TestSceneRegistry:
+    def test_retain(self):
+        registry = SceneRegistry()
+        registry.register("Menu", Scene)
+        first = registry.get("Menu")
+        assert registry.get("Menu") is first
+        assert first.resets == 1
+
+    def test_noRetain(self):
+        registry = SceneRegistry()
+        registry.register("Menu", Scene, retain=False)
+        assert registry.get("Menu") is not registry.get("Menu")
+        assert "Menu" not in registry.instances
+
+    def test_lazyResolve(self, tmp_path, monkeypatch):
+        lazyModule(tmp_path, monkeypatch, "lazy_scene_module")
+        registry = SceneRegistry()
+        registry.register("Lazy", "lazy_scene_module:LazyScene")
+        assert "lazy_scene_module" not in sys.modules
+
+        factory = registry.resolve("Lazy")
+        assert factory.__name__ == "LazyScene"
+        assert "lazy_scene_module" in sys.modules
+        # the resolved class replaces the string, so later builds do not look it up again
+        assert registry.entries["Lazy"][0] is factory
+        assert isinstance(registry.get("Lazy"), factory)
+
+    def test_prefetch(self):
+        registry = SceneRegistry()
+        registry.register("Menu", Scene, prefetch=["Next", "Once"])
+        registry.register("Next", Other)
+        registry.register("Once", Other, retain=False)
+        registry.get("Menu")
+
+        # scenes that are not retained are not built ahead of time
+        assert list(registry.pending) == ["Next"]
+        assert registry.warmUp() is False
+        prefetched = registry.instances["Next"]
+        assert registry.get("Next") is prefetched
+
+    def test_warmUpBuildsOne(self):
+        # a budget of nothing still builds one scene per call
+        registry = SceneRegistry()
+        registry.register("Menu", Scene, prefetch=["A", "B"])
+        registry.register("A", Other)
+        registry.register("B", Other)
+        registry.get("Menu")
+        assert registry.warmUp(budget=0) is True
+        assert registry.warmUp(budget=0) is False
+        assert list(registry.instances) == ["Menu", "A", "B"]
+
+    def test_evict(self):
+        registry = SceneRegistry(max_retained=2)
+        for name in ("A", "B", "C"):
+            registry.register(name, Scene)
+        a = registry.get("A")
+        registry.get("B")
+        registry.get("C")
+        assert list(registry.instances) == ["B", "C"]
+        assert registry.get("A") is not a
@@ -0,0 +1,45 @@
+"""
+This file defines the SpatialGrid() class, a uniform grid used to find which widgets are under the mouse
+without checking every widget in the scene. The screen is split into square cells and every rectangle is
+stored in each cell it touches, so a lookup only has to check the few rectangles in one cell.
+"""
+class SpatialGrid():
+    """
+    Use this class to look up the items whose rectangle contains a point
+    """
+    def __init__(self, cell_size=64):
+        """
+        cell_size: the width and height of a grid cell in pixels. It should be around the size of the
+        smallest items stored, so most cells only hold one or two of them
+        """
+        self.cell_size = cell_size
+
+        # maps (column, row) of a cell to a list of (x, y, w, h, item) that touch the cell
+        self.cells = {}
+
+    def insert(self, rect, item):
+        """
+        Stores item in every cell that rect touches
+        rect: the area covered by the item, anything with 4 values (x, y, w, h) like pygame.Rect
+        item: the object returned by query() when a point is inside rect
+        """
+        x, y, w, h = rect
+        entry = (x, y, w, h, item)
+        for column in range(int(x // self.cell_size), int((x + w) // self.cell_size) + 1):
+            for row in range(int(y // self.cell_size), int((y + h) // self.cell_size) + 1):
+                self.cells.setdefault((column, row), []).append(entry)
+
+    def query(self, pos):
+        """
+        Returns the items whose rectangle contains pos, in the order they were inserted.
+        Like button.hover(), the edges of the rectangle count as inside
+        """
+        px, py = pos
+        entries = self.cells.get((int(px // self.cell_size), int(py // self.cell_size)), ())
+        return [item for x, y, w, h, item in entries if x <= px <= x + w and y <= py <= y + h]
+
+    def clear(self):
+        """
+        Removes every item from the grid
+        """
+        self.cells.clear()
@@ -0,0 +1,54 @@
+"""
+Description: Tests for the SpatialGrid class used for hit-testing widgets.
+"""
+from spatial_index import *
+import pytest
+
+
+class TestSpatialGrid:
+    def test_queryEmpty(self):
+        # nothing is found in an empty grid
+        grid = SpatialGrid()
+        assert grid.query((10, 10)) == []
+
+    def test_queryInside(self):
+        grid = SpatialGrid(32)
+        grid.insert((10, 10, 100, 40), "a")
+        assert grid.query((50, 30)) == ["a"]
+        assert grid.query((200, 30)) == []
+
+    def test_queryEdges(self):
+        # the edges count as inside, the same as button.hover()
+        grid = SpatialGrid(32)
+        grid.insert((10, 10, 100, 40), "a")
+        assert grid.query((10, 10)) == ["a"]
+        assert grid.query((110, 50)) == ["a"]
+        assert grid.query((111, 50)) == []
+
+    def test_querySpansCells(self):
+        # an item bigger than a cell is found from every cell it covers
+        grid = SpatialGrid(16)
+        grid.insert((0, 0, 100, 100), "big")
+        for pos in [(1, 1), (50, 50), (99, 99)]:
+            assert grid.query(pos) == ["big"]
+
+    def test_queryOverlapping(self):
+        grid = SpatialGrid(64)
+        grid.insert((0, 0, 50, 50), "a")
+        grid.insert((25, 25, 50, 50), "b")
+        assert grid.query((30, 30)) == ["a", "b"]
+        assert grid.query((60, 60)) == ["b"]
+
+    def test_clear(self):
+        grid = SpatialGrid()
+        grid.insert((0, 0, 50, 50), "a")
+        grid.clear()
+        assert grid.query((10, 10)) == []
+
+    def test_manyItems(self):
+        # a row of piano keys, every key should only find itself
+        grid = SpatialGrid(24)
+        for i in range(88):
+            grid.insert((i * 12, 0, 11, 80), i)
+        for i in range(88):
+            assert grid.query((i * 12 + 5, 40)) == [i]
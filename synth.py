@@ -0,0 +1,274 @@
+import numpy as np
+import pygame
+from collections import OrderedDict
+from config import SAMPLE_RATE, AUDIO_BUFFER, NOTE_CACHE_BYTES
+"""
+This file makes the notes played by the activities. Tones are generated as NumPy arrays (sine, square,
+triangle, or a recorded instrument sample played at another pitch), shaped with an ADSR envelope and turned
+into a pygame.mixer.Sound with pygame.sndarray.
+Rendered notes are kept in a least recently used cache, so playing a note again only looks it up instead of
+generating it again, and the game loop does not stall when a student presses keys quickly.
+"""
+
+
+def initMixer():
+    """
+    Starts the mixer the first time audio is needed, so the menus do not wait for the sound card
+    returns (frequency, size, channels) of the mixer
+    """
+    if not pygame.mixer.get_init():
+        pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=AUDIO_BUFFER)
+    return pygame.mixer.get_init()
+
+
+# how many channels at the start of the mixer are reserved, see reserveChannels()
+reserved_channels = 0
+
+
+def reserveChannels(count):
+    """
+    Reserves the first count mixer channels, so pygame does not play other sounds on them. The beat scheduler and
+    the poly mixer each need some, and pygame.mixer.set_reserved() sets the total, so the most that was ever asked
+    for is kept. There is always one channel left over for playNote()
+    """
+    global reserved_channels
+    initMixer()
+    reserved_channels = max(reserved_channels, count)
+    if pygame.mixer.get_num_channels() <= reserved_channels:
+        pygame.mixer.set_num_channels(reserved_channels + 1)
+    pygame.mixer.set_reserved(reserved_channels)
+
+
+def noteFrequency(pitch):
+    """
+    Returns the frequency in Hz of a MIDI note number. 69 is the A above middle C (440 Hz), 60 is middle C
+    """
+    return 440.0 * 2.0 ** ((pitch - 69) / 12.0)
+
+
+class Envelope():
+    """
+    An ADSR envelope: the volume rises to full over attack seconds, falls to the sustain level over decay
+    seconds, and fades out over the last release seconds of the note
+    """
+    def __init__(self, attack=0.01, decay=0.1, sustain=0.7, release=0.1):
+        """
+        attack: seconds from silence to full volume
+        decay: seconds from full volume to the sustain level
+        sustain: the volume held until the release, from 0 to 1
+        release: seconds from the sustain level to silence at the end of the note
+        """
+        self.attack = attack
+        self.decay = decay
+        self.sustain = sustain
+        self.release = release
+
+    def shape(self, length, rate):
+        """
+        Returns the volume of every sample of a note length samples long, as a float32 array.
+        If the note is shorter than attack + decay + release they are shortened to fit
+        """
+        duration = length / rate
+        attack, decay, release = self.attack, self.decay, self.release
+        total = attack + decay + release
+        if total > duration and total > 0:
+            scale = duration / total
+            attack, decay, release = attack * scale, decay * scale, release * scale
+
+        times = [0.0, attack, attack + decay, duration - release, duration]
+        levels = [0.0, 1.0, self.sustain, self.sustain, 0.0]
+        t = np.arange(length, dtype=np.float32) / rate
+        return np.interp(t, times, levels).astype(np.float32)
+
+
+def sineWave(phase):
+    return np.sin(2 * np.pi * phase)
+
+
+def squareWave(phase):
+    return np.where(phase % 1.0 < 0.5, 1.0, -1.0)
+
+
+def triangleWave(phase):
+    return 4.0 * np.abs(phase % 1.0 - 0.5) - 1.0
+
+
+class Timbre():
+    """
+    How a note sounds: a waveform or a recorded sample, and the envelope it is shaped with
+    """
+    def __init__(self, envelope, wave=None, sample=None, sample_rate=SAMPLE_RATE, root_pitch=69):
+        """
+        envelope: the Envelope of the notes
+        wave: a function from phase (in cycles, as a NumPy array) to samples from -1 to 1
+        sample: a recording of the instrument as a mono NumPy array from -1 to 1, used instead of wave
+        sample_rate: the sample rate of the recording
+        root_pitch: the MIDI note the recording was played at
+        """
+        self.envelope = envelope
+        self.wave = wave
+        self.sample = sample
+        self.sample_rate = sample_rate
+        self.root_pitch = root_pitch
+
+    def render(self, pitch, length, rate):
+        """
+        Returns length samples of the note at the MIDI pitch, before the envelope is applied
+        """
+        if self.sample is None:
+            phase = noteFrequency(pitch) * (np.arange(length, dtype=np.float64) / rate)
+            return self.wave(phase)
+
+        # the recording is played faster or slower to change its pitch, reading between samples where needed.
+        # It is silent after the end of the recording
+        step = noteFrequency(pitch) / noteFrequency(self.root_pitch) * self.sample_rate / rate
+        positions = np.arange(length, dtype=np.float64) * step
+        return np.interp(positions, np.arange(len(self.sample)), self.sample, right=0.0)
+
+
+# the timbres notes can be played with, by name
+timbres = {
+    "sine": Timbre(Envelope(0.01, 0.05, 0.8, 0.05), wave=sineWave),
+    "square": Timbre(Envelope(0.01, 0.1, 0.5, 0.05), wave=squareWave),
+    "triangle": Timbre(Envelope(0.01, 0.08, 0.7, 0.05), wave=triangleWave),
+}
+
+
+def registerSample(name, samples, sample_rate, root_pitch, envelope=None):
+    """
+    Adds a recorded instrument as a timbre
+    name: the name notes are played with
+    samples: the recording as a NumPy array, mono or one column per channel. Integer samples are scaled to -1 to 1
+    sample_rate: the sample rate of the recording
+    root_pitch: the MIDI note the recording was played at
+    envelope: the Envelope of the notes, by default a short fade in and out that keeps the recorded attack
+    """
+    samples = np.asarray(samples)
+    if np.issubdtype(samples.dtype, np.integer):
+        samples = samples / float(np.iinfo(samples.dtype).max)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    if envelope is None:
+        envelope = Envelope(0.002, 0.0, 1.0, 0.05)
+    timbres[name] = Timbre(envelope, sample=samples.astype(np.float32), sample_rate=sample_rate, root_pitch=root_pitch)
+    note_cache.clear()
+
+
+def loadSample(name, path, root_pitch, envelope=None):
+    """
+    Loads a recorded instrument from a sound file (WAV or OGG) and adds it as a timbre, see registerSample()
+    """
+    frequency, size, channels = initMixer()
+    samples = pygame.sndarray.array(pygame.mixer.Sound(path))
+    registerSample(name, samples, frequency, root_pitch, envelope)
+
+
+def synthesize(pitch, duration, timbre="sine", rate=SAMPLE_RATE, volume=0.5):
+    """
+    Generates a note as a mono float32 NumPy array
+    pitch: the MIDI note number, can have a fraction for notes between the keys
+    duration: the length of the note in seconds, including the release
+    timbre: the name of the timbre, see timbres
+    rate: the sample rate
+    volume: the loudest the note gets, from 0 to 1
+    """
+    sound = timbres[timbre]
+    length = max(1, int(round(duration * rate)))
+    samples = sound.render(pitch, length, rate).astype(np.float32)
+    samples *= sound.envelope.shape(length, rate)
+    samples *= volume
+    return samples
+
+
+def toSound(samples):
+    """
+    Turns a mono float array from -1 to 1 into a pygame.mixer.Sound in the format of the mixer
+    returns (sound, number of bytes it uses)
+    """
+    frequency, size, channels = initMixer()
+    data = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    if channels > 1:
+        data = np.repeat(data[:, np.newaxis], channels, axis=1)
+    return pygame.sndarray.make_sound(data), data.nbytes
+
+
+class NoteCache():
+    """
+    Least recently used cache of rendered notes. Sounds are keyed by (pitch, duration, timbre, sample rate)
+    and the oldest ones are dropped once the cache holds more than max_bytes of audio
+    """
+    def __init__(self, max_bytes=NOTE_CACHE_BYTES):
+        """
+        max_bytes: the most audio memory the cache is allowed to hold
+        """
+        self.max_bytes = max_bytes
+
+        # maps a key to (sound, number of bytes)
+        self.sounds = OrderedDict()
+        self.bytes = 0
+
+        # counters to see how well the cache is working
+        self.hits = 0
+        self.misses = 0
+
+        # the pre-rendered note bank, opened the first time a note is not in the cache. False if there is none
+        self.bank = None
+
+    def get(self, pitch, duration, timbre="sine"):
+        """
+        Returns the note as a pygame.mixer.Sound, only generating it the first time it is asked for
+        """
+        rate = initMixer()[0]
+        key = (pitch, duration, timbre, rate)
+        entry = self.sounds.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.sounds.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        if self.bank is None:
+            # imported here because note_bank.py uses this module to render the bank
+            from note_bank import openBank
+            self.bank = openBank() or False
+
+        # notes in the bank are a view of the file, so only notes that are not in it are generated
+        sound = self.bank.sound(pitch, duration, timbre) if self.bank else None
+        if sound is not None:
+            size = int(round(sound.get_length() * rate)) * 2 * initMixer()[2]
+        else:
+            sound, size = toSound(synthesize(pitch, duration, timbre, rate))
+        self.sounds[key] = (sound, size)
+        self.bytes += size
+
+        # drop the least recently used notes until the cache fits again, always keeping the newest one
+        while self.bytes > self.max_bytes and len(self.sounds) > 1:
+            old_key, (old_sound, old_size) = self.sounds.popitem(last=False)
+            self.bytes -= old_size
+        return sound
+
+    def prewarm(self, pitches, duration, timbre="sine"):
+        """
+        Generates the notes an activity is going to play before it starts, for example every key of the keyboard
+        """
+        for pitch in pitches:
+            self.get(pitch, duration, timbre)
+
+    def clear(self):
+        """
+        Drops every cached note
+        """
+        self.sounds.clear()
+        self.bytes = 0
+
+
+# the cache shared by every activity
+note_cache = NoteCache()
+
+
+def playNote(pitch, duration=0.5, timbre="sine"):
+    """
+    Plays a note, see synthesize()
+    returns the pygame.mixer.Channel it is playing on, or None if every channel is busy
+    """
+    return note_cache.get(pitch, duration, timbre).play()
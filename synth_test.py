@@ -0,0 +1,91 @@
+"""
+Description: Tests for the note cache and the envelopes used to synthesize notes.
+"""
+from synth import *
+import numpy as np
+import pytest
+
+RATE = 44100
+
+
+def cache(notes):
+    # without the note bank, so every note is synthesized and has the same size for the same duration
+    notes_cache = NoteCache(max_bytes=int(notes * 0.1 * initMixer()[0]) * 2 * initMixer()[2])
+    notes_cache.bank = False
+    return notes_cache
+
+
+def cached(notes_cache):
+    return [key[0] for key in notes_cache.sounds]
+
+
+class TestNoteCache:
+    def test_evictOldest(self):
+        notes = cache(3)
+        for pitch in (60, 62, 64, 65):
+            notes.get(pitch, 0.1)
+        assert cached(notes) == [62, 64, 65]
+        assert notes.bytes <= notes.max_bytes
+        assert notes.bytes == sum(size for sound, size in notes.sounds.values())
+
+    def test_hitMovesToEnd(self):
+        notes = cache(3)
+        first = notes.get(60, 0.1)
+        notes.get(62, 0.1)
+        notes.get(64, 0.1)
+        assert notes.get(60, 0.1) is first
+        assert cached(notes) == [62, 64, 60]
+        assert (notes.hits, notes.misses) == (1, 3)
+
+        # 62 is now the least recently used, so it goes first
+        notes.get(65, 0.1)
+        assert cached(notes) == [64, 60, 65]
+
+    def test_keepNewest(self):
+        # a note larger than the whole cache is still kept, on its own
+        notes = cache(1)
+        notes.get(60, 0.1)
+        notes.get(62, 1.0)
+        assert cached(notes) == [62]
+        assert notes.bytes > notes.max_bytes
+
+    def test_clear(self):
+        notes = cache(3)
+        notes.get(60, 0.1)
+        notes.get(62, 0.1)
+        notes.clear()
+        assert notes.bytes == 0
+        assert len(notes.sounds) == 0
+
+
+class TestEnvelope:
+    def test_fullNote(self):
+        envelope = Envelope(attack=0.01, decay=0.1, sustain=0.7, release=0.1)
+        shape = envelope.shape(RATE, RATE)
+        assert shape.dtype == np.float32 and len(shape) == RATE
+        assert shape[0] == 0.0
+        assert shape.max() == pytest.approx(1.0, abs=1e-3)
+        assert shape[RATE // 2] == pytest.approx(0.7)
+        assert shape[-1] == pytest.approx(0.0, abs=1e-3)
+
+    def test_shortNote(self):
+        # 0.1 s is shorter than attack + decay + release, so all three are shortened to fit
+        envelope = Envelope(attack=0.05, decay=0.05, sustain=0.5, release=0.1)
+        length = int(0.1 * RATE)
+        shape = envelope.shape(length, RATE)
+        assert len(shape) == length
+        peak = int(np.argmax(shape))
+        assert peak == pytest.approx(0.025 * RATE, abs=2)
+        assert shape.max() == pytest.approx(1.0, abs=1e-3)
+        assert np.all(np.diff(shape[:peak]) >= 0)
+        assert np.all(np.diff(shape[peak:]) <= 0)
+        assert shape[-1] < 0.01
+
+    def test_oneSample(self):
+        shape = Envelope().shape(1, RATE)
+        assert len(shape) == 1 and shape[0] == 0.0
+        assert len(synthesize(60, 0.0, "sine", RATE)) == 1
+
+    def test_noEnvelope(self):
+        shape = Envelope(0, 0, 1.0, 0).shape(100, RATE)
+        assert np.all(shape[1:] == 1.0)
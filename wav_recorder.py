@@ -0,0 +1,314 @@
+import queue
+import threading
+import time
+import wave
+import numpy as np
+from collections import OrderedDict, deque
+from config import SAMPLE_RATE
+from synth import synthesize
+"""
+This file records the notes played in Free Play to a WAV file, and exports stored melodies the same way.
+Notes are rendered into fixed-size blocks of audio, and a background thread writes the blocks to the file,
+so memory use stays the same no matter how long the student plays and writing never stalls the game loop.
+Notes are (time, pitch, duration, timbre) tuples: the start time in seconds, the MIDI note number, the length
+in seconds and the name of the timbre (see synth.py).
+"""
+
+
+class WavWriter():
+    """
+    Writes blocks of audio to a 16 bit WAV file from a background thread
+    """
+    def __init__(self, path, rate=SAMPLE_RATE, channels=1, max_blocks=8):
+        """
+        path: the WAV file to write
+        rate: the sample rate
+        channels: the number of channels, blocks have one column per channel if there is more than one
+        max_blocks: how many blocks can wait to be written. write() waits when this many are waiting,
+        which keeps the memory used bounded if the disk is slow
+        """
+        # the file is opened here instead of by wave.open(), which leaves a broken object behind if the path
+        # can not be written
+        self.handle = open(path, "wb")
+        self.file = wave.open(self.handle, "wb")
+        self.file.setnchannels(channels)
+        self.file.setsampwidth(2)
+        self.file.setframerate(rate)
+        self.blocks = queue.Queue(max_blocks)
+        self.error = None
+        self.frames = 0
+        self.thread = threading.Thread(target=self.run, name="WavWriter", daemon=True)
+        self.thread.start()
+
+    def write(self, samples):
+        """
+        Queues a block of float samples from -1 to 1 to be written
+        """
+        if self.error is not None:
+            raise self.error
+        self.blocks.put(samples)
+
+    def close(self):
+        """
+        Waits until every block is written and finishes the file
+        """
+        self.blocks.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        """
+        The writer thread. Converts the blocks to 16 bit samples and appends them to the file. The wave module
+        fills in the length of the file when it is closed
+        """
+        try:
+            while True:
+                samples = self.blocks.get()
+                if samples is None:
+                    break
+                data = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+                self.file.writeframesraw(data.tobytes())
+                self.frames += len(data)
+        except Exception as error:
+            self.error = error
+            # keeps emptying the queue so write() does not wait forever
+            while self.blocks.get() is not None:
+                pass
+        finally:
+            self.file.close()
+            self.handle.close()
+
+
+class BlockRenderer():
+    """
+    Renders notes into blocks of audio, one block at a time. Only the notes that are sounding are kept
+    """
+    def __init__(self, notes=(), rate=SAMPLE_RATE, block_frames=4096, cache_size=64):
+        """
+        notes: the notes to render, sorted by start time. Can be a generator, it is only read as far as needed
+        rate: the sample rate
+        block_frames: the number of samples in every block
+        cache_size: how many different rendered notes are kept, since melodies repeat the same notes a lot
+        """
+        self.source = iter(notes)
+        self.upcoming = next(self.source, None)
+        self.rate = rate
+        self.block_frames = block_frames
+
+        # notes added while recording, see add()
+        self.live = deque()
+
+        # the notes that are sounding, as (first sample, samples)
+        self.active = []
+
+        # the first sample of the next block
+        self.position = 0
+
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def add(self, note):
+        """
+        Adds a note while recording. Notes have to be added in the order they start
+        """
+        self.live.append(note)
+
+    def hasNotes(self):
+        """
+        Returns True if there are notes that have not been rendered completely
+        """
+        return self.upcoming is not None or len(self.live) > 0 or len(self.active) > 0
+
+    def nextNote(self, end):
+        """
+        Returns the next note starting before sample end, or None
+        """
+        if self.upcoming is not None and self.upcoming[0] * self.rate < end:
+            note = self.upcoming
+            self.upcoming = next(self.source, None)
+            return note
+        if self.live and self.live[0][0] * self.rate < end:
+            return self.live.popleft()
+        return None
+
+    def samplesOf(self, pitch, duration, timbre):
+        """
+        Returns the rendered note, reusing it if it was rendered recently
+        """
+        key = (pitch, duration, timbre)
+        samples = self.cache.get(key)
+        if samples is None:
+            samples = synthesize(pitch, duration, timbre, self.rate)
+            self.cache[key] = samples
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return samples
+
+    def nextBlock(self):
+        """
+        Returns the next block of audio as a float32 array, mixing every note that sounds in it
+        """
+        start = self.position
+        end = start + self.block_frames
+        note = self.nextNote(end)
+        while note is not None:
+            when, pitch, duration, timbre = note
+            self.active.append((int(round(when * self.rate)), self.samplesOf(pitch, duration, timbre)))
+            note = self.nextNote(end)
+
+        block = np.zeros(self.block_frames, dtype=np.float32)
+        sounding = []
+        for first, samples in self.active:
+            # the part of the note inside this block
+            begin = max(start, first)
+            stop = min(end, first + len(samples))
+            if begin < stop:
+                block[begin - start:stop - start] += samples[begin - first:stop - first]
+            if first + len(samples) > end:
+                sounding.append((first, samples))
+        self.active = sounding
+        self.position = end
+        return block
+
+
+def renderToWav(notes, path, rate=SAMPLE_RATE, block_frames=4096):
+    """
+    Renders a melody to a WAV file as fast as possible, usually much faster than real time
+    notes: the notes, sorted by start time
+    path: the WAV file to write
+    returns the length of the file in seconds
+    """
+    renderer = BlockRenderer(notes, rate, block_frames)
+    writer = WavWriter(path, rate)
+    try:
+        while renderer.hasNotes():
+            writer.write(renderer.nextBlock())
+    finally:
+        writer.close()
+    return writer.frames / rate
+
+
+class BackgroundExport():
+    """
+    Renders a melody to a WAV file in a background thread, so exporting a long session does not freeze the screen.
+    An error in the thread (a full disk, a path that can not be written) is kept and raised again from wait()
+    """
+    def __init__(self, notes, path, done=None, failed=None, rate=SAMPLE_RATE):
+        """
+        notes: the notes, sorted by start time
+        path: the WAV file to write
+        done: called from the thread with the length of the file in seconds when it is finished
+        failed: called from the thread with the exception if the export fails
+        rate: the sample rate
+        """
+        self.notes = notes
+        self.path = path
+        self.done = done
+        self.failed = failed
+        self.rate = rate
+        self.length = None
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name="WavExport", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        try:
+            self.length = renderToWav(self.notes, self.path, self.rate)
+        except Exception as error:
+            self.error = error
+            if self.failed is not None:
+                self.failed(error)
+            return
+        if self.done is not None:
+            self.done(self.length)
+
+    def isDone(self):
+        return not self.thread.is_alive()
+
+    def wait(self, timeout=None):
+        """
+        Waits for the export to finish and returns the length of the file in seconds, or None if it is still
+        running after timeout seconds. Raises the error of the thread if the export failed
+        """
+        self.thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.length
+
+
+def exportInBackground(notes, path, done=None, failed=None, rate=SAMPLE_RATE):
+    """
+    Starts rendering a melody to a WAV file in a background thread, see BackgroundExport
+    returns the BackgroundExport, which can be waited on
+    """
+    return BackgroundExport(notes, path, done, failed, rate)
+
+
+class SessionRecorder():
+    """
+    Records the notes played live to a WAV file. A background thread renders the blocks as the session goes on
+    """
+    def __init__(self, path, rate=SAMPLE_RATE, block_frames=4096):
+        """
+        path: the WAV file to write
+        rate: the sample rate
+        block_frames: the number of samples in every block
+        """
+        self.path = path
+        self.renderer = BlockRenderer((), rate, block_frames)
+        self.writer = None
+        self.thread = None
+        self.running = False
+        self.lock = threading.Lock()
+        self.start_time = 0.0
+
+    def start(self):
+        """
+        Starts recording. Note times are counted from now
+        """
+        self.writer = WavWriter(self.path, self.renderer.rate)
+        self.start_time = time.perf_counter()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="SessionRecorder", daemon=True)
+        self.thread.start()
+
+    def noteOn(self, pitch, duration, timbre="sine", when=None):
+        """
+        Records a note
+        when: the time.perf_counter() time the note was played, now by default
+        """
+        if when is None:
+            when = time.perf_counter()
+        with self.lock:
+            self.renderer.add((when - self.start_time, pitch, duration, timbre))
+
+    def run(self):
+        """
+        The recording thread. Renders every block that has been played until now, then sleeps for a block
+        """
+        renderer = self.renderer
+        block_time = renderer.block_frames / renderer.rate
+        while self.running:
+            played = (time.perf_counter() - self.start_time) * renderer.rate
+            while renderer.position + renderer.block_frames <= played:
+                with self.lock:
+                    block = renderer.nextBlock()
+                self.writer.write(block)
+            time.sleep(block_time)
+
+    def stop(self):
+        """
+        Stops recording, lets the notes that are still sounding finish, and closes the file
+        returns the length of the file in seconds
+        """
+        self.running = False
+        self.thread.join()
+        renderer = self.renderer
+        played = (time.perf_counter() - self.start_time) * renderer.rate
+        while renderer.position < played or renderer.hasNotes():
+            self.writer.write(renderer.nextBlock())
+        self.writer.close()
+        return self.writer.frames / renderer.rate
@@ -0,0 +1,107 @@
+"""
+Description: Tests for rendering melodies into blocks and writing them to WAV files.
+"""
+from wav_recorder import *
+import time
+import wave
+import numpy as np
+import pytest
+
+RATE = 8000
+
+
+def mix(notes, length):
+    """
+    Mixes the notes into one array the simple way, with every note synthesized whole
+    """
+    out = np.zeros(length, dtype=np.float32)
+    for when, pitch, duration, timbre in notes:
+        samples = synthesize(pitch, duration, timbre, RATE)
+        first = int(round(when * RATE))
+        out[first:first + len(samples)] += samples
+    return out
+
+
+def readWav(path):
+    with wave.open(path, "rb") as f:
+        assert f.getframerate() == RATE and f.getnchannels() == 1 and f.getsampwidth() == 2
+        return np.frombuffer(f.readframes(f.getnframes()), "<i2")
+
+
+class TestWavRecorder:
+    def test_blockBoundaries(self):
+        # notes that start inside one block and end several blocks later, overlapping each other
+        notes = [(0.0, 60, 0.3, "sine"), (0.01, 64, 0.05, "square"), (0.1237, 67, 0.4, "triangle"),
+                 (0.1237, 60, 0.3, "sine")]
+        renderer = BlockRenderer(notes, RATE, block_frames=100)
+        blocks = []
+        while renderer.hasNotes():
+            blocks.append(renderer.nextBlock())
+        rendered = np.concatenate(blocks)
+        assert len(rendered) % 100 == 0
+        assert np.allclose(rendered, mix(notes, len(rendered)), atol=1e-6)
+
+    def test_liveNotes(self):
+        # notes added while rendering are mixed the same way as the ones given up front
+        notes = [(0.0, 60, 0.1, "sine"), (0.05, 62, 0.1, "sine")]
+        renderer = BlockRenderer((), RATE, block_frames=64)
+        renderer.add(notes[0])
+        blocks = [renderer.nextBlock()]
+        renderer.add(notes[1])
+        while renderer.hasNotes():
+            blocks.append(renderer.nextBlock())
+        rendered = np.concatenate(blocks)
+        assert np.allclose(rendered, mix(notes, len(rendered)), atol=1e-6)
+
+    def test_renderToWav(self, tmp_path):
+        notes = [(0.0, 60, 0.25, "sine"), (0.2, 67, 0.25, "square")]
+        path = str(tmp_path / "melody.wav")
+        length = renderToWav(notes, path, RATE, block_frames=512)
+
+        # the file is whole blocks long and ends with the last note
+        frames = int(np.ceil(0.45 * RATE / 512)) * 512
+        assert length == pytest.approx(frames / RATE)
+        data = readWav(path)
+        assert len(data) == frames
+        expected = (np.clip(mix(notes, frames), -1.0, 1.0) * 32767).astype("<i2")
+        assert np.array_equal(data, expected)
+
+    def test_emptyMelody(self, tmp_path):
+        path = str(tmp_path / "empty.wav")
+        assert renderToWav([], path, RATE) == 0
+        assert len(readWav(path)) == 0
+
+    def test_writeError(self, tmp_path):
+        # a block the writer thread can not convert makes the next write() fail in the caller's thread
+        writer = WavWriter(str(tmp_path / "bad.wav"), RATE)
+        writer.write("not samples")
+        deadline = time.perf_counter() + 5
+        while writer.error is None and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        with pytest.raises(TypeError):
+            writer.write(np.zeros(16))
+        with pytest.raises(TypeError):
+            writer.close()
+
+    def test_closeError(self, tmp_path):
+        writer = WavWriter(str(tmp_path / "bad.wav"), RATE)
+        writer.write(np.zeros(16))
+        writer.write("not samples")
+        with pytest.raises(TypeError):
+            writer.close()
+        assert not writer.thread.is_alive()
+
+    def test_exportInBackground(self, tmp_path):
+        lengths = []
+        export = exportInBackground([(0.0, 60, 0.1, "sine")], str(tmp_path / "export.wav"), lengths.append, rate=RATE)
+        assert export.wait(5) == pytest.approx(4096 / RATE)
+        assert export.isDone() and lengths == [export.length]
+
+    def test_exportError(self, tmp_path):
+        # the folder does not exist, so the file can not be opened
+        errors = []
+        export = exportInBackground([(0.0, 60, 0.1, "sine")], str(tmp_path / "missing" / "export.wav"),
+                                    failed=errors.append, rate=RATE)
+        with pytest.raises(OSError):
+            export.wait(5)
+        assert len(errors) == 1 and isinstance(errors[0], OSError)
@@ -0,0 +1,99 @@
+from spatial_index import SpatialGrid
+"""
+This file defines the WidgetTree() class, which holds on to the widgets (buttons) of a scene between frames.
+Scenes build their widgets once in __init__ and only move them around when the screen size changes,
+instead of creating new buttons every frame.
+"""
+class WidgetTree():
+    """
+    Use this class to store the widgets of a scene. Widgets are stored by name, and can be nested
+    under a parent widget so groups of widgets are drawn together
+    """
+    def __init__(self):
+        # maps the name of every widget to the widget itself
+        self.widgets = {}
+
+        # maps the name of every widget to the names of its children, in the order they were added.
+        # The None key holds the top level widgets
+        self.children = {None: []}
+
+        # finds the widgets under the mouse without checking every widget, rebuilt by reindex()
+        self.grid = SpatialGrid()
+
+        # the widgets the mouse is currently over, and the widgets the mouse button was pressed on
+        self.hovered = []
+        self.pressed = []
+
+    def add(self, name, widget, parent=None):
+        """
+        Adds a widget to the tree
+        name: the name used to look the widget up later
+        widget: the widget, anything with draw(), getRect(), setHover() and click() like the button() class
+        parent: the name of the widget this one is grouped under, None for a top level widget
+        returns the widget so it can be stored on the scene as well
+        """
+        self.widgets[name] = widget
+        self.children[name] = []
+        self.children[parent].append(name)
+        return widget
+
+    def get(self, name):
+        """
+        Returns the widget stored under name
+        """
+        return self.widgets[name]
+
+    def walk(self, parent=None):
+        """
+        Yields every widget under parent, parents before their children, in the order they were added
+        """
+        for name in self.children[parent]:
+            yield self.widgets[name]
+            yield from self.walk(name)
+
+    def draw(self, screen, hovered=None):
+        """
+        Draws every widget onto the screen, returns the areas that were drawn on
+        hovered: passed on to every widget's draw(), False draws them all in their normal state
+        """
+        return [widget.draw(screen, hovered) for widget in self.walk()]
+
+    def reindex(self):
+        """
+        Rebuilds the spatial index from the current widget positions. Scenes call this at the end of Layout()
+        """
+        self.grid.clear()
+        for widget in self.walk():
+            self.grid.insert(widget.getRect(), widget)
+
+    def hoverAt(self, mouse):
+        """
+        Updates the hover state of the widgets for a new mouse position, called on MOUSEMOTION
+        returns the widgets whose hover state changed and need to be redrawn
+        """
+        hovered = self.grid.query(mouse)
+        changed = [widget for widget in self.hovered if widget not in hovered and widget.setHover(False)]
+        changed += [widget for widget in hovered if widget.setHover(True)]
+        self.hovered = hovered
+        return changed
+
+    def press(self, mouse):
+        """
+        Presses the widgets under the mouse and calls click() on them, called on MOUSEBUTTONDOWN
+        returns the widgets whose hover state changed, see hoverAt()
+        """
+        changed = self.hoverAt(mouse)
+        self.pressed = list(self.hovered)
+        for widget in self.pressed:
+            widget.pressed = True
+        for widget in self.pressed:
+            widget.click()
+        return changed
+
+    def release(self):
+        """
+        Releases the pressed widgets, called on MOUSEBUTTONUP
+        """
+        for widget in self.pressed:
+            widget.pressed = False
+        self.pressed = []
@@ -0,0 +1,80 @@
+"""
+Description: Tests for the WidgetTree class that keeps the buttons of a scene.
+"""
+from widget_tree import *
+from button_class import button
+from SceneManager import SceneManager
+import pygame
+import pytest
+
+
+def tree(clicks=None):
+    # two buttons side by side and one nested under the first
+    widgets = WidgetTree()
+    label = pygame.Surface((10, 10))
+    widgets.add("left", button(0, label, lambda: clicks.append("left"), x1=0, x2=100, y2=40))
+    widgets.add("right", button(0, label, lambda: clicks.append("right"), x1=200, x2=100, y2=40))
+    widgets.add("child", button(10, label, lambda: clicks.append("child"), x1=10, x2=20, y2=20), parent="left")
+    widgets.reindex()
+    return widgets
+
+
+class TestWidgetTree:
+    def test_walkOrder(self):
+        widgets = tree()
+        assert list(widgets.walk()) == [widgets.get("left"), widgets.get("child"), widgets.get("right")]
+
+    def test_hitTest(self):
+        widgets = tree()
+        assert widgets.hoverAt((250, 20)) == [widgets.get("right")]
+        assert widgets.hovered == [widgets.get("right")]
+
+        # the nested button and its parent are both under the mouse
+        changed = widgets.hoverAt((15, 15))
+        assert set(changed) == {widgets.get("right"), widgets.get("left"), widgets.get("child")}
+        assert widgets.hovered == [widgets.get("left"), widgets.get("child")]
+
+        # moving inside the same buttons changes nothing, and the gap between buttons hovers nothing
+        assert widgets.hoverAt((16, 16)) == []
+        widgets.hoverAt((150, 20))
+        assert widgets.hovered == []
+
+    def test_edges(self):
+        widgets = tree()
+        widgets.hoverAt((100, 40))
+        assert widgets.hovered == [widgets.get("left")]
+        widgets.hoverAt((101, 40))
+        assert widgets.hovered == []
+
+    def test_reindex(self):
+        # moved widgets are only found at their new place after reindex()
+        widgets = tree()
+        widgets.get("right").place((500, 500, 100, 40))
+        assert widgets.hoverAt((550, 520)) == []
+        widgets.reindex()
+        assert widgets.hoverAt((550, 520)) == [widgets.get("right")]
+
+    def test_pressAndRelease(self):
+        clicks = []
+        widgets = tree(clicks)
+        widgets.press((210, 10))
+        assert clicks == ["right"]
+        assert widgets.get("right").pressed
+        widgets.release()
+        assert not widgets.get("right").pressed and widgets.pressed == []
+
+    def test_dirtyRects(self):
+        # only the buttons whose hover state changed are redrawn and collected as dirty rectangles
+        widgets = tree()
+        screen = pygame.Surface((400, 100))
+        scene = SceneManager()
+        scene.GetDirtyRects(screen)
+        for widget in widgets.hoverAt((250, 20)):
+            scene.MarkDirty(widget.draw(screen))
+        assert scene.GetDirtyRects(screen) == [pygame.Rect(200, 0, 100, 40)]
+        assert scene.GetDirtyRects(screen) == []
+
+    def test_drawAll(self):
+        widgets = tree()
+        rects = widgets.draw(pygame.Surface((400, 100)), False)
+        assert rects == [pygame.Rect(0, 0, 100, 40), pygame.Rect(10, 10, 20, 20), pygame.Rect(200, 0, 100, 40)]